@@ -6,7 +6,17 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('soothing.mp3', '.')],
-    hiddenimports=[],
+    hiddenimports=[
+        # Backends are imported by name at runtime
+        # UI task runner, imported lazily by the in-process UI (Windows)
+        'healthyself.ui_tasks',
+        'healthyself.display.singlescreen',
+        'healthyself.display.multimonitor',
+        'healthyself.display.sdl',
+        'healthyself.audio.pygame_mixer',
+        'healthyself.audio.silent',
+        'healthyself.ambient_audio',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
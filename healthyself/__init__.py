@@ -0,0 +1,17 @@
+"""
+Disengage - enforced screen breaks with a warning popup, a fullscreen
+blackout and soothing music.
+
+One scheduling engine (engine.py) drives pluggable backends:
+
+    display: singlescreen, multimonitor      (healthyself/display/)
+    audio:   pygame, none                    (healthyself/audio/)
+
+Only the selected backends are imported, so single-screen mode never
+loads screeninfo and "--audio none" never loads pygame or numpy.
+
+    python -m healthyself --display singlescreen
+
+Settings live in healthyself/config.py.
+"""
+__version__ = "2.1.0"
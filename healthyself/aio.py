@@ -0,0 +1,240 @@
+"""
+asyncio API: the break scheduler inside a host application's event loop.
+
+    import asyncio
+    from healthyself import aio
+
+    async def main():
+        async with aio.BreakScheduler() as scheduler:
+            upcoming = await scheduler.next_break()
+            print(f"next {upcoming.break_type} break at {upcoming.starts_at:.0f}")
+            async for event in scheduler.events("snooze", "break_start", "break_end"):
+                print(event.kind, event.payload)
+
+    asyncio.run(main())
+
+The scheduling logic is engine.schedule(), the same generator the command
+line runs; here its sleeps are asyncio sleeps on the host's loop, and a new
+central policy wakes it through the loop (no polling). Its Blocking steps
+(break history appends, calendar and asset stats, power sysfs reads, X
+queries, plugin imports, profiler setup, trace and profile cycles) run on
+the UI thread below, never on the host's loop. Profile requests therefore
+reach an embedded scheduler through the request file, not SIGUSR1/SIGUSR2:
+the host keeps its signals.
+
+Popups and blackouts need a GUI loop of their own. UI runner calls go to
+one dedicated thread: with the zygote runner (Linux default) that thread
+only waits on the UI worker's socket; in-process, it runs the Tk mainloop
+for the popup or blackout (Tk stays on that one thread; this doesn't work
+on macOS, where Tk must run on the main thread). Either way the host's
+thread is never taken over. Create the scheduler early: the zygote is
+forked when it starts.
+
+Events (Event.kind): next_break, warning, snooze, break_start, break_end,
+skip - the break_hooks events plus the two in engine.EVENTS.
+"""
+import time
+import asyncio
+import functools
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from . import engine, policy_sync
+from .supervisor import create_ui, UIError
+
+# at: time.time() when the scheduler emitted it
+Event = namedtuple("Event", "kind at payload")
+# warning_at: when the popup appears; starts_at: when the blackout starts
+NextBreak = namedtuple("NextBreak", "break_type warning_at starts_at")
+
+EVENT_QUEUE = 64            # per subscriber; the oldest event is dropped when full
+
+
+class EventStream:
+    """
+    Async iterator over scheduler events, subscribed from creation (no
+    event is missed between events() and the first iteration). Ends when
+    the scheduler stops, or on close().
+    """
+
+    def __init__(self, scheduler, kinds):
+        self._scheduler = scheduler
+        self.kinds = frozenset(kinds)
+        self.dropped = 0
+        self._queue = asyncio.Queue(EVENT_QUEUE)
+
+    def _offer(self, event):
+        if self.kinds and event is not None and event.kind not in self.kinds:
+            return
+        if self._queue.full():
+            # A host that stopped reading must not hold up the scheduler
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self._queue.get()
+        if event is None:
+            self.close()
+            raise StopAsyncIteration
+        return event
+
+    def close(self):
+        self._scheduler._streams.discard(self)
+
+
+class BreakScheduler:
+    """The break engine as an asyncio task; start() / close() or async with"""
+
+    def __init__(self, display_name=None, audio_name=None, ui=None):
+        self.display_name = display_name
+        self.audio_name = audio_name
+        self.ui = ui
+        self.upcoming = None        # NextBreak, None while a break is under way
+        self._owns_ui = ui is None
+        self._streams = set()
+        self._task = None
+        self._executor = None
+        self._wake = None
+        self._listener = None
+        self._upcoming_known = None
+
+    # ---------------- lifecycle ----------------
+
+    async def start(self):
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        if self.ui is None:
+            self.ui = create_ui(self.display_name, self.audio_name)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="break-ui")
+        self._wake = asyncio.Event()
+        self._upcoming_known = asyncio.Event()
+        # Policy poll thread -> this loop
+        self._listener = functools.partial(loop.call_soon_threadsafe, self._wake.set)
+        policy_sync.syncer.add_listener(self._listener)
+        self._task = asyncio.create_task(self._drive(), name="break-scheduler")
+        self._task.add_done_callback(self._stopped)
+
+    async def run(self):
+        """Start and wait until the scheduler stops (an error in it is raised here)"""
+        await self.start()
+        await self._task
+
+    async def close(self):
+        """
+        Stop the scheduler and its UI runner; ends every event stream.
+        A popup or blackout already on screen is finished first.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Break scheduler stopped: {e}")
+        policy_sync.syncer.remove_listener(self._listener)
+        loop = asyncio.get_running_loop()
+        if self._owns_ui:
+            await loop.run_in_executor(self._executor, self.ui.shutdown)
+        self._executor.shutdown(wait=False)
+        self._task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---------------- API ----------------
+
+    def events(self, *kinds):
+        """EventStream of the given kinds (all when none are given)"""
+        unknown = set(kinds) - set(engine.EVENTS)
+        if unknown:
+            raise ValueError(f"Unknown break event {', '.join(sorted(unknown))} "
+                             f"(expected one of {', '.join(engine.EVENTS)})")
+        stream = EventStream(self, kinds)
+        self._streams.add(stream)
+        return stream
+
+    async def wait_for(self, kind):
+        """The next event of kind"""
+        stream = self.events(kind)
+        try:
+            async for event in stream:
+                return event
+            raise RuntimeError("Break scheduler stopped")
+        finally:
+            stream.close()
+
+    async def next_break(self):
+        """NextBreak for the upcoming break; waits while a break is under way"""
+        while self.upcoming is None:
+            if self._task is None or self._task.done():
+                raise RuntimeError("Break scheduler is not running")
+            await self._upcoming_known.wait()
+        return self.upcoming
+
+    # ---------------- driver ----------------
+
+    def _stopped(self, task):
+        self._publish(None)
+        # Lets next_break() see that nothing more is coming
+        self._upcoming_known.set()
+
+    def _publish(self, event):
+        for stream in list(self._streams):
+            stream._offer(event)
+
+    def _notify(self, step):
+        if step.event == "next_break":
+            self.upcoming = NextBreak(**step.payload)
+            self._upcoming_known.set()
+        elif step.event == "warning":
+            self.upcoming = None
+            self._upcoming_known.clear()
+        self._publish(Event(step.event, time.time(), step.payload))
+
+    async def _sleep(self, step):
+        if not step.interruptible:
+            await asyncio.sleep(step.seconds)
+            return
+        # Set by a policy that arrived since the last idle sleep, too
+        if not self._wake.is_set():
+            try:
+                await asyncio.wait_for(self._wake.wait(), step.seconds)
+            except asyncio.TimeoutError:
+                pass
+        self._wake.clear()
+
+    async def _drive(self):
+        """engine.run(), with the loop's sleeps and the UI thread (UI calls and blocking I/O)"""
+        loop = asyncio.get_running_loop()
+        steps = engine.schedule(self.ui)
+        reply, error = None, None
+        try:
+            while True:
+                step = steps.throw(error) if error else steps.send(reply)
+                reply, error = None, None
+                if isinstance(step, engine.Sleep):
+                    await self._sleep(step)
+                elif isinstance(step, engine.Call):
+                    method = functools.partial(getattr(self.ui, step.method), **step.kwargs)
+                    try:
+                        reply = await loop.run_in_executor(self._executor, method)
+                    except UIError as e:
+                        error = e
+                elif isinstance(step, engine.Notify):
+                    self._notify(step)
+                elif isinstance(step, engine.Blocking):
+                    work = functools.partial(step.function, *step.args, **step.kwargs)
+                    reply = await loop.run_in_executor(self._executor, work)
+        finally:
+            steps.close()
@@ -0,0 +1,125 @@
+"""
+Procedurally generated ambient audio for breaks.
+
+Used when a music file is missing, or on purpose via an "ambient:<kind>"
+entry in MUSIC_FILES. Everything is rendered with vectorized NumPy in one
+pass and kept in memory for the session, so later breaks play instantly
+with no file I/O.
+
+Every sound is built to be exactly periodic over LOOP_SECONDS:
+- noise is shaped in the frequency domain and inverse-FFT'd (circular)
+- tone frequencies are snapped to multiples of 1 / LOOP_SECONDS
+- the breathing swell period divides LOOP_SECONDS
+so Sound.play(loops=-1) repeats with no click at the seam.
+
+Kinds: pink, brown, tones, breathing
+"""
+import numpy as np
+import pygame
+
+from . import loudness
+from .audio import AMBIENT_KINDS as KINDS
+
+LOOP_SECONDS = 24           # Multiple of the 12 s breathing cycle
+BREATH_SECONDS = 12         # In for 4, hold for 4, out for 4
+PEAK_LEVEL = 0.3            # Fraction of full scale - soothing, not loud
+
+# (kind, rate, channels) -> rendered int16 array
+# Arrays rather than Sounds, so the cache survives pygame.mixer.quit()
+_cache = {}
+# (kind, rate, channels) -> loudness in dBFS, measured when rendered
+_levels = {}
+
+
+def _shaped_noise(samples, rate, exponent, rng):
+    """Periodic noise with a 1/f**exponent power spectrum"""
+    spectrum = rng.normal(size=samples // 2 + 1) + 1j * rng.normal(size=samples // 2 + 1)
+    freqs = np.fft.rfftfreq(samples, 1.0 / rate)
+    gain = np.zeros_like(freqs)
+    audible = freqs >= 20.0
+    gain[audible] = freqs[audible] ** (-exponent / 2.0)
+    return np.fft.irfft(spectrum * gain, n=samples)
+
+
+def _breath_envelope(t):
+    """Raised-cosine swell: 4 s in, 4 s hold, 4 s out (0.35..1.0)"""
+    phase = (t % BREATH_SECONDS) / (BREATH_SECONDS / 3.0)    # 0..3
+    rise = 0.5 - 0.5 * np.cos(np.pi * np.clip(phase, 0.0, 1.0))
+    fall = 0.5 + 0.5 * np.cos(np.pi * np.clip(phase - 2.0, 0.0, 1.0))
+    return 0.35 + 0.65 * np.where(phase < 1.0, rise, np.where(phase < 2.0, 1.0, fall))
+
+
+def _tones(t):
+    """Soft A-major pad, each partial snapped to the loop period"""
+    out = np.zeros_like(t)
+    for freq, level, wobble in ((110.0, 1.0, 0.125), (164.81, 0.6, 0.083), (220.0, 0.5, 0.167),
+                                (277.18, 0.35, 0.042)):
+        freq = round(freq * LOOP_SECONDS) / LOOP_SECONDS
+        wobble = max(1, round(wobble * LOOP_SECONDS)) / LOOP_SECONDS
+        tremolo = 0.75 + 0.25 * np.sin(2 * np.pi * wobble * t)
+        out += level * tremolo * np.sin(2 * np.pi * freq * t)
+    return out
+
+
+def render(kind, rate=44100, channels=2, seed=7):
+    """Render one loop as an int16 array shaped (samples, channels)"""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown ambient sound '{kind}' (expected one of {', '.join(KINDS)})")
+    rng = np.random.default_rng(seed)
+    samples = LOOP_SECONDS * rate
+    t = np.arange(samples) / rate
+
+    layers = []
+    for _ in range(channels):
+        if kind == "pink":
+            wave = _shaped_noise(samples, rate, 1.0, rng)
+        elif kind == "brown":
+            wave = _shaped_noise(samples, rate, 2.0, rng)
+        elif kind == "tones":
+            bed = _shaped_noise(samples, rate, 2.0, rng)
+            wave = _tones(t) + 0.1 * bed / np.abs(bed).max()
+        else:  # breathing
+            wave = _shaped_noise(samples, rate, 1.5, rng) * _breath_envelope(t)
+        layers.append(wave)
+
+    # Normalize all channels together so stereo balance is preserved
+    audio = np.stack(layers, axis=1)
+    audio *= PEAK_LEVEL * 32767 / max(np.abs(audio).max(), 1e-12)
+    return audio.astype(np.int16)
+
+
+def get_sound(kind):
+    """
+    Return a loopable pygame Sound for kind, rendering it on first use.
+    The mixer must already be initialized (its rate/channels are used).
+    """
+    rate, _size, channels = pygame.mixer.get_init()
+    return pygame.sndarray.make_sound(prerender(kind, rate, channels))
+
+
+def prerender(kind, rate, channels):
+    """Rendered samples for kind, from the cache; usable before the mixer is open"""
+    key = (kind, rate, channels)
+    audio = _cache.get(key)
+    if audio is None:
+        audio = render(kind, rate, channels)
+        if channels == 1:
+            audio = np.ascontiguousarray(audio[:, 0])
+        _cache[key] = audio
+        _levels[key] = loudness.analyse(audio, rate)
+    return audio
+
+
+def touch():
+    """Read one byte per page of every rendered sound (undoes swap-out); returns bytes"""
+    total = 0
+    for audio in _cache.values():
+        int(audio.view(np.uint8)[::4096].sum())
+        total += audio.nbytes
+    return total
+
+
+def get_level(kind):
+    """Loudness (dBFS) of kind as rendered for the current mixer, or None"""
+    rate, _size, channels = pygame.mixer.get_init()
+    return _levels.get((kind, rate, channels))
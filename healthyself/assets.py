@@ -0,0 +1,190 @@
+"""
+Bundled asset resolver.
+
+Music files used to be opened relative to the current directory, which is
+wrong when the exe is started from the Windows Startup shortcut or a
+systemd user unit. Assets are now looked up, once, in:
+
+    1. the PyInstaller bundle (sys._MEIPASS - where disengage-v2.spec puts soothing.mp3)
+    2. the folder containing the exe / main script
+    3. the healthyself package folder, then the folder above it (a source
+       checkout keeps soothing.mp3 next to the launcher scripts)
+    4. the current directory (last resort, for old setups)
+
+Resolved files are memory-mapped and handed to pygame as file-like objects,
+so the mixer reads straight from the page cache: no temp files and no
+second copy of the track in the Python heap. Found paths are cached for the
+session; a name that wasn't found is looked up again next time (the file may
+be copied in later). Maps are made when a break needs them (pre-warm, play)
+and closed by release() once the audio device is released, so the files
+aren't held open - and locked, on Windows - between breaks. preload() also
+closes the maps of files no longer in the playlist.
+"""
+import os
+import sys
+import mmap
+import stat
+
+# name -> absolute path (found names only)
+_resolved = {}
+# absolute path -> read-only mmap
+_buffers = {}
+
+
+class _Reader:
+    """
+    File-like view of a shared mmap with its own position. pygame closes
+    the stream it was given on unload; closing a view leaves the map open
+    for the next break.
+    """
+
+    def __init__(self, buf):
+        self._buf = buf
+        self._pos = 0
+
+    def read(self, size=-1):
+        end = len(self._buf) if size is None or size < 0 else min(self._pos + size, len(self._buf))
+        data = self._buf[self._pos:end]
+        self._pos = max(self._pos, end)
+        return data
+
+    def seek(self, offset, whence=0):
+        base = (0, self._pos, len(self._buf))[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        pass
+
+
+def search_dirs():
+    """Directories searched for bundled assets, most specific first"""
+    dirs = []
+    bundle = getattr(sys, "_MEIPASS", None)
+    if bundle:
+        dirs.append(bundle)
+    if getattr(sys, "frozen", False):
+        dirs.append(os.path.dirname(sys.executable))
+    main_file = getattr(sys.modules.get("__main__"), "__file__", None)
+    if main_file:
+        dirs.append(os.path.dirname(os.path.abspath(main_file)))
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    dirs.append(package_dir)
+    dirs.append(os.path.dirname(package_dir))
+    dirs.append(os.getcwd())
+
+    unique = []
+    for d in dirs:
+        if d not in unique:
+            unique.append(d)
+    return unique
+
+
+def _usable(path):
+    """A regular, non-empty file (empty files can't be mapped: treated as missing)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISREG(st.st_mode) and st.st_size > 0
+
+
+def resolve(name):
+    """Absolute path of an asset, or None. Found paths are cached; misses are not."""
+    if name in _resolved:
+        return _resolved[name]
+    path = None
+    if os.path.isabs(name):
+        path = name if _usable(name) else None
+    else:
+        for d in search_dirs():
+            candidate = os.path.join(d, name)
+            if _usable(candidate):
+                path = candidate
+                break
+    if path is not None:
+        _resolved[name] = path
+    return path
+
+
+def _map(name):
+    """The read-only mmap of an asset (made on first use until release()), or None"""
+    path = resolve(name)
+    if path is None:
+        return None
+    buf = _buffers.get(path)
+    if buf is None:
+        try:
+            with open(path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            # Moved or deleted since it was found: search again next time
+            _resolved.pop(name, None)
+            raise
+        _buffers[path] = buf
+    return buf
+
+
+def _unmap(paths):
+    for path in paths:
+        buf = _buffers.pop(path, None)
+        if buf is not None:
+            buf.close()
+
+
+def release():
+    """
+    Close every map. Call when nothing plays from them any more (the audio
+    device is closed); the next open_buffer() or touch() maps again.
+    """
+    _unmap(list(_buffers))
+
+
+def open_buffer(name):
+    """
+    File-like reader (read/seek/tell) over the asset's read-only memory
+    map, or None. The map stays open until release() so pygame can stream
+    from it; each call gets its own reader.
+    """
+    try:
+        buf = _map(name)
+    except (OSError, ValueError) as e:
+        print(f"Asset '{name}' could not be opened: {e}")
+        return None
+    return None if buf is None else _Reader(buf)
+
+
+def touch(names):
+    """
+    Fault every page of the mapped assets into memory, so a break under
+    heavy I/O doesn't wait for the disk. Returns the number of bytes touched.
+    """
+    total = 0
+    for name in names:
+        if name.startswith("ambient:"):
+            continue
+        try:
+            buf = _map(name)
+        except (OSError, ValueError):
+            continue
+        if buf is None:
+            continue
+        if hasattr(buf, "madvise"):
+            buf.madvise(mmap.MADV_WILLNEED)
+        for offset in range(0, len(buf), mmap.PAGESIZE):
+            buf[offset]
+        total += len(buf)
+    return total
+
+
+def preload(names):
+    """
+    Resolve every asset of a (new) playlist; maps of files no longer listed
+    are closed. Returns {name: path or None}.
+    """
+    result = {name: resolve(name) for name in names if not name.startswith("ambient:")}
+    _unmap([path for path in _buffers if path not in result.values()])
+    return result
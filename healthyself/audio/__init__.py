@@ -0,0 +1,55 @@
+"""
+Audio backends: what plays during a break.
+
+    pygame  - music files (streamed from memory) with generated ambient
+              sound as fallback; needs pygame (+ numpy for ambient)
+    none    - silent breaks, imports nothing
+
+A backend provides:
+    name
+    prepare(names)         -> between breaks: precompute per-track data
+                              (e.g. loudness) so play() does no analysis
+    prewarm(names)         -> shortly before a break: make every buffer
+                              play() needs resident; returns bytes touched
+    warm(names)            -> at the warning: open the audio device so the
+                              break starts on it (released on idle timeout)
+    play(cancel, duration, started=None)
+                           -> blocks in the music thread until the
+                              CancelToken fires (duration is a safety net);
+                              sets the started Event once the first sample
+                              played; returns False if playback failed
+    first_sample_ms        -> play request -> first sample, last break
+    open_ms                -> device open cost at the last play (0.0 when
+                              warm from the warning; None if nothing opened)
+    shutdown()             -> release the audio device on exit
+
+Backend modules are imported on first use, so an unselected backend's
+dependencies are never loaded.
+"""
+import importlib
+
+from .. import config
+
+# Backend name -> module in this package
+BACKENDS = {
+    "pygame": "pygame_mixer",
+    "none": "silent",
+}
+
+# Generated sounds (ambient_audio.py): AMBIENT_SOUND or "ambient:<kind>".
+# Here rather than in ambient_audio so policy checks don't import numpy
+AMBIENT_KINDS = ("pink", "brown", "tones", "breathing")
+
+# name -> backend instance
+_loaded = {}
+
+
+def get(name=None):
+    """Backend instance for name (default: config.AUDIO_BACKEND), imported on first use"""
+    name = name or config.AUDIO_BACKEND
+    backend = _loaded.get(name)
+    if backend is None:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown audio backend '{name}' (choose from: {', '.join(BACKENDS)})")
+        backend = _loaded[name] = importlib.import_module(f".{BACKENDS[name]}", __name__).Backend()
+    return backend
@@ -0,0 +1,341 @@
+"""
+pygame audio backend: music files with generated ambient fallback.
+
+The mixer is held by an AudioSession: opened at the tracks' native sample
+rate (no resampling on the way to the device), kept open from the warning
+through the break, and released AUDIO_IDLE_TIMEOUT seconds after the last
+use, so no audio device is held between breaks. Track loudness is measured
+between breaks (prepare) and applied as mixer volume at play time.
+"""
+import os
+import time
+import random
+import threading
+from collections import Counter
+
+# Suppress pygame welcome message (must be set before the import)
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', "hide")
+
+import pygame
+
+from .. import config, assets, loudness, power, tracing
+from .track_info import sample_rate
+
+
+# Mixer rate when no track's rate is known (ambient sound only)
+DEFAULT_FREQUENCY = 44100
+MIXER_CHANNELS = 2
+# Longest wait for the mixer to report the first sample played
+FIRST_SAMPLE_TIMEOUT = 1.0
+
+
+def get_next_music_file():
+    """Select next music file"""
+    return random.choice(config.MUSIC_FILES)
+
+
+class AudioSession:
+    """
+    The mixer device, opened with parameters matched to the indexed tracks
+    and kept open between uses until AUDIO_IDLE_TIMEOUT expires.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timer = None
+        # Bumped by every acquire/release/close: an idle timer that fired
+        # for an older generation (and waited on the lock) must not close
+        self._generation = 0
+        self._rates = {}        # names tuple -> chosen frequency
+        self.params = None      # (frequency, channels, buffer) while open
+        self.opens = 0
+        self.open_ms = None     # cost of the last acquire() (0.0 when warm)
+
+    def params_for(self, names):
+        """
+        (frequency, channels, buffer) for a playlist: the most common native
+        rate of its files, so SDL_mixer plays them without resampling.
+        Cached per playlist; probing reads only the file headers. The buffer
+        is AUDIO_BUFFER, larger with BATTERY_AUDIO = "simple" on battery.
+        """
+        key = tuple(names)
+        frequency = self._rates.get(key)
+        if frequency is None:
+            rates = Counter()
+            for name in key:
+                path = None if name.startswith("ambient:") else assets.resolve(name)
+                rate = sample_rate(path) if path else None
+                if rate:
+                    rates[rate] += 1
+            frequency = self._rates[key] = rates.most_common(1)[0][0] if rates else DEFAULT_FREQUENCY
+        return frequency, MIXER_CHANNELS, config.AUDIO_BUFFER * power.current().audio_buffer_scale
+
+    def acquire(self, names):
+        """Open the mixer for names (reopen if the parameters changed); cancels a pending release"""
+        params = self.params_for(names)
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self.open_ms = 0.0
+            if self.params != params or not pygame.mixer.get_init():
+                started = time.perf_counter()
+                if pygame.mixer.get_init():
+                    pygame.mixer.quit()
+                with tracing.span("audio.mixer_init", frequency=params[0], buffer=params[2]):
+                    pygame.mixer.init(params[0], channels=params[1], buffer=params[2])
+                self.params = params
+                self.opens += 1
+                self.open_ms = (time.perf_counter() - started) * 1000
+            return self.open_ms
+
+    def release(self, timeout=None):
+        """Close the mixer after timeout seconds (AUDIO_IDLE_TIMEOUT) unless acquired again"""
+        timeout = config.AUDIO_IDLE_TIMEOUT if timeout is None else timeout
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+            if timeout <= 0:
+                self._timer = None
+                self._close()
+                return
+            self._timer = threading.Timer(timeout, self._expire, args=(self._generation,))
+            self._timer.daemon = True
+            self._timer.name = "audio-idle"
+            self._timer.start()
+
+    def _expire(self, generation):
+        """Idle timer: close unless acquired (or released again) since it was set"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._timer = None
+            self._close()
+
+    def close(self):
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+            self._close()
+
+    def _close(self):
+        if pygame.mixer.get_init():
+            pygame.mixer.quit()
+        self.params = None
+        # Nothing can stream from the music maps now; unmapped so the files
+        # aren't held (or locked, on Windows) until the next break
+        assets.release()
+
+
+class Backend:
+    name = "pygame"
+
+    def __init__(self):
+        self.cache = None
+        self.session = AudioSession()
+        # Play request -> mixer reports the first sample, for the last break
+        self.first_sample_ms = None
+        # Device open cost at that play (0.0 when the warning left it open)
+        self.open_ms = None
+
+    def _cache(self):
+        if self.cache is None:
+            self.cache = loudness.LoudnessCache()
+        return self.cache
+
+    def prepare(self, names):
+        """
+        Measure tracks that are new or changed since they were last measured.
+        Called between breaks; an unchanged file costs one os.stat().
+        """
+        if not config.LOUDNESS_NORMALIZE:
+            return
+        stale = loudness.stale(names, self._cache())
+        if not stale:
+            return
+
+        opened = False
+        try:
+            for name, path in stale:
+                started = time.perf_counter()
+                try:
+                    wav = loudness.wav_chunks(path)
+                    if wav is not None:
+                        # Streamed: one chunk of PCM in memory at a time, no mixer
+                        level = loudness.analyse_chunks(*wav)
+                    else:
+                        # Compressed formats: pygame only decodes whole files
+                        if not opened:
+                            self.session.acquire(names)
+                            opened = True
+                        samples = pygame.sndarray.array(pygame.mixer.Sound(path))
+                        level = loudness.analyse(samples, pygame.mixer.get_init()[0])
+                except Exception as e:
+                    # Remembered, so an undecodable file isn't retried until it changes
+                    print(f"Loudness analysis of '{name}' failed: {e}")
+                    self.cache.store(path, None)
+                    continue
+                self.cache.store(path, level)
+                print(f"Loudness: {name} {level:.1f} dBFS -> volume "
+                      f"{loudness.gain_for(level, config.LOUDNESS_TARGET):.2f} "
+                      f"(analysed in {(time.perf_counter() - started) * 1000:.0f} ms)")
+            self.cache.save()
+        finally:
+            if opened:
+                self.session.release()
+
+    def prewarm(self, names):
+        """
+        Ahead of a break: map and page in the music files and render the
+        ambient fallback, so play() touches no disk and does no NumPy work.
+        Returns the bytes made resident.
+        """
+        kinds = set()
+        for name in names:
+            if name.startswith("ambient:"):
+                kinds.add(name.split(":", 1)[1])
+            elif assets.resolve(name) is None:
+                kinds.add(config.AMBIENT_SOUND)
+        total = assets.touch(names)
+        # Probes the tracks' rates once (forked UI workers inherit the result)
+        frequency, channels, _buffer = self.session.params_for(names)
+        if kinds:
+            from .. import ambient_audio
+            for kind in kinds:
+                ambient_audio.prerender(kind, frequency, channels)
+            total += ambient_audio.touch()
+        return total
+
+    def volume(self, name, level=None):
+        """Mixer volume for a track from its cached loudness (1.0 if unknown)"""
+        if not config.LOUDNESS_NORMALIZE:
+            return 1.0
+        if level is None:
+            path = assets.resolve(name)
+            cache = self._cache()
+            # prepare() may have run in another process (supervisor's UI worker)
+            cache.refresh()
+            if path is None or not cache.fresh(path):
+                return 1.0
+            level = cache.loudness(path)
+            if level is None:
+                return 1.0
+        return loudness.gain_for(level, config.LOUDNESS_TARGET)
+
+    def warm(self, names):
+        """Open the device now (at the warning) so the break starts on a warm mixer"""
+        if power.current().audio == "off":
+            return
+        try:
+            self.session.acquire(names)
+        except pygame.error as e:
+            print(f"Audio device not opened ahead of the break: {e}")
+            return
+        # Released again if the warning is snoozed or the break never comes
+        self.session.release()
+
+    def _wait_first_sample(self, requested, is_music):
+        """ms from the play request until the mixer has consumed audio"""
+        if is_music:
+            deadline = requested + FIRST_SAMPLE_TIMEOUT
+            while pygame.mixer.music.get_pos() <= 0 and time.perf_counter() < deadline:
+                time.sleep(0.002)
+            return (time.perf_counter() - requested) * 1000
+        # Sounds report no position: queued now, audible after one buffer
+        frequency, _channels, buffer = self.session.params
+        return (time.perf_counter() - requested) * 1000 + buffer * 1000 / frequency
+
+    def play(self, cancel, duration, started=None):
+        """
+        Play music and WAIT until cancel fires.
+        Supports multiple music files with random selection.
+        Falls back to generated ambient sound if the file is missing.
+        Sets started (a threading.Event) once the first sample has played
+        or playback failed. Returns False if playback failed.
+        """
+        self.first_sample_ms = None
+        self.open_ms = None
+        if power.current().audio == "off":
+            print("On battery - music disabled (BATTERY_AUDIO = \"off\")")
+            if started is not None:
+                started.set()
+            return
+        requested = time.perf_counter()
+        try:
+            # Get a music file (random selection if multiple available)
+            music_file = get_next_music_file()
+
+            # Warm if the warning opened it; otherwise opened here
+            open_ms = self.open_ms = self.session.acquire(config.MUSIC_FILES)
+
+            # Resolved once at startup, served from memory (no cwd dependence)
+            buffer = None if music_file.startswith("ambient:") else assets.open_buffer(music_file)
+
+            if buffer is None:
+                # numpy is only needed for generated sound
+                from .. import ambient_audio
+                if music_file.startswith("ambient:"):
+                    kind = music_file.split(":", 1)[1]
+                else:
+                    print(f"Music file '{music_file}' not found in {assets.search_dirs()} - using ambient sound")
+                    kind = config.AMBIENT_SOUND
+                # Rendered once per session, then replayed from memory
+                with tracing.span("audio.load", source=f"ambient:{kind}"):
+                    sound = ambient_audio.get_sound(kind)
+                sound.set_volume(self.volume(music_file, ambient_audio.get_level(kind)))
+                sound.play(loops=-1)
+                is_busy = lambda: sound.get_num_channels() > 0
+                restart = lambda: sound.play(loops=-1)
+                self.first_sample_ms = self._wait_first_sample(requested, False)
+                tracing.instant("audio.first_play", ms=self.first_sample_ms)
+                print(f"Ambient sound started: {kind}")
+            else:
+                # Extension tells SDL the format of the in-memory stream
+                with tracing.span("audio.load", source=music_file):
+                    pygame.mixer.music.load(buffer, os.path.splitext(music_file)[1].lstrip("."))
+                pygame.mixer.music.set_volume(self.volume(music_file))
+                pygame.mixer.music.play(-1)  # -1 = loop indefinitely
+                self.first_sample_ms = self._wait_first_sample(requested, True)
+                tracing.instant("audio.first_play", ms=self.first_sample_ms)
+                is_busy = pygame.mixer.music.get_busy
+                restart = lambda: pygame.mixer.music.play(-1)
+                print(f"Music started: {music_file}")
+            if started is not None:
+                started.set()
+            print(f"Audio: first sample after {self.first_sample_ms:.0f} ms "
+                  f"({'warm device' if not open_ms else f'device opened in {open_ms:.0f} ms'}, "
+                  f"{self.session.params[0]} Hz, buffer {self.session.params[2]})")
+
+            # Play until the blackout closes (cancel wakes us at once);
+            # the duration limit is only a safety net if the UI died
+            deadline = time.monotonic() + duration + 5
+            poll = power.current().music_poll
+            while not cancel.wait(poll) and time.monotonic() < deadline:
+                power.count_wakeup("music")
+                if not is_busy():
+                    # Music stopped, restart it
+                    restart()
+
+        except Exception as e:
+            print(f"Music playback error: {e}")
+            return False
+        finally:
+            if started is not None:
+                started.set()
+            try:
+                pygame.mixer.music.stop()
+                pygame.mixer.stop()
+                pygame.mixer.music.unload()
+            except:
+                pass
+            # Device stays open for AUDIO_IDLE_TIMEOUT, then is released
+            self.session.release()
+
+    def shutdown(self):
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+        self.session.close()
@@ -0,0 +1,23 @@
+"""Silent audio backend: breaks without music."""
+
+
+class Backend:
+    name = "none"
+    first_sample_ms = None
+    open_ms = None
+
+    def prepare(self, names):
+        pass
+
+    def prewarm(self, names):
+        return 0
+
+    def warm(self, names):
+        pass
+
+    def play(self, cancel, duration, started=None):
+        if started is not None:
+            started.set()
+
+    def shutdown(self):
+        pass
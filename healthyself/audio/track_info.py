@@ -0,0 +1,76 @@
+"""
+Native sample rate of a music file, read from its header (stdlib only).
+
+Used to open the mixer at the tracks' own rate, so SDL_mixer doesn't
+resample every buffer on the way to the device. Only the first few KB of
+a file are read. Supports WAV, MP3, Ogg Vorbis and FLAC; anything else
+(or a damaged header) gives None.
+"""
+import os
+import wave
+import struct
+
+# MPEG version bits -> sample rates by index
+_MP3_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_SCAN_BYTES = 64 * 1024
+
+
+def _wav_rate(path):
+    with wave.open(path, "rb") as w:
+        return w.getframerate()
+
+
+def _mp3_rate(f):
+    head = f.read(10)
+    offset = 0
+    if head[:3] == b"ID3" and len(head) == 10:
+        # Syncsafe tag size, plus the footer if the flag says so
+        size = (head[6] & 0x7F) << 21 | (head[7] & 0x7F) << 14 | (head[8] & 0x7F) << 7 | (head[9] & 0x7F)
+        offset = 10 + size + (10 if head[5] & 0x10 else 0)
+    f.seek(offset)
+    data = f.read(_SCAN_BYTES)
+    for i in range(len(data) - 3):
+        if data[i] != 0xFF or data[i + 1] & 0xE0 != 0xE0:
+            continue
+        version = (data[i + 1] >> 3) & 3
+        layer = (data[i + 1] >> 1) & 3
+        bitrate = data[i + 2] >> 4
+        index = (data[i + 2] >> 2) & 3
+        if version != 1 and layer != 0 and index != 3 and bitrate != 0xF:
+            return _MP3_RATES[version][index]
+    return None
+
+
+def _ogg_rate(f):
+    data = f.read(_SCAN_BYTES)
+    at = data.find(b"\x01vorbis")
+    if not data.startswith(b"OggS") or at < 0 or len(data) < at + 16:
+        return None
+    # version (4), channels (1), then the rate
+    return struct.unpack_from("<I", data, at + 12)[0]
+
+
+def _flac_rate(f):
+    data = f.read(4 + 4 + 18)
+    if data[:4] != b"fLaC" or len(data) < 26:
+        return None
+    # STREAMINFO: 20-bit rate after min/max block and frame sizes
+    return (data[18] << 12 | data[19] << 4 | data[20] >> 4) or None
+
+
+def sample_rate(path):
+    """Native sample rate in Hz, or None if it can't be read"""
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == ".wav":
+            return _wav_rate(path)
+        with open(path, "rb") as f:
+            if ext == ".mp3":
+                return _mp3_rate(f)
+            if ext in (".ogg", ".oga"):
+                return _ogg_rate(f)
+            if ext == ".flac":
+                return _flac_rate(f)
+    except (OSError, EOFError, wave.Error, struct.error):
+        return None
+    return None
@@ -0,0 +1,81 @@
+"""
+Blackout renderer benchmark: Tk (singlescreen / multimonitor) vs SDL.
+
+Runs short silent blackouts through the real BreakEnforcer on each
+display backend and reports per backend:
+
+    time-to-black   blackout start -> every window painted (median, max)
+    CPU             process CPU time per second of blackout
+
+and names the fastest backend for this machine, to put in
+DISPLAY_BACKEND in config.py.
+
+Usage:
+    python -m healthyself.blackout_bench
+    python -m healthyself.blackout_bench --runs 10 --seconds 5 --backends singlescreen,sdl
+    xvfb-run -a python -m healthyself.blackout_bench      # Linux, headless
+"""
+import os
+import sys
+import argparse
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "hide")
+
+from . import display, audio
+from .enforcer import BreakEnforcer
+
+
+def run_backend(name, runs, seconds):
+    """[(time_to_black_ms, cpu_ms_per_second)] for one backend"""
+    backend = display.get(name)
+    silent = audio.get("none")
+    results = []
+    for _ in range(runs):
+        enforcer = BreakEnforcer(seconds, display_backend=backend, audio_backend=silent)
+        enforcer.enforce()
+        results.append((enforcer.time_to_black_ms, enforcer.blackout_cpu_ms / seconds))
+    return results
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare blackout time-to-black and CPU per display backend")
+    parser.add_argument("--runs", type=int, default=5, help="blackouts per backend")
+    parser.add_argument("--seconds", type=float, default=3.0, help="length of each blackout")
+    parser.add_argument("--backends", default="multimonitor,sdl",
+                        help=f"comma-separated, from: {', '.join(display.BACKENDS)}")
+    args = parser.parse_args(argv)
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        print("No DISPLAY - run under a virtual display, e.g. xvfb-run -a python -m healthyself.blackout_bench")
+        return 2
+
+    summary = {}
+    for name in args.backends.split(","):
+        try:
+            results = run_backend(name, args.runs, args.seconds)
+        except (ImportError, ValueError) as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        painted = [ms for ms, _ in results if ms is not None]
+        if not painted:
+            print(f"Skipping {name}: no window was ever painted")
+            continue
+        summary[name] = (median(painted), max(painted), median([cpu for _, cpu in results]))
+
+    if not summary:
+        return 1
+    print(f"\n{'Backend':<14} {'Black (med)':>12} {'Black (max)':>12} {'CPU ms/s':>10}")
+    for name, (med, worst, cpu) in summary.items():
+        print(f"{name:<14} {med:>10.1f}ms {worst:>10.1f}ms {cpu:>10.2f}")
+    fastest = min(summary, key=lambda n: summary[n][0])
+    print(f"\nFastest time-to-black on {sys.platform}: {fastest} (DISPLAY_BACKEND = \"{fastest}\")")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Columnar break-history store and compliance query CLI.
+
+Every break event (taken, snoozed or skipped) is appended to a set of
+fixed-width column files, one file per field. Loading a year of history is
+a handful of array.frombytes() calls, so queries never parse text logs.
+
+Usage:
+    python -m healthyself.break_history daily   [--days 30]
+    python -m healthyself.break_history weekly  [--weeks 12]
+    python -m healthyself.break_history snooze
+    python -m healthyself.break_history histogram --column duration
+"""
+import os
+import sys
+import time
+import argparse
+from array import array
+
+# ============================================================
+# STORAGE LOCATION
+# One directory, one file per column (raw little-endian arrays)
+# ============================================================
+DEFAULT_HISTORY_DIR = os.path.join(os.path.expanduser("~"), ".disengage", "history")
+
+# Break types
+BREAK_SHORT = 0
+BREAK_LONG = 1
+BREAK_MICRO = 2
+BREAK_NAMES = {BREAK_SHORT: "short", BREAK_LONG: "long", BREAK_MICRO: "micro"}
+
+# Outcomes
+OUTCOME_TAKEN = 0       # OK pressed or warning timed out
+OUTCOME_SNOOZED = 1     # 15/30/60 min snooze chosen, break enforced afterwards
+OUTCOME_SKIPPED = 2     # Skipped by SKIP_THRESHOLD or a break rule (BREAK_RULES)
+OUTCOME_NAMES = {OUTCOME_TAKEN: "taken", OUTCOME_SNOOZED: "snoozed", OUTCOME_SKIPPED: "skipped"}
+
+# Column name -> array typecode
+COLUMNS = (
+    ("timestamp", "d"),     # epoch seconds when the break was decided
+    ("break_type", "B"),
+    ("outcome", "B"),
+    ("snooze", "H"),        # snooze length in seconds (0 if none)
+    ("duration", "f"),      # actual enforced duration in seconds
+)
+
+
+class BreakHistory:
+    """Append-only columnar store of break events"""
+
+    def __init__(self, directory=DEFAULT_HISTORY_DIR):
+        self.directory = directory
+        self.columns = {name: array(code) for name, code in COLUMNS}
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.col")
+
+    def __len__(self):
+        return len(self.columns["timestamp"])
+
+    def _align(self):
+        """Truncate every column file to the number of whole rows they all hold"""
+        sizes = {}
+        for name, code in COLUMNS:
+            try:
+                sizes[name] = os.path.getsize(self._path(name))
+            except FileNotFoundError:
+                sizes[name] = 0
+        rows = min(sizes[name] // array(code).itemsize for name, code in COLUMNS)
+        for name, code in COLUMNS:
+            if sizes[name] != rows * array(code).itemsize:
+                os.truncate(self._path(name), rows * array(code).itemsize)
+
+    def append(self, break_type, outcome, snooze=0, duration=0.0, timestamp=None):
+        """
+        Append one event to memory and to the column files on disk.
+        Each column is written with a single small append, after cutting
+        any torn row (a crash mid-append) so the columns line up again.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        row = {
+            "timestamp": timestamp,
+            "break_type": break_type,
+            "outcome": outcome,
+            "snooze": int(snooze),
+            "duration": duration,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        self._align()
+        for name, code in COLUMNS:
+            value = array(code, [row[name]])
+            self.columns[name].extend(value)
+            with open(self._path(name), "ab") as f:
+                value.tofile(f)
+
+    def load(self):
+        """
+        Load all column files. If a crash left the columns at different
+        lengths, every column is truncated to the shortest one.
+        """
+        for name, code in COLUMNS:
+            col = array(code)
+            try:
+                with open(self._path(name), "rb") as f:
+                    data = f.read()
+                usable = len(data) - len(data) % col.itemsize
+                col.frombytes(data[:usable])
+            except FileNotFoundError:
+                pass
+            self.columns[name] = col
+
+        rows = min(len(col) for col in self.columns.values())
+        for name in self.columns:
+            del self.columns[name][rows:]
+        return self
+
+    def since(self, start_ts):
+        """Return index of the first event at or after start_ts (timestamps are sorted)"""
+        ts = self.columns["timestamp"]
+        lo, hi = 0, len(ts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ts[mid] < start_ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+def record_break(break_type, outcome, snooze=0, duration=0.0, directory=DEFAULT_HISTORY_DIR, timestamp=None):
+    """
+    Convenience helper for main_loop - never lets history I/O break the scheduler.
+    timestamp is when the break was decided; the row is written once it is over.
+    """
+    try:
+        BreakHistory(directory).append(break_type, outcome, snooze, duration, timestamp)
+    except OSError as e:
+        print(f"Break history write error: {e}")
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def _bucket_counts(history, start, bucket_key):
+    """Count taken/snoozed/skipped per bucket for events from index start (micro-breaks excluded)"""
+    ts = history.columns["timestamp"]
+    outcome = history.columns["outcome"]
+    kind = history.columns["break_type"]
+    buckets = {}
+    for i in range(start, len(ts)):
+        if kind[i] == BREAK_MICRO:
+            continue
+        key = bucket_key(ts[i])
+        counts = buckets.get(key)
+        if counts is None:
+            counts = buckets[key] = [0, 0, 0]
+        counts[outcome[i]] += 1
+    return buckets
+
+
+def compliance(taken, snoozed):
+    """Fraction of triggered breaks taken on time (skips are policy, not user choice)"""
+    due = taken + snoozed
+    return taken / due if due else 1.0
+
+
+def daily_compliance(history, days=30, now=None):
+    now = time.time() if now is None else now
+    start = history.since(now - days * 86400)
+    return _bucket_counts(history, start, lambda t: time.strftime("%Y-%m-%d", time.localtime(t)))
+
+
+def weekly_compliance(history, weeks=12, now=None):
+    now = time.time() if now is None else now
+    start = history.since(now - weeks * 7 * 86400)
+    return _bucket_counts(history, start, lambda t: time.strftime("%G-W%V", time.localtime(t)))
+
+
+def snooze_rates(history):
+    """Snooze counts per snooze length and per break type"""
+    outcome = history.columns["outcome"]
+    snooze = history.columns["snooze"]
+    kind = history.columns["break_type"]
+    by_length = {}
+    triggered = {}
+    snoozed = {}
+    for i in range(len(outcome)):
+        if outcome[i] == OUTCOME_SKIPPED:
+            continue
+        triggered[kind[i]] = triggered.get(kind[i], 0) + 1
+        if outcome[i] == OUTCOME_SNOOZED:
+            snoozed[kind[i]] = snoozed.get(kind[i], 0) + 1
+            by_length[snooze[i]] = by_length.get(snooze[i], 0) + 1
+    return by_length, {k: (snoozed.get(k, 0), n) for k, n in triggered.items()}
+
+
+def histogram(history, column, bin_width):
+    """Fixed-width histogram of a numeric column"""
+    if column == "hour":
+        values = [time.localtime(t).tm_hour for t in history.columns["timestamp"]]
+        bin_width = 1
+    else:
+        values = history.columns[column]
+    bins = {}
+    for v in values:
+        b = int(v // bin_width)
+        bins[b] = bins.get(b, 0) + 1
+    return {b * bin_width: n for b, n in sorted(bins.items())}
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def _print_buckets(buckets):
+    print(f"{'Period':<12} {'Taken':>6} {'Snoozed':>8} {'Skipped':>8} {'Compliance':>11}")
+    for key in sorted(buckets):
+        taken, snoozed, skipped = buckets[key]
+        print(f"{key:<12} {taken:>6} {snoozed:>8} {skipped:>8} {compliance(taken, snoozed):>10.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the break history store")
+    parser.add_argument("--dir", default=DEFAULT_HISTORY_DIR, help="history directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("daily", help="daily compliance")
+    p.add_argument("--days", type=int, default=30)
+    p = sub.add_parser("weekly", help="weekly compliance")
+    p.add_argument("--weeks", type=int, default=12)
+    sub.add_parser("snooze", help="snooze rates by length and break type")
+    p = sub.add_parser("histogram", help="histogram of a column")
+    p.add_argument("--column", choices=["duration", "snooze", "hour"], default="duration")
+    p.add_argument("--bin", type=float, default=60.0, help="bin width in seconds")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    history = BreakHistory(args.dir).load()
+
+    if args.command == "daily":
+        _print_buckets(daily_compliance(history, args.days))
+    elif args.command == "weekly":
+        _print_buckets(weekly_compliance(history, args.weeks))
+    elif args.command == "snooze":
+        by_length, by_type = snooze_rates(history)
+        for kind, (snoozed, triggered) in sorted(by_type.items()):
+            print(f"{BREAK_NAMES.get(kind, kind):<6} snoozed {snoozed}/{triggered} ({snoozed / triggered:.0%})")
+        for length, n in sorted(by_length.items()):
+            print(f"  {length // 60:>3} min: {n}")
+    else:
+        for start, n in histogram(history, args.column, args.bin).items():
+            print(f"{start:>8g} | {'#' * min(n, 60)} {n}")
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"\n{len(history)} events, query took {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Break lifecycle plugin hooks.
+
+Plugins react to break events (chat presence, smart lights, time tracking)
+without ever touching the UI path. emit() only drops a job on a bounded
+queue and returns; handlers run on a small pool of daemon worker threads.
+
+Events:
+    warning      - DisengagePopup is about to show   (break_type)
+    snooze       - user picked 15/30/60 min           (break_type, snooze)
+    break_start  - blackout + music starting          (break_type, duration)
+    break_end    - blackout closed                    (break_type, duration, actual)
+
+Writing a plugin (drop a .py file into PLUGIN_DIR):
+
+    from healthyself.break_hooks import hook
+
+    @hook("break_start", timeout=3.0)
+    def set_away(event, break_type, duration, **_):
+        requests.post("https://chat.example/presence", json={"status": "away"})
+
+A handler that runs past its timeout is reported and its worker is replaced,
+so one hung plugin can't starve the others. A watchdog thread sleeps until
+the earliest running handler's deadline (indefinitely while none runs), so
+a hang is caught when it happens, not at the next emit(). A replaced thread
+that finally returns exits and frees its slot. If the queue is full, events are
+dropped (and counted) rather than delaying the break.
+"""
+import os
+import sys
+import time
+import queue
+import threading
+import importlib.util
+
+EVENTS = ("warning", "snooze", "break_start", "break_end")
+
+DEFAULT_TIMEOUT = 2.0       # seconds per handler call
+DEFAULT_WORKERS = 2
+QUEUE_SIZE = 64
+MAX_REPLACEMENTS = 8        # cap on hung threads alive at once (each has a replacement)
+
+
+class HookStats:
+    """Latency and failure counters for one handler"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms, timeout, failed):
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if failed:
+            self.errors += 1
+        if ms > timeout * 1000:
+            self.timeouts += 1
+
+
+class _Worker:
+    def __init__(self, manager, index):
+        self.manager = manager
+        self.current = None         # (hook, started) while running a handler
+        self.abandoned = False
+        self.thread = threading.Thread(target=self._run, name=f"break-hook-{index}", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.abandoned:
+            job = self.manager.jobs.get()
+            if job is None:
+                return
+            hook, event, payload = job
+            with self.manager.watch:
+                self.current = (hook, time.monotonic())
+                # The watchdog re-arms for this handler's deadline
+                self.manager.watch.notify()
+            failed = False
+            started = time.perf_counter()
+            try:
+                hook.func(event, **payload)
+            except Exception as e:
+                failed = True
+                print(f"Plugin hook '{hook.name}' failed on {event}: {e}")
+            ms = (time.perf_counter() - started) * 1000
+            with self.manager.lock:
+                self.current = None
+                hook.stats.record(ms, hook.timeout, failed)
+                if self.abandoned:
+                    self.manager.stuck -= 1
+                    self.manager.watch.notify()
+                    print(f"Plugin hook '{hook.name}' returned after {ms / 1000:.1f}s - replaced thread exits")
+
+
+class _Hook:
+    def __init__(self, func, timeout, name):
+        self.func = func
+        self.timeout = timeout
+        self.name = name
+        self.stats = HookStats(name)
+
+
+class HookManager:
+    """Registry of handlers plus the worker pool that runs them"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, queue_size=QUEUE_SIZE):
+        self.hooks = {event: [] for event in EVENTS}
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.watch = threading.Condition(self.lock)
+        self.worker_count = workers
+        self.workers = []
+        self.spawned = 0
+        self.stuck = 0              # abandoned workers still inside a handler
+        self.dropped = 0
+        self.hung = 0
+        self._watchdog = None
+
+    def register(self, event, func, timeout=DEFAULT_TIMEOUT, name=None):
+        if event not in self.hooks:
+            raise ValueError(f"Unknown break event '{event}' (expected one of {', '.join(EVENTS)})")
+        name = name or f"{getattr(func, '__module__', '?')}.{getattr(func, '__name__', 'hook')}"
+        self.hooks[event].append(_Hook(func, timeout, name))
+        return func
+
+    def hook(self, event, timeout=DEFAULT_TIMEOUT, name=None):
+        """Decorator form of register()"""
+        def decorator(func):
+            return self.register(event, func, timeout, name)
+        return decorator
+
+    def _ensure_workers(self):
+        with self.lock:
+            self._replace_hung()
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(target=self._watch, name="break-hook-watchdog", daemon=True)
+                self._watchdog.start()
+
+    def _watch(self):
+        """Sleep until the earliest running handler's deadline, then replace hung workers"""
+        with self.watch:
+            while True:
+                # Overdue handlers left in place by the cap wait for a stuck thread to return
+                now = time.monotonic()
+                deadlines = [d for d in (w.current[1] + w.current[0].timeout for w in self.workers if w.current)
+                             if d > now]
+                self.watch.wait(min(deadlines) - now if deadlines else None)
+                self._replace_hung()
+
+    def _replace_hung(self):
+        # Called with the lock held
+        now = time.monotonic()
+        for worker in self.workers:
+            current = worker.current
+            if current and now - current[1] > current[0].timeout:
+                if self.stuck >= MAX_REPLACEMENTS:
+                    # Leave it in the pool; retried once a stuck thread returns
+                    break
+                worker.abandoned = True
+                self.hung += 1
+                self.stuck += 1
+                print(f"Plugin hook '{current[0].name}' exceeded {current[0].timeout:.1f}s - worker replaced")
+        self.workers = [w for w in self.workers if not w.abandoned]
+        while len(self.workers) < self.worker_count:
+            self.workers.append(_Worker(self, self.spawned))
+            self.spawned += 1
+
+    def emit(self, event, **payload):
+        """Queue handlers for an event; never blocks the caller"""
+        handlers = self.hooks.get(event)
+        if not handlers:
+            return
+        self._ensure_workers()
+        for hook in handlers:
+            try:
+                self.jobs.put_nowait((hook, event, payload))
+            except queue.Full:
+                self.dropped += 1
+
+    def load_plugins(self, directory):
+        """Import every .py file in directory; each registers its own hooks"""
+        if not directory or not os.path.isdir(directory):
+            return []
+        loaded = []
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".py") or filename.startswith("_"):
+                continue
+            path = os.path.join(directory, filename)
+            module_name = f"disengage_plugin_{filename[:-3]}"
+            try:
+                spec = importlib.util.spec_from_file_location(module_name, path)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = module
+                spec.loader.exec_module(module)
+                loaded.append(filename)
+            except Exception as e:
+                print(f"Plugin '{filename}' failed to load: {e}")
+        return loaded
+
+    def report(self):
+        """Per-hook latency table"""
+        lines = [f"{'Hook':<40} {'Calls':>6} {'Avg ms':>8} {'Max ms':>8} {'Timeouts':>9} {'Errors':>7}"]
+        with self.lock:
+            for event in EVENTS:
+                for hook in self.hooks[event]:
+                    s = hook.stats
+                    avg = s.total_ms / s.calls if s.calls else 0.0
+                    lines.append(f"{event + ':' + s.name:<40} {s.calls:>6} {avg:>8.1f} {s.max_ms:>8.1f} "
+                                 f"{s.timeouts:>9} {s.errors:>7}")
+        lines.append(f"queued {self.jobs.qsize()}, dropped {self.dropped}, hung workers {self.hung} "
+                     f"({self.stuck} still running)")
+        return "\n".join(lines)
+
+
+# ============================================================
+# DEFAULT MANAGER - what plugins and main_loop use
+# ============================================================
+manager = HookManager()
+register = manager.register
+hook = manager.hook
+emit = manager.emit
+load_plugins = manager.load_plugins
+report = manager.report
@@ -0,0 +1,309 @@
+"""
+Break rules: a small declarative language compiled into a decision table.
+
+Rules are plain strings in BREAK_RULES (config.py), one per entry:
+
+    no breaks 12:00-13:00                  no short breaks on fri
+    no long breaks 22:00-06:00 on mon-fri  weekends off
+    sat,sun off                            only long breaks after 18:00
+    only long breaks before 09:30          only short breaks 14:00-15:00 on wed
+    max 2 snoozes per day                  skip short breaks within 25 min of a long break
+
+Days: mon..sun, ranges (mon-fri), lists (sat,sun), weekdays, weekends,
+daily. Times are local HH:MM; a range may wrap midnight (22:00-06:00)
+and 24:00 ends a day.
+
+At load time the window rules are compiled into one byte per minute of
+the week and per break kind (short, long, micro): 0 when the break may
+happen, otherwise the number of the first rule that blocks it. Deciding
+a break is a single index into that table, and the same byte explains
+the decision. A second table holds, per minute, how long until the kind
+is allowed again.
+
+    python -m healthyself.break_rules show                      # compiled weekly windows
+    python -m healthyself.break_rules why "2026-10-20 12:30"    # why a break was skipped
+"""
+import re
+import sys
+import time
+import argparse
+from array import array
+from collections import namedtuple
+
+from . import config
+
+KINDS = ("short", "long", "micro")
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+NEVER = 0xFFFF          # reopen distance when a kind is blocked all week
+MAX_RULES = 255         # rule numbers are stored in one byte
+
+# rule: number of the blocking rule, 0 when not blocked by a window rule
+Decision = namedtuple("Decision", "allowed reason reopens_at rule")
+ALLOWED = Decision(True, None, None, 0)
+
+_TIME = r"(\d{1,2}):(\d{2})"
+_KIND = r"(?:(short|long|micro) )?breaks"
+_DAYSPEC = r"(?: on ([a-z,\-]+))?"
+_WINDOW = re.compile(rf"no {_KIND}(?: {_TIME}-{_TIME})?{_DAYSPEC}$")
+_OFF = re.compile(r"([a-z,\-]+) off$")
+_ONLY = re.compile(rf"only (short|long|micro) breaks (?:(after|before) {_TIME}|{_TIME}-{_TIME}){_DAYSPEC}$")
+_SNOOZES = re.compile(r"max (\d+) snoozes? per day$")
+_SKIP = re.compile(r"skip short breaks within (\d+) min(?:utes)? of a long break$")
+
+
+class RuleError(ValueError):
+    """A rule that does not parse"""
+
+
+def _minute(hours, minutes, rule):
+    hours, minutes = int(hours), int(minutes)
+    if hours > 24 or minutes > 59 or (hours == 24 and minutes):
+        raise RuleError(f"Bad time {hours}:{minutes:02d} in rule '{rule}'")
+    return hours * 60 + minutes
+
+
+def _days(spec, rule):
+    """Set of weekday numbers (0 = Monday) for a day spec; all days when spec is None"""
+    if spec is None or spec == "daily":
+        return set(range(7))
+    if spec == "weekdays":
+        return set(range(5))
+    if spec == "weekends":
+        return {5, 6}
+    days = set()
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        if first not in DAYS or (last and last not in DAYS):
+            raise RuleError(f"Unknown day '{part}' in rule '{rule}' (use {', '.join(DAYS)})")
+        start, end = DAYS.index(first), DAYS.index(last or first)
+        days.update(range(start, end + 1) if start <= end else list(range(start, 7)) + list(range(end + 1)))
+    return days
+
+
+def _minutes_of_week(days, start, end):
+    """Minute-of-week slots for [start, end) on each day; wraps past midnight"""
+    if start == end:
+        start, end = 0, DAY_MINUTES
+    for day in days:
+        base = day * DAY_MINUTES
+        if start < end:
+            yield from range(base + start, base + end)
+        else:
+            yield from range(base + start, base + DAY_MINUTES)
+            for minute in range(end):
+                yield (base + DAY_MINUTES + minute) % WEEK_MINUTES
+
+
+def parse(rule):
+    """
+    One rule -> ("window", kinds, slots) | ("snoozes", n) | ("skip", seconds).
+    Raises RuleError for anything it does not understand.
+    """
+    text = " ".join(rule.lower().split())
+    match = _WINDOW.match(text)
+    if match:
+        kind, h1, m1, h2, m2, days = match.groups()
+        if h1 is None and days is None:
+            raise RuleError(f"Rule '{rule}' needs a time range or days")
+        start, end = (_minute(h1, m1, rule), _minute(h2, m2, rule)) if h1 else (0, DAY_MINUTES)
+        kinds = (kind,) if kind else KINDS
+        return "window", kinds, _minutes_of_week(_days(days, rule), start, end)
+    match = _OFF.match(text)
+    if match:
+        return "window", KINDS, _minutes_of_week(_days(match.group(1), rule), 0, DAY_MINUTES)
+    match = _ONLY.match(text)
+    if match:
+        kind, side, h1, m1, h2, m2, h3, m3, days = match.groups()
+        if side == "after":
+            start, end = _minute(h1, m1, rule), DAY_MINUTES
+        elif side == "before":
+            start, end = 0, _minute(h1, m1, rule)
+        else:
+            start, end = _minute(h2, m2, rule), _minute(h3, m3, rule)
+        others = tuple(k for k in KINDS if k != kind)
+        return "window", others, _minutes_of_week(_days(days, rule), start, end)
+    match = _SNOOZES.match(text)
+    if match:
+        return "snoozes", int(match.group(1))
+    match = _SKIP.match(text)
+    if match:
+        return "skip", int(match.group(1)) * 60
+    raise RuleError(f"Unknown break rule '{rule}'")
+
+
+class RuleTable:
+    """Break rules compiled into per-minute-of-week lookup tables"""
+
+    def __init__(self, rules=(), skip_threshold=None):
+        if len(rules) > MAX_RULES:
+            raise RuleError(f"At most {MAX_RULES} break rules")
+        self.rules = list(rules)
+        self.max_snoozes = None
+        self.skip_threshold = config.SKIP_THRESHOLD if skip_threshold is None else skip_threshold
+        self.blocker = {kind: bytearray(WEEK_MINUTES) for kind in KINDS}
+        for number, rule in enumerate(self.rules, 1):
+            parsed = parse(rule)
+            if parsed[0] == "snoozes":
+                self.max_snoozes = parsed[1]
+            elif parsed[0] == "skip":
+                self.skip_threshold = parsed[1]
+            else:
+                _, kinds, slots = parsed
+                tables = [self.blocker[kind] for kind in kinds]
+                for slot in slots:
+                    for table in tables:
+                        # First rule wins, so the explanation names it
+                        if not table[slot]:
+                            table[slot] = number
+        self.reopen = {kind: self._reopen_distances(self.blocker[kind]) for kind in KINDS}
+
+    @staticmethod
+    def _reopen_distances(blocker):
+        """Minutes from each slot to the next allowed slot (0 if allowed), wrapping the week"""
+        distances = array("H", [NEVER]) * WEEK_MINUTES
+        allowed_at = None
+        for index in range(2 * WEEK_MINUTES - 1, -1, -1):
+            slot = index % WEEK_MINUTES
+            if not blocker[slot]:
+                allowed_at = index
+            if index < WEEK_MINUTES and allowed_at is not None:
+                distances[slot] = allowed_at - index
+        return distances
+
+    @staticmethod
+    def _slot(when):
+        t = time.localtime(when)
+        return t.tm_wday * DAY_MINUTES + t.tm_hour * 60 + t.tm_min
+
+    def decide(self, kind, when=None, time_until_long=None):
+        """May a break of kind happen at when? Pass time_until_long (s) for short breaks"""
+        when = time.time() if when is None else when
+        slot = self._slot(when)
+        number = self.blocker[kind][slot]
+        if number:
+            distance = self.reopen[kind][slot]
+            reopens = None if distance == NEVER else (when - when % 60) + distance * 60
+            return Decision(False, f'rule {number}: "{self.rules[number - 1]}"', reopens, number)
+        if kind == "short" and time_until_long is not None and time_until_long <= self.skip_threshold:
+            return Decision(False, f"long break in {time_until_long // 60:.0f} min "
+                                   f"(skip threshold {self.skip_threshold // 60} min)", None, 0)
+        return ALLOWED
+
+    def explain(self, kind, when=None, time_until_long=None):
+        """One line saying whether and why a break of kind is skipped at when"""
+        when = time.time() if when is None else when
+        decision = self.decide(kind, when, time_until_long)
+        stamp = time.strftime("%a %H:%M", time.localtime(when))
+        if decision.allowed:
+            return f"{kind} break at {stamp}: allowed"
+        text = f"{kind} break at {stamp}: skipped by {decision.reason}"
+        if decision.reopens_at:
+            text += f" (allowed again {time.strftime('%a %H:%M', time.localtime(decision.reopens_at))})"
+        return text
+
+    def snooze_allowed(self, snoozes_today):
+        return self.max_snoozes is None or snoozes_today < self.max_snoozes
+
+    def windows(self, kind):
+        """[(start, end, rule number)] blocked minute-of-week ranges for kind"""
+        blocker = self.blocker[kind]
+        result = []
+        start = None
+        for slot in range(WEEK_MINUTES + 1):
+            number = blocker[slot] if slot < WEEK_MINUTES else 0
+            if start is not None and number != blocker[start]:
+                result.append((start, slot, blocker[start]))
+                start = None
+            if start is None and number:
+                start = slot
+        return result
+
+
+class SnoozeCounter:
+    """Snoozes taken today, seeded from break history so restarts don't reset it"""
+
+    def __init__(self, history_dir=None):
+        self.day = None
+        self.count = 0
+        if history_dir:
+            self._seed(history_dir)
+
+    @staticmethod
+    def _today(when):
+        return time.localtime(when)[:3]
+
+    def _seed(self, history_dir):
+        from .break_history import BreakHistory, OUTCOME_SNOOZED
+        now = time.time()
+        t = time.localtime(now)
+        midnight = now - (t.tm_hour * 3600 + t.tm_min * 60 + t.tm_sec)
+        try:
+            history = BreakHistory(history_dir).load()
+        except OSError:
+            return
+        outcome = history.columns["outcome"]
+        self.day = self._today(now)
+        self.count = sum(1 for i in range(history.since(midnight), len(history))
+                         if outcome[i] == OUTCOME_SNOOZED)
+
+    def today(self, when=None):
+        when = time.time() if when is None else when
+        if self._today(when) != self.day:
+            self.day, self.count = self._today(when), 0
+        return self.count
+
+    def record(self, when=None):
+        self.today(when)
+        self.count += 1
+
+
+def load(rules=None):
+    """RuleTable for BREAK_RULES (or the given rules)"""
+    return RuleTable(config.BREAK_RULES if rules is None else rules)
+
+
+def _format_slot(slot):
+    day, minute = divmod(slot, DAY_MINUTES)
+    return f"{DAYS[day % 7]} {minute // 60:02d}:{minute % 60:02d}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the compiled break rules")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="blocked windows per break kind")
+    why = sub.add_parser("why", help="explain the decision for a break at a given time")
+    why.add_argument("at", nargs="?", help='local time "YYYY-MM-DD HH:MM" (default: now)')
+    why.add_argument("--kind", choices=KINDS, help="only this kind")
+    args = parser.parse_args(argv)
+
+    try:
+        table = load()
+    except RuleError as e:
+        print(e)
+        return 1
+    for number, rule in enumerate(table.rules, 1):
+        print(f"  {number}. {rule}")
+    if not table.rules:
+        print("No BREAK_RULES configured")
+
+    if args.command == "show":
+        for kind in KINDS:
+            windows = table.windows(kind)
+            print(f"\n{kind}:" + ("" if windows else " never blocked"))
+            for start, end, number in windows:
+                print(f"  {_format_slot(start)} - {_format_slot(end)}  rule {number}")
+        if table.max_snoozes is not None:
+            print(f"\nSnoozes: at most {table.max_snoozes} per day")
+        print(f"Short breaks skipped within {table.skip_threshold // 60} min of a long break")
+        return 0
+
+    when = time.time() if args.at is None else time.mktime(time.strptime(args.at, "%Y-%m-%d %H:%M"))
+    for kind in ([args.kind] if args.kind else KINDS):
+        print(table.explain(kind, when))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
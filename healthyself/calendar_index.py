@@ -0,0 +1,385 @@
+"""
+Calendar-aware break suppression.
+
+Reads local ICS calendar files and answers "am I in a meeting right now, and
+until when?" for each break decision. Events are merged into a sorted list of
+disjoint busy intervals, so a lookup is a single bisect (O(log n)).
+
+The index is rebuilt only when a calendar file changes (mtime/size) or the
+query time leaves the expansion window. Recurring events are expanded only
+inside that window (a few days around now), never for years ahead.
+
+Supported: DTSTART/DTEND/DURATION (UTC, TZID or floating local time),
+RRULE FREQ=DAILY/WEEKLY with INTERVAL, COUNT, UNTIL and BYDAY, EXDATE,
+RECURRENCE-ID overrides, STATUS:CANCELLED and TRANSP:TRANSPARENT.
+All-day events are ignored (they rarely mean "presenting right now").
+
+Recurrences are expanded in the event's own wall time: a weekly 09:00
+meeting stays at 09:00 across a DST change, whether its TZID names a zone or
+it is floating (no TZID: local time of this machine, converted to epoch per
+occurrence). TZIDs are IANA names, Windows zone names (Outlook exports) or
+vendor-prefixed IANA names ("/mozilla.org/.../Europe/Berlin"); any other
+TZID is read as local time with a warning, once per name.
+"""
+import os
+import re
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8
+    ZoneInfo = None
+
+# Expansion window around the query time
+WINDOW_BEHIND = timedelta(days=1)
+WINDOW_AHEAD = timedelta(days=7)
+
+_WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+# Windows time zone names (Outlook/Exchange TZIDs) -> IANA, the common ones (CLDR windowsZones)
+WINDOWS_ZONES = {
+    "UTC": "UTC",
+    "GMT Standard Time": "Europe/London",
+    "Greenwich Standard Time": "Atlantic/Reykjavik",
+    "W. Europe Standard Time": "Europe/Berlin",
+    "Central Europe Standard Time": "Europe/Budapest",
+    "Central European Standard Time": "Europe/Warsaw",
+    "Romance Standard Time": "Europe/Paris",
+    "E. Europe Standard Time": "Europe/Chisinau",
+    "FLE Standard Time": "Europe/Kiev",
+    "GTB Standard Time": "Europe/Bucharest",
+    "Russian Standard Time": "Europe/Moscow",
+    "Turkey Standard Time": "Europe/Istanbul",
+    "Israel Standard Time": "Asia/Jerusalem",
+    "South Africa Standard Time": "Africa/Johannesburg",
+    "Arabian Standard Time": "Asia/Dubai",
+    "India Standard Time": "Asia/Kolkata",
+    "SE Asia Standard Time": "Asia/Bangkok",
+    "China Standard Time": "Asia/Shanghai",
+    "Singapore Standard Time": "Asia/Singapore",
+    "Tokyo Standard Time": "Asia/Tokyo",
+    "Korea Standard Time": "Asia/Seoul",
+    "AUS Eastern Standard Time": "Australia/Sydney",
+    "E. Australia Standard Time": "Australia/Brisbane",
+    "W. Australia Standard Time": "Australia/Perth",
+    "New Zealand Standard Time": "Pacific/Auckland",
+    "Eastern Standard Time": "America/New_York",
+    "Central Standard Time": "America/Chicago",
+    "Mountain Standard Time": "America/Denver",
+    "US Mountain Standard Time": "America/Phoenix",
+    "Pacific Standard Time": "America/Los_Angeles",
+    "Alaskan Standard Time": "America/Anchorage",
+    "Hawaiian Standard Time": "Pacific/Honolulu",
+    "Atlantic Standard Time": "America/Halifax",
+    "Canada Central Standard Time": "America/Regina",
+    "SA Pacific Standard Time": "America/Bogota",
+    "Pacific SA Standard Time": "America/Santiago",
+    "E. South America Standard Time": "America/Sao_Paulo",
+    "Argentina Standard Time": "America/Buenos_Aires",
+    "Central Standard Time (Mexico)": "America/Mexico_City",
+}
+
+# TZIDs already warned about
+_unresolved = set()
+_DURATION_RE = re.compile(r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?")
+
+
+# ============================================================
+# ICS PARSING
+# ============================================================
+
+def _unfold(text):
+    """Join RFC 5545 folded lines (continuations start with space or tab)"""
+    lines = []
+    for raw in text.splitlines():
+        if raw[:1] in (" ", "\t") and lines:
+            lines[-1] += raw[1:]
+        elif raw:
+            lines.append(raw)
+    return lines
+
+
+def _split_property(line):
+    """'DTSTART;TZID=Europe/Paris:20250101T090000' -> ('DTSTART', {'TZID': ...}, value)"""
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    return name.upper(), dict(p.split("=", 1) for p in params if "=" in p), value
+
+
+def _zone(name):
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        return None
+
+
+def _tz(params):
+    """tzinfo for a TZID parameter; None means floating (local wall time)"""
+    tzid = params.get("TZID", "").strip('"')
+    if not tzid:
+        return None
+    if ZoneInfo is not None:
+        candidates = [tzid, WINDOWS_ZONES.get(tzid)]
+        # "/mozilla.org/20070129_1/Europe/Berlin", "/citadel.org/.../Europe/Paris"
+        parts = tzid.strip("/").split("/")
+        candidates += ["/".join(parts[i:]) for i in range(1, len(parts))]
+        for name in candidates:
+            zone = _zone(name) if name else None
+            if zone is not None:
+                return zone
+    if tzid not in _unresolved:
+        _unresolved.add(tzid)
+        why = "no zoneinfo module" if ZoneInfo is None else "not a known zone (pip install tzdata?)"
+        print(f"Calendar: TZID '{tzid}' unresolved ({why}) - its times are read as local time")
+    return None
+
+
+def _parse_datetime(value, params):
+    """
+    Aware datetime (UTC or TZID), naive for floating local time, or None
+    for all-day (DATE) values. Floating times stay naive so recurrences
+    step in local wall time; .timestamp() converts each one at its own offset.
+    """
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return None
+    if value.endswith("Z"):
+        return datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+    dt = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    tz = _tz(params)
+    return dt.replace(tzinfo=tz) if tz else dt
+
+
+def _like(reference, dt):
+    """dt in reference's kind: local wall time if reference is floating, else aware"""
+    if reference.tzinfo is None:
+        return dt.astimezone().replace(tzinfo=None) if dt.tzinfo is not None else dt
+    return dt if dt.tzinfo is not None else dt.astimezone()
+
+
+def _parse_duration(value):
+    m = _DURATION_RE.fullmatch(value.strip())
+    if not m:
+        return timedelta(0)
+    sign, weeks, days, hours, mins, secs = m.groups()
+    d = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                  minutes=int(mins or 0), seconds=int(secs or 0))
+    return -d if sign == "-" else d
+
+
+class CalendarEvent:
+    """One VEVENT; recurring events expand lazily via occurrences()"""
+
+    def __init__(self):
+        self.uid = None
+        self.start = None
+        self.end = None
+        self.duration = None
+        self.rrule = None
+        self.exdates = set()
+        self.recurrence_id = None
+        self.skip = False
+
+    def finish(self):
+        """Resolve DTEND/DURATION once all properties are read"""
+        if self.start is None:
+            self.skip = True
+            return self
+        if self.duration is None:
+            self.duration = (self.end - self.start) if self.end else timedelta(0)
+        if self.duration <= timedelta(0):
+            self.skip = True
+        return self
+
+    def occurrences(self, window_start, window_end):
+        """Yield (start, end) epoch pairs overlapping [window_start, window_end) (aware datetimes)"""
+        # Compared in the event's own kind of time (wall time for floating events)
+        window_start, window_end = _like(self.start, window_start), _like(self.start, window_end)
+        if self.rrule is None:
+            if self.start < window_end and self.start + self.duration > window_start:
+                yield self.start.timestamp(), (self.start + self.duration).timestamp()
+            return
+
+        rule = self.rrule
+        freq = rule.get("FREQ")
+        interval = int(rule.get("INTERVAL", 1))
+        count = int(rule["COUNT"]) if "COUNT" in rule else None
+        until = None
+        if "UNTIL" in rule:
+            until = _parse_datetime(rule["UNTIL"], {})
+            if until is None:
+                # UNTIL as a DATE: through the end of that day, in the event's time
+                until = datetime.strptime(rule["UNTIL"][:8], "%Y%m%d") + timedelta(days=1, seconds=-1)
+                until = until.replace(tzinfo=self.start.tzinfo)
+            else:
+                until = _like(self.start, until)
+
+        if freq == "DAILY":
+            step, offsets = timedelta(days=interval), [timedelta(0)]
+        elif freq == "WEEKLY":
+            step = timedelta(weeks=interval)
+            days = [_WEEKDAYS[d[-2:]] for d in rule.get("BYDAY", "").split(",") if d[-2:] in _WEEKDAYS]
+            days = sorted(days) or [self.start.weekday()]
+            offsets = [timedelta(days=d - self.start.weekday()) for d in days]
+        else:
+            # Unsupported frequency: treat as a single event
+            if self.start < window_end and self.start + self.duration > window_start:
+                yield self.start.timestamp(), (self.start + self.duration).timestamp()
+            return
+
+        # Jump straight to the period containing the window (unless COUNT needs counting from the start)
+        period = 0
+        if count is None and window_start > self.start:
+            period = max(0, (window_start - self.duration - self.start) // step - 1)
+
+        emitted = 0
+        while True:
+            base = self.start + period * step
+            if base + min(offsets) >= window_end:
+                return
+            for offset in offsets:
+                occ = base + offset
+                if occ < self.start:
+                    continue
+                if until is not None and occ > until:
+                    return
+                if count is not None:
+                    if emitted >= count:
+                        return
+                    emitted += 1
+                if occ.timestamp() in self.exdates:
+                    continue
+                if occ < window_end and occ + self.duration > window_start:
+                    yield occ.timestamp(), (occ + self.duration).timestamp()
+            period += 1
+
+
+def parse_ics(text):
+    """Parse VEVENTs; RECURRENCE-ID overrides are folded into their master's EXDATEs"""
+    events = []
+    current = None
+    for line in _unfold(text):
+        name, params, value = _split_property(line)
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            current = CalendarEvent()
+        elif name == "END" and value.upper() == "VEVENT" and current is not None:
+            events.append(current.finish())
+            current = None
+        elif current is None:
+            continue
+        elif name == "UID":
+            current.uid = value
+        elif name == "DTSTART":
+            current.start = _parse_datetime(value, params)
+            if current.start is None:
+                current.skip = True
+        elif name == "DTEND":
+            current.end = _parse_datetime(value, params)
+        elif name == "DURATION":
+            current.duration = _parse_duration(value)
+        elif name == "RRULE":
+            current.rrule = dict(p.split("=", 1) for p in value.split(";") if "=" in p)
+        elif name == "EXDATE":
+            for v in value.split(","):
+                dt = _parse_datetime(v, params)
+                if dt is not None:
+                    current.exdates.add(dt.timestamp())
+        elif name == "RECURRENCE-ID":
+            current.recurrence_id = _parse_datetime(value, params)
+        elif name == "STATUS" and value.upper() == "CANCELLED":
+            current.skip = True
+        elif name == "TRANSP" and value.upper() == "TRANSPARENT":
+            current.skip = True
+
+    masters = {e.uid: e for e in events if e.rrule is not None and e.recurrence_id is None}
+    for e in events:
+        if e.recurrence_id is not None and e.uid in masters:
+            masters[e.uid].exdates.add(e.recurrence_id.timestamp())
+    return [e for e in events if not e.skip]
+
+
+# ============================================================
+# INTERVAL INDEX
+# ============================================================
+
+class CalendarIndex:
+    """
+    Busy-time index over one or more ICS files.
+
+    Overlapping events are merged into disjoint [start, end) intervals so
+    both "busy now" and "busy until" come from one bisect.
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._signature = None
+        self._events = []
+        self._window = (0.0, 0.0)
+        self._starts = []
+        self._ends = []
+        self.rebuilds = 0
+
+    def _file_signature(self):
+        sig = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                sig.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append((path, None, None))
+        return tuple(sig)
+
+    def _load_events(self):
+        events = []
+        for path in self.paths:
+            try:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    events.extend(parse_ics(f.read()))
+            except OSError as e:
+                print(f"Calendar read error ({path}): {e}")
+        self._events = events
+
+    def _build(self, now):
+        """Expand events inside the window around now and merge them"""
+        here = datetime.fromtimestamp(now, timezone.utc)
+        window_start, window_end = here - WINDOW_BEHIND, here + WINDOW_AHEAD
+        intervals = []
+        for event in self._events:
+            intervals.extend(event.occurrences(window_start, window_end))
+        intervals.sort()
+
+        starts, ends = [], []
+        for s, e in intervals:
+            if ends and s <= ends[-1]:
+                ends[-1] = max(ends[-1], e)
+            else:
+                starts.append(s)
+                ends.append(e)
+        self._starts, self._ends = starts, ends
+        self._window = (window_start.timestamp(), window_end.timestamp())
+        self.rebuilds += 1
+
+    def _refresh(self, now):
+        signature = self._file_signature()
+        if signature != self._signature:
+            self._signature = signature
+            self._load_events()
+            self._build(now)
+        elif not (self._window[0] <= now < self._window[1] - 86400):
+            self._build(now)
+
+    def busy_until(self, now=None):
+        """Return the epoch time the current meeting ends, or None if free"""
+        if not self.paths:
+            return None
+        now = time.time() if now is None else now
+        self._refresh(now)
+        i = bisect_right(self._starts, now) - 1
+        if i >= 0 and now < self._ends[i]:
+            return self._ends[i]
+        return None
+
+    def is_busy(self, now=None):
+        return self.busy_until(now) is not None
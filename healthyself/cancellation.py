@@ -0,0 +1,50 @@
+"""
+Cooperative cancellation shared by the blackout UI, the music thread and
+any helper threads of one break.
+
+Whoever ends the break (the Tk close timer, an error, a future IPC command)
+calls cancel(); every thread blocked in wait() wakes up at once instead of
+polling its own timer to the end.
+"""
+import time
+import threading
+
+
+class CancelToken:
+    """One-shot cancellation flag with blocking wait and callbacks"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.cancelled_at = None    # perf_counter() when cancel() first ran
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """Signal cancellation; safe to call repeatedly and from any thread"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.cancelled_at = time.perf_counter()
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Cancel callback error: {e}")
+
+    def wait(self, timeout=None):
+        """Sleep up to timeout; returns True as soon as cancelled"""
+        return self._event.wait(timeout)
+
+    def on_cancel(self, callback):
+        """Run callback (in the cancelling thread) on cancel, or now if already cancelled"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
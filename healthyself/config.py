@@ -0,0 +1,215 @@
+"""
+Configuration for the break engine.
+
+Every module reads these as config.NAME at the moment it needs them, so a
+launcher script (or a test harness) can override any value before calling
+engine.main().
+"""
+import os
+
+from .break_history import DEFAULT_HISTORY_DIR
+
+# ============================================================
+# BACKENDS
+# DISPLAY_BACKEND: "multimonitor" (one blackout per monitor, needs
+#   screeninfo), "singlescreen" (one fullscreen window) or "sdl"
+#   (blackout drawn by pygame; compare with python -m healthyself.blackout_bench)
+# AUDIO_BACKEND: "pygame" (music + ambient sound) or "none"
+# Only the selected backends are imported
+# ============================================================
+DISPLAY_BACKEND = "multimonitor"
+AUDIO_BACKEND = "pygame"
+
+# UI_PROCESS: where popups and blackouts run
+#   "auto"      - zygote on Linux/BSD, in-process on Windows and macOS
+#   "zygote"    - Tk/pygame are loaded in a separate process only from the
+#                 pre-warm until the break ends; each break UI runs in a
+#                 worker forked from it (python -m healthyself.supervisor)
+#   "inprocess" - everything in one process
+UI_PROCESS = "auto"
+
+# ============================================================
+# BREAK TIMING
+# ============================================================
+BREAK_INTERVAL_SHORT = 60 * 60      # 60 minutes (in seconds)
+BREAK_DURATION_SHORT = 2 * 60       # 2 minutes (in seconds)
+BREAK_INTERVAL_LONG = 3 * 60 * 60   # 3 hours = 180 minutes (in seconds)
+BREAK_DURATION_LONG = 5 * 60        # 5 minutes (in seconds)
+
+# ============================================================
+# SKIP THRESHOLD: If long break is within this time, skip short break
+# Recommended: 20-30 minutes to avoid rushed transitions
+# ============================================================
+SKIP_THRESHOLD = 25 * 60            # 25 minutes (in seconds)
+
+# ============================================================
+# BLACKOUT FADE (Tk backends)
+# Blackout windows fade in and out on every monitor, at FADE_FPS.
+# The fade-out ends exactly when the break does. Without a compositor,
+# or when the alpha can't keep up, the blackout appears instantly.
+# ============================================================
+BLACKOUT_FADE = True
+FADE_IN_MS = 600
+FADE_OUT_MS = 800
+FADE_FPS = 60
+
+# ============================================================
+# BREAK RULES: when breaks may happen, one rule per string.
+# A break that a rule blocks is skipped (and recorded as skipped).
+# Examples:
+#   "no breaks 12:00-13:00"            "weekends off"
+#   "no short breaks on fri"           "only long breaks after 18:00"
+#   "max 2 snoozes per day"            "skip short breaks within 25 min of a long break"
+# Compiled once at startup; see the table and why a break was skipped:
+#   python -m healthyself.break_rules show
+#   python -m healthyself.break_rules why "2026-10-20 12:30"
+# ============================================================
+BREAK_RULES = []
+
+# ============================================================
+# MUSIC CONFIGURATION
+# Support single file or multiple files
+# Examples:
+#   MUSIC_FILES = ["soothing.wav"]
+#   MUSIC_FILES = ["soothing.mp3", "ambient.wav", "calm.mp3"]
+# ============================================================
+MUSIC_FILES = ["soothing.mp3"]      # Add more files for variety
+
+# ============================================================
+# AMBIENT SOUND (generated, no file needed)
+# Used when a music file is missing, or list it explicitly:
+#   MUSIC_FILES = ["ambient:brown", "ambient:breathing"]
+# Kinds: "pink", "brown", "tones", "breathing"
+# ============================================================
+AMBIENT_SOUND = "brown"
+
+# ============================================================
+# LOUDNESS NORMALIZATION
+# Each track is measured once (again only if the file changes) and
+# played at a volume that brings it down to LOUDNESS_TARGET, so
+# tracks from different sources play at similar levels
+# ============================================================
+LOUDNESS_NORMALIZE = True
+LOUDNESS_TARGET = -24.0             # dBFS (gated RMS)
+
+# ============================================================
+# AUDIO DEVICE
+# The mixer opens at the music files' own sample rate (no resampling),
+# stays open from the warning into the break, and is released
+# AUDIO_IDLE_TIMEOUT seconds after its last use. A smaller buffer
+# starts sound sooner but wakes the CPU more often.
+# ============================================================
+AUDIO_BUFFER = 1024                 # samples per channel
+AUDIO_IDLE_TIMEOUT = 2 * 60         # seconds
+
+# ============================================================
+# WELLNESS MESSAGES - Displayed during breaks
+# Can use SEQUENTIAL or RANDOM mode below
+# ============================================================
+WELLNESS_MESSAGES = [
+    "Rest your eyes and stretch",
+    "Look 20 feet away for 20 seconds",
+    "Stand up and walk around",
+    "Drink water and stay hydrated",
+    "Deep breathing - In for 4, hold for 4, out for 4",
+    "Neck and shoulder rolls",
+    "Blink slowly 10 times",
+    "Relax your jaw and neck",
+]
+
+# ============================================================
+# MESSAGE SELECTION MODE
+# Options: "SEQUENTIAL" or "RANDOM"
+# SEQUENTIAL: Messages cycle through in order each break
+# RANDOM: Random message selected each break
+# ============================================================
+MESSAGE_MODE = "RANDOM"
+
+# ============================================================
+# BREAK HISTORY
+# Every taken / snoozed / skipped break is appended here
+# Query with: python -m healthyself.break_history daily
+# ============================================================
+HISTORY_DIR = DEFAULT_HISTORY_DIR
+
+# ============================================================
+# CALENDAR AWARENESS
+# Local .ics files - breaks that land in a meeting are deferred
+# until the meeting ends. Empty list = disabled
+# Example: CALENDAR_FILES = [r"C:\Users\me\calendar.ics"]
+# ============================================================
+CALENDAR_FILES = []
+
+# ============================================================
+# FULLSCREEN DEFERRAL
+# Don't black out a screen share, presentation or fullscreen video.
+# The break waits (rechecking every FULLSCREEN_RECHECK seconds) but
+# never longer than FULLSCREEN_MAX_DEFER, so fullscreen apps can't
+# postpone breaks forever
+# ============================================================
+FULLSCREEN_DEFER = True
+FULLSCREEN_RECHECK = 10             # seconds
+FULLSCREEN_MAX_DEFER = 30 * 60      # 30 minutes (in seconds)
+
+# ============================================================
+# PLUGINS
+# Every .py file in this folder is loaded at startup and can hook
+# warning / snooze / break_start / break_end (see break_hooks.py)
+# Hooks run on background workers and never delay the break
+# ============================================================
+PLUGIN_DIR = os.path.join(os.path.expanduser("~"), ".disengage", "plugins")
+
+# ============================================================
+# MICRO-BREAKS (20-20-20 eye breaks)
+# A small click-through overlay in the corner: no blackout,
+# no music, no input grab. Skipped near a real break, during
+# meetings and while a fullscreen window is active
+# ============================================================
+MICRO_BREAK_ENABLED = False
+MICRO_BREAK_INTERVAL = 20 * 60      # 20 minutes (in seconds)
+MICRO_BREAK_DURATION = 20           # 20 seconds
+MICRO_BREAK_MESSAGE = "Look 20 feet away"
+
+# ============================================================
+# TRACING (for "the blackout took ages to appear" reports)
+# Writes one Chrome trace-event JSON file per break cycle;
+# open it in chrome://tracing or ui.perfetto.dev
+# Also enabled by setting DISENGAGE_TRACE=1
+# ============================================================
+TRACE_ENABLED = False
+TRACE_DIR = os.path.join(os.path.expanduser("~"), ".disengage", "traces")
+
+# ============================================================
+# POWER-AWARE MODE (laptops)
+# On battery: fewer timer wakeups, slower countdown refresh and
+# simpler audio. BATTERY_AUDIO: "normal" (as on AC), "simple" (music
+# polled once a second, larger mixer buffer) or "off" (no music)
+# ============================================================
+POWER_AWARE = True
+BATTERY_AUDIO = "simple"
+
+# ============================================================
+# PRESENTATION UNDER LOAD (full builds, test suites)
+# Popup and blackout run at raised CPU/I-O priority and go back to
+# normal afterwards (see priority.py for the permissions needed).
+# Assets, fonts and windows are pre-touched PREWARM_LEAD seconds
+# before the warning so nothing is read from disk on the deadline.
+# Measure with: python -m healthyself.load_bench
+# ============================================================
+PRESENTATION_BOOST = True
+BOOST_NICE = -10
+PREWARM_LEAD = 2 * 60               # seconds before the warning
+
+# ============================================================
+# CENTRAL POLICY (fleet rollout)
+# With POLICY_URL set, break settings are pulled from that URL (a JSON
+# object of the settings above) and applied without a restart; the last
+# policy is cached for offline starts. See policy_sync.py.
+#   POLICY_URL = "https://intranet.example/disengage/policy.json"
+# Test locally: python -m healthyself.policy_sync serve policy.json
+# ============================================================
+POLICY_URL = None
+POLICY_POLL_INTERVAL = 15 * 60      # seconds
+POLICY_POLL_JITTER = 0.2            # +/- 20% per poll
+POLICY_TIMEOUT = 10                 # seconds per request
+POLICY_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".disengage", "cache", "policy.json")
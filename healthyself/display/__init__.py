@@ -0,0 +1,45 @@
+"""
+Display backends: where the blackout windows go.
+
+    singlescreen  - one fullscreen window on the primary screen (Tk only)
+    multimonitor  - one borderless window per monitor (needs screeninfo)
+    sdl           - blackout drawn by pygame/SDL over all displays
+
+A backend provides:
+    name
+    monitors()          -> list of Monitor-like objects, primary first
+    place(win, monitor) -> positions a blackout window, returns a description
+
+or, to draw the blackout without Tk:
+    render_blackout(enforcer, message) -> runs until the break ends or
+                                          enforcer.cancel fires
+
+optionally:
+    prewarm()           -> load fonts ahead of the break
+
+Backend modules are imported on first use, so an unselected backend's
+dependencies are never loaded.
+"""
+import importlib
+from collections import namedtuple
+
+from .. import config
+
+# Same fields the rest of the code reads from screeninfo's Monitor
+Monitor = namedtuple("Monitor", "name x y width height is_primary")
+
+BACKENDS = ("singlescreen", "multimonitor", "sdl")
+
+# name -> backend instance
+_loaded = {}
+
+
+def get(name=None):
+    """Backend instance for name (default: config.DISPLAY_BACKEND), imported on first use"""
+    name = name or config.DISPLAY_BACKEND
+    backend = _loaded.get(name)
+    if backend is None:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown display backend '{name}' (choose from: {', '.join(BACKENDS)})")
+        backend = _loaded[name] = importlib.import_module(f".{name}", __name__).Backend()
+    return backend
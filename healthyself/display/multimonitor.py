@@ -0,0 +1,20 @@
+"""
+Multi-monitor display backend: one borderless window per monitor.
+
+Monitors are re-enumerated with screeninfo at every break, so docking or
+undocking a laptop between breaks is picked up.
+"""
+from screeninfo import get_monitors
+
+
+class Backend:
+    name = "multimonitor"
+
+    def monitors(self):
+        return get_monitors()
+
+    def place(self, win, monitor):
+        # Format: WIDTHxHEIGHT+X_OFFSET+Y_OFFSET
+        geometry_string = f"{monitor.width}x{monitor.height}+{monitor.x}+{monitor.y}"
+        win.geometry(geometry_string)
+        return geometry_string
@@ -0,0 +1,250 @@
+"""
+SDL display backend: the blackout, countdown and wellness message are
+drawn with pygame instead of Tk.
+
+One borderless window covers the union of all displays (gaps between
+mismatched monitors are simply black). It is painted once; after that
+only the countdown's rectangle is redrawn and pushed with
+display.update(rect), and only when its text changes. Between frames the
+loop sleeps in pygame.event.wait() until the next countdown step, and
+presents at most FRAME_RATE frames per second (window exposes included).
+
+Display positions come from a hidden probe window per display: the public
+pygame.Window (pygame-ce 2.5+), else pygame._sdl2.video.Window (private in
+pygame 2.x). Without either the displays are assumed side by side.
+
+time_to_black_ms is taken on the window's first expose, like the Tk
+blackout's, so the two backends are measured alike.
+
+Reuses the pygame module the audio backend already loaded. The video
+subsystem is shut down after every break so SDL doesn't keep the
+screensaver inhibited between breaks.
+"""
+import os
+import sys
+import time
+
+# Must be set before the import / before the video subsystem starts
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', "hide")
+# X11: unmanaged window, like Tk's overrideredirect (no decorations, no Alt+Tab)
+os.environ.setdefault('SDL_X11_FORCE_OVERRIDE_REDIRECT', "1")
+
+import pygame
+try:
+    from pygame import Window
+except ImportError:
+    try:
+        from pygame._sdl2.video import Window
+    except ImportError:
+        Window = None
+
+from . import Monitor
+from .. import power, tracing, ui_dispatch
+
+FRAME_RATE = 30                         # upper bound on presented frames per second
+WINDOWPOS_CENTERED_DISPLAY = 0x2FFF0000 # SDL_WINDOWPOS_CENTERED_DISPLAY(i) == this | i
+BACKGROUND = (0, 0, 0)
+COUNTDOWN_COLOR = (0, 255, 255)         # cyan, as in the Tk blackout
+MESSAGE_COLOR = (255, 255, 255)
+MESSAGE_WIDTH = 600                     # wrap width in pixels
+
+# Posted from other threads (cancel, UI dispatch) so event.wait() returns at once
+WAKE_EVENT = pygame.event.custom_type()
+
+
+def _display_bounds():
+    """
+    (x, y, width, height) per display. pygame has no bounds API, so each
+    display is measured with a hidden window centred on it at full size.
+    """
+    sizes = pygame.display.get_desktop_sizes()
+    if Window is not None:
+        try:
+            bounds = []
+            for index, (width, height) in enumerate(sizes):
+                position = WINDOWPOS_CENTERED_DISPLAY | index
+                probe = Window("probe", size=(width, height), position=(position, position), hidden=True)
+                x, y = probe.position
+                probe.destroy()
+                bounds.append((x, y, width, height))
+            return bounds
+        except (AttributeError, TypeError, pygame.error) as e:
+            # The private window API changed under us
+            print(f"SDL display positions unavailable ({e})")
+    print("SDL: assuming displays side by side, left to right")
+    bounds, x = [], 0
+    for width, height in sizes:
+        bounds.append((x, 0, width, height))
+        x += width
+    return bounds
+
+
+def _wrap(font, text, width):
+    """Split text into lines no wider than width pixels"""
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}".strip()
+            if line and font.size(candidate)[0] > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def _make_topmost():
+    """Windows: keep the blackout above the taskbar and other topmost windows"""
+    if sys.platform != "win32":
+        return
+    try:
+        import ctypes
+        hwnd = pygame.display.get_wm_info()["window"]
+        HWND_TOPMOST, SWP_NOMOVE, SWP_NOSIZE = -1, 0x0002, 0x0001
+        ctypes.windll.user32.SetWindowPos(hwnd, HWND_TOPMOST, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE)
+    except Exception as e:
+        print(f"Topmost unavailable: {e}")
+
+
+class Backend:
+    name = "sdl"
+
+    def monitors(self):
+        pygame.display.init()
+        try:
+            return [Monitor(f"display{i}", x, y, w, h, i == 0)
+                    for i, (x, y, w, h) in enumerate(_display_bounds())]
+        finally:
+            pygame.display.quit()
+
+    def prewarm(self):
+        """Load the countdown and message fonts ahead of the break"""
+        pygame.font.init()
+        for size in (64, 40):
+            pygame.font.Font(None, size).size("Break Time - 0:00")
+
+    def render_blackout(self, enforcer, message):
+        """Show the blackout on the calling thread until it times out or is cancelled"""
+        pygame.display.init()
+        pygame.font.init()
+        enforcer.cancel.on_cancel(self._wake)
+        # Cross-thread UI commands are drained by this loop while it runs
+        ui_dispatch.dispatcher.attach(self, self._wake)
+        try:
+            with tracing.span("blackout.create_window", backend=self.name):
+                screen, primary, font = self._open(message)
+            flipped_ms = (time.perf_counter() - enforcer._blackout_started) * 1000
+            self._run(enforcer, screen, primary, font)
+            if enforcer.time_to_black_ms is None:
+                # No expose event from this video driver: the first flip is the best there is
+                enforcer.time_to_black_ms = flipped_ms
+                tracing.instant("blackout.all_painted", ms=flipped_ms, source="flip")
+        finally:
+            ui_dispatch.dispatcher.detach(self)
+            pygame.event.set_grab(False)
+            pygame.event.set_keyboard_grab(False)
+            pygame.display.quit()
+
+    @staticmethod
+    def _wake():
+        try:
+            pygame.event.post(pygame.event.Event(WAKE_EVENT))
+        except pygame.error:
+            pass    # video already shut down
+
+    def _open(self, message):
+        """Create the window, paint the static content and present the first frame"""
+        bounds = _display_bounds()
+        left = min(x for x, _, _, _ in bounds)
+        top = min(y for _, y, _, _ in bounds)
+        right = max(x + w for x, _, w, _ in bounds)
+        bottom = max(y + h for _, y, _, h in bounds)
+        print(f"Creating SDL window over {len(bounds)} display(s) at {right - left}x{bottom - top}+{left}+{top}")
+
+        os.environ['SDL_VIDEO_WINDOW_POS'] = f"{left},{top}"
+        screen = pygame.display.set_mode((right - left, bottom - top), pygame.NOFRAME)
+        pygame.display.set_caption("Break Time")
+        pygame.mouse.set_visible(False)
+        pygame.event.set_grab(True)
+        pygame.event.set_keyboard_grab(True)
+        _make_topmost()
+
+        # Message centred on the primary display, countdown above it
+        x, y, w, h = bounds[0]
+        primary = pygame.Rect(x - left, y - top, w, h)
+        countdown_font = pygame.font.Font(None, 64)
+        message_font = pygame.font.Font(None, 40)
+        lines = [message_font.render(line, True, MESSAGE_COLOR)
+                 for line in _wrap(message_font, f"{message}\n\nMusic is playing...", MESSAGE_WIDTH)]
+
+        screen.fill(BACKGROUND)
+        line_y = primary.centery
+        for line in lines:
+            screen.blit(line, line.get_rect(midtop=(primary.centerx, line_y)))
+            line_y += line.get_height()
+        pygame.display.flip()
+        return screen, primary, countdown_font
+
+    def _run(self, enforcer, screen, primary, font):
+        """Countdown loop: redraw the countdown rect only when its text changes"""
+        frame_interval = 1.0 / FRAME_RATE
+        begin = time.monotonic()
+        end = begin + enforcer.duration
+        remaining = int(enforcer.duration)
+        next_tick = begin
+        shown = None
+        dirty = pygame.Rect(0, 0, 0, 0)
+        last_present = 0.0
+        expose_pending = False
+
+        while not enforcer.cancel.cancelled:
+            now = time.monotonic()
+            if now >= end:
+                break
+            if now >= next_tick:
+                power.count_wakeup("countdown")
+                enforcer.tick_lag_ms = max(enforcer.tick_lag_ms, (now - next_tick) * 1000)
+                mins, secs = remaining // 60, remaining % 60
+                # Same cadence as the Tk countdown: change only on M:00 or in the last minute
+                if shown is None or secs == 0 or remaining < 60:
+                    text = f"Break Time - {mins}:{secs:02d}"
+                    if text != shown:
+                        shown = text
+                        surface = font.render(text, True, COUNTDOWN_COLOR)
+                        rect = surface.get_rect(midbottom=(primary.centerx, primary.centery - 20))
+                        screen.fill(BACKGROUND, dirty)
+                        screen.blit(surface, rect)
+                        damaged = rect.union(dirty) if dirty.width else rect
+                        dirty = rect
+                        # Frame pacing: never present faster than FRAME_RATE
+                        wait = last_present + frame_interval - time.monotonic()
+                        if wait > 0:
+                            time.sleep(wait)
+                        pygame.display.update(damaged)
+                        last_present = time.monotonic()
+                step = power.current().countdown_step(remaining)
+                remaining -= step
+                next_tick = begin + (enforcer.duration - remaining)
+
+            if expose_pending and time.monotonic() - last_present >= frame_interval:
+                pygame.display.flip()
+                last_present = time.monotonic()
+                expose_pending = False
+
+            timeout = min(next_tick, end) - time.monotonic()
+            if expose_pending:
+                timeout = min(timeout, frame_interval)
+            event = pygame.event.wait(max(1, int(timeout * 1000)))
+            while event.type != pygame.NOEVENT:
+                # QUIT (Alt+F4) and keys are swallowed; exposes trigger a repaint
+                if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    expose_pending = True
+                    if enforcer.time_to_black_ms is None:
+                        # Measured like the Tk blackout: when the window is first exposed
+                        enforcer.time_to_black_ms = (time.perf_counter() - enforcer._blackout_started) * 1000
+                        tracing.instant("blackout.all_painted", ms=enforcer.time_to_black_ms)
+                elif event.type == WAKE_EVENT:
+                    ui_dispatch.dispatcher.drain()
+                event = pygame.event.poll()
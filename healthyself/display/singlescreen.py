@@ -0,0 +1,33 @@
+"""
+Single-screen display backend: one '-fullscreen' Tk window.
+
+Needs nothing beyond tkinter. The screen size is read once (for the
+startup banner and fullscreen detection); the blackout window itself is
+sized from the live screen, so a resolution change between breaks is
+still covered.
+"""
+from tkinter import Tk
+
+from . import Monitor
+
+
+class Backend:
+    name = "singlescreen"
+
+    def __init__(self):
+        self._monitor = None
+
+    def monitors(self):
+        if self._monitor is None:
+            root = Tk()
+            root.withdraw()
+            self._monitor = Monitor("primary", 0, 0, root.winfo_screenwidth(), root.winfo_screenheight(), True)
+            root.destroy()
+        return [self._monitor]
+
+    def place(self, win, monitor):
+        # Geometry covers the screen even where the window manager ignores
+        # '-fullscreen' on an override-redirect window
+        win.geometry(f"{win.winfo_screenwidth()}x{win.winfo_screenheight()}+0+0")
+        win.attributes('-fullscreen', True)
+        return "fullscreen"
@@ -0,0 +1,366 @@
+"""
+Fullscreen break enforcer: blackout windows from the display backend,
+music from the audio backend, one CancelToken tying them together.
+"""
+import time
+import random
+import threading
+from tkinter import Tk, Toplevel, Label, StringVar, Frame
+
+from . import config, display, audio, fade, power, tracing, ui_dispatch
+from .cancellation import CancelToken
+
+# Track for sequential mode
+_message_counter = 0
+
+
+def get_next_message():
+    """Get next wellness message based on MODE setting"""
+    global _message_counter
+    
+    if config.MESSAGE_MODE == "SEQUENTIAL":
+        msg = config.WELLNESS_MESSAGES[_message_counter % len(config.WELLNESS_MESSAGES)]
+        _message_counter += 1
+        return msg
+    else:  # RANDOM
+        return random.choice(config.WELLNESS_MESSAGES)
+
+
+class BreakEnforcer:
+    """Fullscreen break enforcer with music on the selected display/audio backends"""
+    
+    # Music thread + token of the previous break, so a new break can
+    # make sure the old one is really gone before opening the mixer
+    _previous = None
+    
+    def __init__(self, duration_seconds, is_long_break=False, display_backend=None, audio_backend=None):
+        self.duration = duration_seconds
+        self.is_long_break = is_long_break
+        self.display = display_backend or display.get()
+        self.audio = audio_backend or audio.get()
+        self.windows = []  # Store all monitor windows
+        self.countdown_var = None
+        self.root_window = None
+        self.message_label = None
+        self._ui_thread = None
+        # Shared by the blackout UI and the music thread: closing the
+        # blackout cancels it, and the music stops immediately
+        self.cancel = CancelToken()
+        self.teardown_ms = None
+        # Blackout start -> every window painted, and CPU spent while it was up
+        self.time_to_black_ms = None
+        self.blackout_cpu_ms = None
+        # Worst lateness of a countdown step (stutter under load)
+        self.tick_lag_ms = 0.0
+        self._next_tick = None
+        self._blackout_started = None
+        self._exposed = set()
+        # Set by the audio backend once the first sample has played
+        self.audio_started = threading.Event()
+        self.first_sample_ms = None
+        self.audio_open_ms = None       # device open cost at play (0.0 on a warm device)
+        # Alpha fades of the Tk blackout (None: shown and closed instantly)
+        self.fading = False
+        self.fade_in = None
+        self.fade_out = None
+        
+    def play_music_blocking(self):
+        """Music thread: the audio backend plays until the break is cancelled"""
+        if self.audio.play(self.cancel, self.duration, self.audio_started) is False:
+            ui_dispatch.post(self.show_audio_failed)
+    
+    def show_audio_failed(self):
+        """UI thread: tell the user why it's quiet"""
+        if self.message_label is not None and self.root_window is not None:
+            self.message_label.configure(text=self.message_label.cget("text").replace(
+                "Music is playing...", "Music unavailable - enjoy the quiet"))
+    
+    def _on_cancel(self):
+        """Cancelled from another thread: close the blackout within a frame"""
+        if threading.current_thread() is not self._ui_thread:
+            ui_dispatch.post(self.close_all_windows)
+            
+    def create_blackout_window(self, monitor, is_primary=False):
+        """
+        Create a fullscreen blackout window for a specific monitor.
+        Includes dynamic countdown timer (updates every minute).
+        
+        Args:
+            monitor: Monitor object from the display backend
+            is_primary: Whether this is the primary monitor (for main Tk window)
+        """
+        if is_primary:
+            # Use Tk() for the first window
+            win = Tk()
+            self.root_window = win
+            ui_dispatch.dispatcher.attach_tk(win)
+        else:
+            # Use Toplevel() for additional monitors
+            win = Toplevel()
+            
+        win.title("Break Time")
+        
+        # Position window on its monitor (geometry or fullscreen, per backend)
+        placement = self.display.place(win, monitor)
+        
+        print(f"Creating window on monitor: {monitor.name} at {placement}")
+        
+        # ============================================================
+        # Window Appearance Settings
+        # ============================================================
+        win.configure(bg='black')
+        
+        # ============================================================
+        # Fade-in: mapped fully transparent, the fade clock raises it
+        # ============================================================
+        if self.fading:
+            win.attributes('-alpha', 0.0)
+        
+        # ============================================================
+        # Window Frame Override
+        # ============================================================
+        win.overrideredirect(True)
+        
+        # ============================================================
+        # Keep window on top
+        # ============================================================
+        win.attributes('-topmost', True)
+        
+        # ============================================================
+        # Input Focus Control
+        # ============================================================
+        win.focus_force()
+        if is_primary:
+            win.grab_set()  # Only grab input on primary window
+        
+        # ============================================================
+        # Window Close Prevention
+        # ============================================================
+        win.protocol("WM_DELETE_WINDOW", lambda: None)
+        
+        # ============================================================
+        # Keyboard Shortcut Blocking (only on primary window)
+        # ============================================================
+        if is_primary:
+            win.bind('<Escape>', lambda e: None)
+            win.bind('<Alt-F4>', lambda e: None)
+            win.bind('<Alt-Tab>', lambda e: None)
+            win.bind('<Control-Alt-Delete>', lambda e: None)
+            win.bind('<Super_L>', lambda e: None)
+            win.bind('<Super_R>', lambda e: None)
+        
+        # Message in center (only on primary monitor)
+        if is_primary or monitor.is_primary:
+            # Create frame for centered content
+            content_frame = Frame(win, bg='black')
+            content_frame.place(relx=0.5, rely=0.5, anchor="center")
+            
+            # ============================================================
+            # DYNAMIC COUNTDOWN TIMER (updates every minute)
+            # Format: "Break Time - M:SS" where M is minutes
+            # ============================================================
+            self.countdown_var = StringVar()
+            self.countdown_label = Label(
+                content_frame,
+                textvariable=self.countdown_var,
+                font=("Helvetica", 32, "bold"),
+                fg="cyan",
+                bg="black"
+            )
+            self.countdown_label.pack(pady=20)
+            
+            # Initialize countdown display
+            self.update_countdown(self.duration)
+            
+            # ============================================================
+            # WELLNESS MESSAGE (random or sequential)
+            # ============================================================
+            wellness_msg = get_next_message()
+            
+            message_label = Label(
+                content_frame,
+                text=f"{wellness_msg}\n\nMusic is playing...",
+                font=("Helvetica", 20),
+                fg="white",
+                bg="black",
+                wraplength=400,
+                justify="center"
+            )
+            message_label.pack(pady=20)
+            self.message_label = message_label
+        
+        return win
+    
+    def update_countdown(self, remaining):
+        """
+        Update countdown timer display every minute.
+        Called recursively until break ends.
+        """
+        if self.cancel.cancelled:
+            # Cancelled from another thread - end the break now
+            self.close_all_windows()
+            return
+        if remaining > 0 and self.countdown_var and self.root_window:
+            power.count_wakeup("countdown")
+            now = time.monotonic()
+            if self._next_tick is not None:
+                self.tick_lag_ms = max(self.tick_lag_ms, (now - self._next_tick) * 1000)
+            # Calculate minutes and seconds
+            mins = int(remaining) // 60
+            secs = int(remaining) % 60
+            
+            # Update display (shows MM:SS format, updates every minute)
+            # Only update when seconds reach 0 (cleaner display)
+            if secs == 0 or remaining < 60:
+                self.countdown_var.set(f"Break Time - {mins}:{secs:02d}")
+            
+            # Schedule next update in 1 second (on battery: jump
+            # straight to the next minute boundary)
+            # But we'll only show changes every 60 seconds
+            step = power.current().countdown_step(remaining)
+            self._next_tick = now + step
+            if self.root_window:
+                self.root_window.after(step * 1000, lambda: self.update_countdown(remaining - step))
+    
+    def fullscreen_blackout(self):
+        """Create fullscreen blackout windows on every monitor the backend reports"""
+        self._blackout_started = time.perf_counter()
+        cpu_start = time.process_time()
+        self._ui_thread = threading.current_thread()
+        self.cancel.on_cancel(self._on_cancel)
+        try:
+            if hasattr(self.display, "render_blackout"):
+                # Backend draws the blackout itself (SDL)
+                self.display.render_blackout(self, get_next_message())
+            else:
+                self.tk_blackout()
+        finally:
+            self.blackout_cpu_ms = (time.process_time() - cpu_start) * 1000
+    
+    def _on_expose(self, win):
+        """Record time-to-black once every blackout window has been painted"""
+        self._exposed.add(win)
+        if self.time_to_black_ms is None and len(self._exposed) == len(self.windows):
+            self.time_to_black_ms = (time.perf_counter() - self._blackout_started) * 1000
+            tracing.instant("blackout.all_painted", ms=self.time_to_black_ms)
+    
+    def tk_blackout(self):
+        """Tk blackout: one window per monitor, positioned by the display backend"""
+        
+        # Fade only where a compositor blends the alpha
+        if config.BLACKOUT_FADE:
+            self.fading, how = fade.compositing()
+            if not self.fading:
+                print(f"Blackout fade off: {how}")
+        
+        # Get all monitors
+        with tracing.span("blackout.get_monitors", backend=self.display.name):
+            monitors = self.display.monitors()
+        print(f"Detected {len(monitors)} monitor(s)")
+        
+        # Create windows for each monitor
+        for idx, monitor in enumerate(monitors):
+            is_primary = (idx == 0)  # First window is primary
+            with tracing.span("blackout.create_window", monitor=monitor.name, primary=is_primary):
+                win = self.create_blackout_window(monitor, is_primary)
+            win.bind('<Expose>', lambda e, w=win: self._on_expose(w), add='+')
+            self.windows.append(win)
+        
+        # Schedule all windows to close after duration
+        # Use the first (primary) window for scheduling
+        if self.windows:
+            self.windows[0].after(int(self.duration * 1000), self.close_all_windows)
+            if self.fading:
+                # One clock for every monitor; the fade-out ends at the deadline
+                self.fade_in = fade.Fade(self.windows, 0.0, 1.0, config.FADE_IN_MS, config.FADE_FPS)
+                self.windows[0].after_idle(self.fade_in.start)
+                fade_out_at = max(0, int(self.duration * 1000) - config.FADE_OUT_MS)
+                self.windows[0].after(fade_out_at, self.start_fade_out)
+            
+            # Start mainloop on primary window
+            self.windows[0].mainloop()
+    
+    def start_fade_out(self):
+        """Last FADE_OUT_MS of the break: fade to transparent (the deadline still closes)"""
+        if not self.windows or self.cancel.cancelled:
+            return
+        if self.fade_in is not None and not self.fade_in.done:
+            # Very short break: still fading in
+            self.fade_in.finish()
+        if self.fade_in is not None and self.fade_in.fell_back:
+            # Alpha couldn't keep up on the way in; close instantly instead
+            return
+        self.fade_out = fade.Fade(self.windows, 1.0, 0.0,
+                                  min(config.FADE_OUT_MS, int(self.duration * 1000)), config.FADE_FPS)
+        self.fade_out.start()
+    
+    def close_all_windows(self):
+        """Close all blackout windows and stop the music with them"""
+        with tracing.span("blackout.close", windows=len(self.windows)):
+            self.cancel.cancel()
+            for running in (self.fade_in, self.fade_out):
+                if running is not None:
+                    running.stop()
+            for win in self.windows:
+                try:
+                    win.destroy()
+                except:
+                    pass
+            self.windows.clear()
+            self.root_window = None
+            self.message_label = None
+    
+    @classmethod
+    def reap_previous(cls, timeout=2.0):
+        """Make sure the previous break's music thread has exited"""
+        if cls._previous is None:
+            return
+        token, thread = cls._previous
+        if thread.is_alive():
+            print("WARNING: previous break's music thread still alive - cancelling it")
+            token.cancel()
+            thread.join(timeout)
+            if thread.is_alive():
+                print(f"WARNING: previous music thread did not exit within {timeout:.0f}s")
+                return
+        cls._previous = None
+        
+    def enforce(self):
+        """
+        Main enforcement method - blackout all monitors with music.
+        Break hooks and the trace/profile cycle are handled by the engine,
+        which may run this in a separate UI process.
+        """
+        # Never let the last break's audio overlap this one
+        BreakEnforcer.reap_previous()
+        
+        # Start music in a separate thread
+        music_thread = threading.Thread(target=self.play_music_blocking, name="break-music", daemon=False)
+        music_thread.start()
+        BreakEnforcer._previous = (self.cancel, music_thread)
+        
+        # Let the music start first (at once on a warm device)
+        self.audio_started.wait(0.2)
+        
+        # Show fullscreen blackout on ALL monitors
+        try:
+            self.fullscreen_blackout()
+        finally:
+            # Mainloop ended (normally or not) - stop audio and helpers
+            self.cancel.cancel()
+        
+        # Music thread wakes on cancel, so this join is short
+        music_thread.join(timeout=5)
+        self.first_sample_ms = self.audio.first_sample_ms
+        self.audio_open_ms = self.audio.open_ms
+        self.teardown_ms = (time.perf_counter() - self.cancel.cancelled_at) * 1000
+        if music_thread.is_alive():
+            print(f"WARNING: music thread still running {self.teardown_ms:.0f} ms after blackout closed")
+        else:
+            BreakEnforcer._previous = None
+            print(f"Break teardown: {self.teardown_ms:.0f} ms")
+        for name, done in (("in", self.fade_in), ("out", self.fade_out)):
+            if done is not None:
+                print(f"Fade-{name}: {done.describe()}")
+        tracing.complete("break.teardown", tracing.now_us() - int(self.teardown_ms * 1000),
+                         int(self.teardown_ms * 1000))
@@ -0,0 +1,524 @@
+"""
+The break scheduling engine - one main_loop for every display/audio mode.
+
+    python -m healthyself                         # settings from config.py
+    python -m healthyself --display singlescreen  # no screeninfo needed
+    python -m healthyself --audio none            # silent breaks, no pygame
+
+Launcher scripts call main() with their own default backends.
+
+The scheduling logic is one generator, schedule(), that yields what it
+needs done - Sleep, a UI runner Call, a Notify for break events, Blocking
+file/sysfs/X I/O - and knows nothing about how it's done. run() drives it
+here with blocking sleeps; aio.py drives the same generator from an
+asyncio event loop and keeps Call and Blocking steps off that loop.
+"""
+import sys
+import time
+import argparse
+from collections import namedtuple
+
+from . import (config, display, audio, assets, break_history, break_hooks, break_rules, policy_sync,
+               power, profiler, tracing, ui_dispatch)
+from .calendar_index import CalendarIndex
+from .fullscreen_detect import create_detector
+from .supervisor import create_ui, UIError
+
+# What schedule() yields to its driver:
+#   Sleep   - wait seconds; with interruptible, return early when a policy arrives
+#   Call    - UI runner method with kwargs; the driver sends back the result,
+#             or throws UIError into the generator
+#   Notify  - break event for an embedding host (plugins already got it)
+#   Blocking - function(*args, **kwargs) that touches files, sysfs or the X
+#             server; the driver sends back its result (errors propagate
+#             out of the driver, as from a direct call)
+Sleep = namedtuple("Sleep", "seconds interruptible", defaults=(False,))
+Call = namedtuple("Call", "method kwargs")
+Notify = namedtuple("Notify", "event payload")
+Blocking = namedtuple("Blocking", "function args kwargs")
+
+# Notify events: the break_hooks events plus these
+EVENTS = break_hooks.EVENTS + ("next_break", "skip")
+
+
+def call(method, **kwargs):
+    return Call(method, kwargs)
+
+
+def blocking(function, *args, **kwargs):
+    return Blocking(function, args, kwargs)
+
+
+def notify(event, **payload):
+    """Break event for plugins (break_hooks) and the driver"""
+    if event in break_hooks.EVENTS:
+        break_hooks.emit(event, **payload)
+    return Notify(event, payload)
+
+
+def guarded(method, default=None, **kwargs):
+    """UI call whose failure is logged and answered with default; the scheduler carries on"""
+    try:
+        return (yield call(method, **kwargs))
+    except UIError as e:
+        print(f"\nUI {method} failed: {e}")
+        return default
+
+
+def show_popup(is_long, allow_snooze=True):
+    """Warning popup; a failed popup counts as unanswered (the break proceeds)"""
+    try:
+        return (yield call("popup", countdown=60, is_long=is_long, allow_snooze=allow_snooze))
+    except UIError as e:
+        print(f"Popup failed: {e}")
+        return 0, False
+
+
+def record_break(code, outcome, decided_at, **fields):
+    """
+    Append to the break history (a file write). Rows carry the decision
+    time, not the time the break ended: SnoozeCounter counts a snooze on
+    the day it was chosen, as SnoozeCounter.record() does.
+    """
+    return blocking(break_history.record_break, code, outcome, directory=config.HISTORY_DIR,
+                    timestamp=decided_at, **fields)
+
+
+def skip_by_rule(break_type, decision, decided_at):
+    """Record a break that BREAK_RULES doesn't allow right now"""
+    print(f"\n[{time.strftime('%H:%M:%S')}] {break_type.capitalize()} break SKIPPED - {decision.reason}")
+    code = break_history.BREAK_LONG if break_type == "long" else break_history.BREAK_SHORT
+    yield record_break(code, break_history.OUTCOME_SKIPPED, decided_at)
+    yield notify("skip", break_type=break_type, reason=decision.reason)
+
+
+def apply_policy(rules):
+    """
+    Apply a policy the sync thread queued, between two scheduling decisions.
+    Returns (rules, changed): the rule table is recompiled if the policy touched it.
+    """
+    previous = {key: getattr(config, key) for key in policy_sync.POLICY_KEYS}
+    changed = policy_sync.syncer.apply_pending()
+    if not changed:
+        return rules, changed
+    try:
+        yield call("configure", settings=changed)
+    except UIError as e:
+        # The UI process kept its settings; so does the scheduler
+        print(f"\nPolicy {policy_sync.syncer.version or ''} rejected by the UI process ({e}) - "
+              f"keeping current policy")
+        for key in changed:
+            setattr(config, key, previous[key])
+        return rules, {}
+    print(f"\n[{time.strftime('%H:%M:%S')}] Policy {policy_sync.syncer.version or ''} applied: "
+          f"{', '.join(sorted(changed))}")
+    if "MUSIC_FILES" in changed:
+        yield blocking(assets.preload, config.MUSIC_FILES)
+        yield from guarded("prepare", names=config.MUSIC_FILES)
+    if "BREAK_RULES" in changed or "SKIP_THRESHOLD" in changed:
+        rules = break_rules.load()
+    return rules, changed
+
+
+def prewarm():
+    """Page in what the next break needs while the machine is still responsive"""
+    started = time.perf_counter()
+    try:
+        result = yield call("prewarm", names=config.MUSIC_FILES)
+    except UIError as e:
+        print(f"\nPre-warm failed: {e}")
+        return
+    print(f"\n[{time.strftime('%H:%M:%S')}] Break assets pre-warmed ({result['resident_kb']} KB resident, "
+          f"{(time.perf_counter() - started) * 1000:.0f} ms)")
+
+
+def run_blackout(duration, is_long):
+    """Blackout wrapped in the break hooks and the trace/profile cycle"""
+    break_type = "long" if is_long else "short"
+    yield notify("break_start", break_type=break_type, duration=duration)
+    started = time.time()
+    try:
+        yield call("blackout", duration=duration, is_long=is_long)
+    except UIError as e:
+        print(f"Blackout failed: {e}")
+    yield notify("break_end", break_type=break_type, duration=duration,
+                 actual=time.time() - started)
+    yield blocking(profiler.controller.cycle_end)
+    trace_file = yield blocking(tracing.end_cycle)
+    if trace_file:
+        print(f"Trace written: {trace_file}")
+
+
+def start_services():
+    """Tracing, power detection, profile triggers and the cached policy; True if one was queued"""
+    tracing.configure(config.TRACE_ENABLED, config.TRACE_DIR)
+    power.manager.configure(config.POWER_AWARE, config.BATTERY_AUDIO)
+    # On-demand profiling: python -m healthyself.profiler --seconds 30 (or --cycle)
+    profiler.controller.install()
+    sync = policy_sync.syncer
+    sync.configure(config.POLICY_URL, config.POLICY_POLL_INTERVAL, config.POLICY_POLL_JITTER,
+                   config.POLICY_CACHE_FILE)
+    # Offline start: last policy seen, until the first poll answers
+    return sync.load_cached()
+
+
+def micro_blocked(calendar, detector, now):
+    """A meeting or a fullscreen window rules out a micro-break (file stat, X query)"""
+    return calendar.is_busy(now) or bool(detector and detector.is_fullscreen())
+
+
+def schedule(ui):
+    """
+    Main timer loop with corrected break logic, as a generator of steps
+    for run() or aio.BreakScheduler.
+    
+    NEW LOGIC:
+    - Tracks both short (58 min) and long (180 min) break timers
+    - Long break takes absolute priority
+    - If long break is coming within SKIP_THRESHOLD, short break is skipped
+    - A break that BREAK_RULES blocks at that minute is skipped and its
+      timer restarts (the rules are a precompiled table, see break_rules.py)
+    - A central policy (POLICY_URL) is applied between decisions; running
+      timers are measured against the new intervals from then on
+    - Only resets both timers on long break execution
+    - Only resets short timer on short break execution
+    
+    Popups, blackouts and music go through the UI runner (see supervisor.py),
+    as Call steps; ui itself is only used for its description.
+    """
+    start_time = time.time()
+    last_short_break = start_time
+    last_long_break = start_time
+    last_micro_break = start_time
+    short_skip_recorded = False
+    prewarmed = False
+    calendar = CalendarIndex(config.CALENDAR_FILES)
+    sync = policy_sync.syncer
+    if (yield blocking(start_services)):
+        try:
+            yield call("configure", settings=sync.apply_pending())
+        except UIError as e:
+            yield blocking(sync.discard, f"the UI process rejected it ({e})")
+    rules = break_rules.load()
+    snoozes = yield blocking(break_rules.SnoozeCounter, config.HISTORY_DIR)
+    
+    print("=" * 70)
+    print("Disengagement Script Started")
+    print("=" * 70)
+    print(f"Short break interval: {config.BREAK_INTERVAL_SHORT//60} minutes")
+    print(f"Short break duration: {config.BREAK_DURATION_SHORT//60} minutes")
+    print(f"Long break interval: {config.BREAK_INTERVAL_LONG//3600} hours ({config.BREAK_INTERVAL_LONG//60} minutes)")
+    print(f"Long break duration: {config.BREAK_DURATION_LONG//60} minutes")
+    print(f"Skip threshold: {rules.skip_threshold//60} minutes (skip short break if long within this)")
+    for number, rule in enumerate(rules.rules, 1):
+        print(f"Break rule {number}: {rule}")
+    print(f"Backends: display={ui.display_name}, audio={ui.audio_name}")
+    print(f"Music files: {config.MUSIC_FILES}")
+    for name, path in (yield blocking(assets.preload, config.MUSIC_FILES)).items():
+        print(f"  - {name}: {path or 'NOT FOUND (ambient sound will be used)'}")
+    yield from guarded("prepare", names=config.MUSIC_FILES)
+    print(ui.describe())
+    print(f"Message mode: {config.MESSAGE_MODE}")
+    print(f"Break history: {config.HISTORY_DIR}")
+    if tracing.enabled():
+        print(f"Tracing: ON -> {config.TRACE_DIR}")
+    print(f"Calendar files: {config.CALENDAR_FILES or 'none'}")
+    if config.PRESENTATION_BOOST:
+        print(f"Presentation boost: nice {config.BOOST_NICE} during popups and blackouts, "
+              f"pre-warm {config.PREWARM_LEAD}s ahead")
+    print(f"Power profile: {power.current().name}" + (" (power-aware)" if config.POWER_AWARE else ""))
+    if config.MICRO_BREAK_ENABLED:
+        print(f"Micro-breaks: {config.MICRO_BREAK_DURATION}s every {config.MICRO_BREAK_INTERVAL//60} minutes")
+    plugins = yield blocking(break_hooks.load_plugins, config.PLUGIN_DIR)
+    print(f"Plugins: {plugins or 'none'}")
+    if sync.url:
+        print(f"Policy: {sync.url} every {sync.interval//60} minutes (+/-{sync.jitter:.0%}), "
+              f"version {sync.version or 'not fetched yet'}")
+        sync.start()
+    print("=" * 70)
+    
+    # Detect monitors at startup
+    monitors = yield from guarded("monitors", default=[])
+    print(f"\nDetected {len(monitors)} monitor(s):")
+    for monitor in monitors:
+        print(f"  - {monitor.name}: {monitor.width}x{monitor.height} at ({monitor.x}, {monitor.y})")
+    detector = (yield blocking(create_detector, monitors)) if config.FULLSCREEN_DEFER else None
+    fullscreen_deferred_since = None
+    if detector:
+        print(f"Fullscreen detection: {detector.name}")
+    print("=" * 70 + "\n")
+    upcoming = None
+    
+    while True:
+        rules, changed = yield from apply_policy(rules)
+        if changed:
+            prewarmed = False
+        profile = yield blocking(power.manager.update)
+        power.count_wakeup("scheduler")
+        current_time = time.time()
+        elapsed_since_short = current_time - last_short_break
+        elapsed_since_long = current_time - last_long_break
+        
+        # ============================================================
+        # CALENDAR CHECK: defer a due break until the meeting ends
+        # Rechecked every minute so a cancelled meeting is noticed
+        # ============================================================
+        break_due = (elapsed_since_long >= config.BREAK_INTERVAL_LONG - 60 or
+                     elapsed_since_short >= config.BREAK_INTERVAL_SHORT - 60)
+        busy_until = (yield blocking(calendar.busy_until, current_time)) if break_due else None
+        if busy_until:
+            print(f"[{time.strftime('%H:%M:%S')}] In a meeting - break deferred until "
+                  f"{time.strftime('%H:%M', time.localtime(busy_until))}", end='\r')
+            yield Sleep(min(busy_until - current_time, 60))
+            continue
+        
+        # ============================================================
+        # FULLSCREEN CHECK: defer while a fullscreen window is active
+        # ============================================================
+        if not break_due:
+            fullscreen_deferred_since = None
+        elif detector and (yield blocking(detector.is_fullscreen)):
+            if fullscreen_deferred_since is None:
+                fullscreen_deferred_since = current_time
+            if current_time - fullscreen_deferred_since < config.FULLSCREEN_MAX_DEFER:
+                print(f"[{time.strftime('%H:%M:%S')}] Fullscreen window active - break deferred "
+                      f"[{detector.describe()}]", end='\r')
+                yield Sleep(config.FULLSCREEN_RECHECK)
+                continue
+            print(f"\n[{time.strftime('%H:%M:%S')}] Fullscreen deferral limit reached - break proceeds")
+        elif detector:
+            print(f"\n[{time.strftime('%H:%M:%S')}] Fullscreen check: clear [{detector.describe()}]")
+        
+        # ============================================================
+        # PRIORITY 1: CHECK FOR LONG BREAK (takes absolute priority)
+        # ============================================================
+        if elapsed_since_long >= config.BREAK_INTERVAL_LONG - 60:
+            decision = rules.decide("long", current_time)
+            if not decision.allowed:
+                yield from skip_by_rule("long", decision, current_time)
+                last_long_break = current_time
+                # Pre-warmed for nothing: unload until the next break
+                prewarmed = False
+                yield from guarded("release")
+                continue
+            print("\n" + "=" * 70)
+            print(f"[{time.strftime('%H:%M:%S')}] LONG BREAK TRIGGERED (3 hours elapsed)")
+            print("=" * 70)
+            
+            prewarmed = False
+            upcoming = None
+            yield notify("warning", break_type="long")
+            yield blocking(tracing.begin_cycle, "long")
+            yield blocking(profiler.controller.cycle_begin)
+            tracing.instant("scheduler.decision", break_type="long", elapsed=elapsed_since_long)
+            snooze, clicked = yield from show_popup(is_long=True, allow_snooze=rules.snooze_allowed(snoozes.today()))
+            
+            if snooze == 0 or not clicked:
+                # No snooze, enforce break
+                print("User pressed OK - Executing long break")
+                break_started = time.time()
+                yield from run_blackout(config.BREAK_DURATION_LONG, is_long=True)
+                yield record_break(break_history.BREAK_LONG, break_history.OUTCOME_TAKEN, current_time,
+                                   duration=time.time() - break_started)
+                last_long_break = time.time()
+                last_short_break = time.time()  # Reset both timers
+                short_skip_recorded = False
+            else:
+                # Snooze requested
+                snooze_mins = snooze // 60
+                print(f"User snoozed for {snooze_mins} minutes")
+                yield notify("snooze", break_type="long", snooze=snooze)
+                snoozes.record()
+                yield Sleep(snooze)
+                break_started = time.time()
+                yield from run_blackout(config.BREAK_DURATION_LONG, is_long=True)
+                yield record_break(break_history.BREAK_LONG, break_history.OUTCOME_SNOOZED, current_time,
+                                   snooze=snooze, duration=time.time() - break_started)
+                last_long_break = time.time()
+                last_short_break = time.time()  # Reset both timers
+                short_skip_recorded = False
+                
+        # ============================================================
+        # PRIORITY 2: CHECK FOR SHORT BREAK (with skip logic)
+        # ============================================================
+        elif elapsed_since_short >= config.BREAK_INTERVAL_SHORT - 60:
+            # Calculate time remaining until long break
+            time_until_long = config.BREAK_INTERVAL_LONG - elapsed_since_long
+            
+            # ============================================================
+            # SKIP LOGIC: break rules, then - if the long break is
+            # coming too soon - skip this short break
+            # ============================================================
+            decision = rules.decide("short", current_time, time_until_long)
+            if decision.rule:
+                yield from skip_by_rule("short", decision, current_time)
+                last_short_break = current_time
+                short_skip_recorded = False
+                prewarmed = False
+                yield from guarded("release")
+                
+            elif not decision.allowed:
+                print(f"\n[{time.strftime('%H:%M:%S')}] Short break SKIPPED ({decision.reason})")
+                if not short_skip_recorded:
+                    # Loop rechecks every minute - record the skip only once
+                    yield record_break(break_history.BREAK_SHORT, break_history.OUTCOME_SKIPPED, current_time)
+                    short_skip_recorded = True
+                yield Sleep(60)  # Wait a minute before rechecking
+                
+            else:
+                print("\n" + "=" * 70)
+                print(f"[{time.strftime('%H:%M:%S')}] SHORT BREAK TRIGGERED (58 minutes elapsed)")
+                print("=" * 70)
+                
+                prewarmed = False
+                upcoming = None
+                yield notify("warning", break_type="short")
+                yield blocking(tracing.begin_cycle, "short")
+                yield blocking(profiler.controller.cycle_begin)
+                tracing.instant("scheduler.decision", break_type="short", elapsed=elapsed_since_short)
+                snooze, clicked = yield from show_popup(is_long=False,
+                                             allow_snooze=rules.snooze_allowed(snoozes.today()))
+                
+                if snooze == 0 or not clicked:
+                    # No snooze, enforce break
+                    print("User pressed OK - Executing short break")
+                    break_started = time.time()
+                    yield from run_blackout(config.BREAK_DURATION_SHORT, is_long=False)
+                    yield record_break(break_history.BREAK_SHORT, break_history.OUTCOME_TAKEN, current_time,
+                                       duration=time.time() - break_started)
+                    last_short_break = time.time()
+                    # ✅ DON'T reset last_long_break - keep it advancing
+                    
+                else:
+                    # Snooze requested
+                    snooze_mins = snooze // 60
+                    print(f"User snoozed for {snooze_mins} minutes")
+                    yield notify("snooze", break_type="short", snooze=snooze)
+                    snoozes.record()
+                    yield Sleep(snooze)
+                    break_started = time.time()
+                    yield from run_blackout(config.BREAK_DURATION_SHORT, is_long=False)
+                    yield record_break(break_history.BREAK_SHORT, break_history.OUTCOME_SNOOZED, current_time,
+                                       snooze=snooze, duration=time.time() - break_started)
+                    last_short_break = time.time()
+                    # ✅ DON'T reset last_long_break
+        
+        else:
+            # Calculate time until next break
+            time_to_short = (config.BREAK_INTERVAL_SHORT - 60 - elapsed_since_short) / 60
+            time_to_long = (config.BREAK_INTERVAL_LONG - 60 - elapsed_since_long) / 60
+            
+            status = f"⏳ Waiting... Short in {time_to_short:5.1f}m | Long in {time_to_long:5.1f}m"
+            print(f"[{time.strftime('%H:%M:%S')}] {status}", end='\r')
+            
+            # Announce the next break when it moves (start, after a break, new policy)
+            next_type = "long" if time_to_long <= time_to_short else "short"
+            warning_at = current_time + min(time_to_short, time_to_long) * 60
+            if upcoming is None or upcoming[0] != next_type or abs(upcoming[1] - warning_at) > 1:
+                upcoming = (next_type, warning_at)
+                yield notify("next_break", break_type=next_type, warning_at=warning_at,
+                             starts_at=warning_at + 60)
+            
+            # Between breaks: re-measure any track whose file changed
+            yield from guarded("prepare", names=config.MUSIC_FILES)
+            
+            # Shortly before the warning: pre-touch audio, fonts and windows
+            if not prewarmed and min(time_to_short, time_to_long) * 60 <= config.PREWARM_LEAD:
+                yield from prewarm()
+                prewarmed = True
+            
+            # ============================================================
+            # MICRO-BREAK: only when no real break is about to start
+            # ============================================================
+            if (config.MICRO_BREAK_ENABLED and
+                    rules.decide("micro", current_time).allowed and
+                    current_time - max(last_micro_break, last_short_break, last_long_break) >= config.MICRO_BREAK_INTERVAL and
+                    min(time_to_short, time_to_long) > 2 and
+                    not (yield blocking(micro_blocked, calendar, detector, current_time))):
+                try:
+                    # Overlay loop, and all the UI spent on it (worker, and host start if needed)
+                    cpu_ms, ui_cpu_ms = yield call("micro", duration=config.MICRO_BREAK_DURATION,
+                                                   message=config.MICRO_BREAK_MESSAGE)
+                except UIError as e:
+                    print(f"\nMicro-break failed: {e}")
+                    cpu_ms = ui_cpu_ms = 0
+                last_micro_break = time.time()
+                print(f"\n[{time.strftime('%H:%M:%S')}] Micro-break shown ({config.MICRO_BREAK_DURATION}s, "
+                      f"CPU {cpu_ms:.0f} ms overlay, {ui_cpu_ms:.0f} ms UI total)")
+                yield record_break(break_history.BREAK_MICRO, break_history.OUTCOME_TAKEN, current_time,
+                                   duration=config.MICRO_BREAK_DURATION)
+                continue
+            
+            # Sleep for a minute before checking again; on battery,
+            # sleep straight to the next due break (fewer wakeups)
+            sleep_for = 60
+            if profile.coalesce:
+                next_due = min(time_to_short, time_to_long) * 60
+                if not prewarmed and next_due > config.PREWARM_LEAD:
+                    # Wake in time to pre-warm
+                    next_due -= config.PREWARM_LEAD
+                if config.MICRO_BREAK_ENABLED:
+                    next_micro = config.MICRO_BREAK_INTERVAL - (current_time - max(last_micro_break, last_short_break, last_long_break))
+                    next_due = min(next_due, next_micro)
+                sleep_for = min(max(next_due, 1), profile.max_sleep)
+            # Returns early when a new policy arrives
+            yield Sleep(sleep_for, interruptible=True)
+
+
+def run(steps, ui):
+    """Drive schedule() in this thread: blocking sleeps, UI calls and I/O"""
+    reply, error = None, None
+    while True:
+        step = steps.throw(error) if error else steps.send(reply)
+        reply, error = None, None
+        if isinstance(step, Sleep):
+            if step.interruptible:
+                policy_sync.syncer.wait(step.seconds)
+            else:
+                time.sleep(step.seconds)
+        elif isinstance(step, Call):
+            try:
+                reply = getattr(ui, step.method)(**step.kwargs)
+            except UIError as e:
+                error = e
+        elif isinstance(step, Blocking):
+            reply = step.function(*step.args, **step.kwargs)
+
+
+def main_loop(ui):
+    """The scheduler, blocking this thread forever"""
+    run(schedule(ui), ui)
+
+
+def main(argv=None, display_name=None, audio_name=None):
+    """Command line entry point; display_name/audio_name override the config defaults"""
+    parser = argparse.ArgumentParser(description="Enforced screen breaks")
+    parser.add_argument("--display", choices=display.BACKENDS,
+                        default=display_name or config.DISPLAY_BACKEND, help="blackout backend")
+    parser.add_argument("--audio", choices=list(audio.BACKENDS),
+                        default=audio_name or config.AUDIO_BACKEND, help="music backend")
+    args = parser.parse_args(argv)
+
+    # Before any thread starts: the UI zygote is forked from here.
+    # Only the selected backends are imported (in the zygote, if used)
+    ui = create_ui(args.display, args.audio)
+    try:
+        main_loop(ui)
+    except break_rules.RuleError as e:
+        print(f"Invalid BREAK_RULES: {e}")
+        return 2
+    except KeyboardInterrupt:
+        print("\n\nDisengagement script stopped by user.")
+        print(break_hooks.report())
+        print(power.manager.report())
+        print(policy_sync.report())
+        print(ui.report())
+        if ui.mode == "in-process":
+            print(ui_dispatch.report())
+    finally:
+        ui.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Frame-paced alpha fades for the Tk blackout windows.
+
+One Fade drives every monitor's window from a single clock: frame n is
+due at start + n / fps and is scheduled with after(), so the Tk loop is
+never blocked. Alpha is computed from the elapsed time, not the frame
+count, so a late frame doesn't stretch the fade; frame slots that passed
+while the loop was busy are dropped and counted.
+
+Window alpha is only cheap when a compositor blends it (DWM, Quartz, an
+X11 compositing manager). Without one, or when setting the alpha on every
+window takes too long for the frame rate, the fade jumps to its end value
+and the blackout is shown (or removed) instantly.
+"""
+import sys
+import math
+import time
+import ctypes
+from tkinter import TclError
+
+# Frames whose alpha update takes longer than this share of the frame
+# period count as slow; this many in a row ends the fade
+SLOW_FRAME_SHARE = 0.5
+MAX_SLOW_FRAMES = 3
+
+
+def _x11_compositor():
+    """X11: a compositing manager owns the _NET_WM_CM_S<screen> selection"""
+    try:
+        x11 = ctypes.CDLL("libX11.so.6")
+    except OSError:
+        return False, "libX11 not found"
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XOpenDisplay.restype = ctypes.c_void_p
+    x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    x11.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+    x11.XInternAtom.restype = ctypes.c_ulong
+    x11.XGetSelectionOwner.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+    x11.XGetSelectionOwner.restype = ctypes.c_ulong
+    x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    display = x11.XOpenDisplay(None)
+    if not display:
+        return False, "no X display"
+    try:
+        atom = x11.XInternAtom(display, f"_NET_WM_CM_S{x11.XDefaultScreen(display)}".encode(), False)
+        owner = x11.XGetSelectionOwner(display, atom)
+    finally:
+        x11.XCloseDisplay(display)
+    return (True, "X11 compositor") if owner else (False, "no X11 compositor")
+
+
+def compositing():
+    """(True, how) if window alpha is blended by a compositor, else (False, why)"""
+    if sys.platform == "darwin":
+        return True, "Quartz"
+    if sys.platform == "win32":
+        enabled = ctypes.c_int(0)
+        try:
+            ctypes.windll.dwmapi.DwmIsCompositionEnabled(ctypes.byref(enabled))
+        except (OSError, AttributeError) as e:
+            return False, f"DWM query failed: {e}"
+        return (True, "DWM") if enabled.value else (False, "DWM composition off")
+    return _x11_compositor()
+
+
+def _ease(t):
+    """Smoothstep: no visible jump at either end"""
+    return t * t * (3 - 2 * t)
+
+
+class Fade:
+    """Alpha from start to end over duration_ms on all windows, at fps"""
+
+    def __init__(self, windows, start, end, duration_ms, fps):
+        self.windows = list(windows)
+        self.start_alpha = start
+        self.end_alpha = end
+        self.duration = max(duration_ms, 1) / 1000
+        self.period = 1.0 / fps
+        self.frames = 0
+        self.dropped = 0
+        self.worst_late_ms = 0.0
+        self.apply_ms = 0.0
+        self.fell_back = None       # reason, if the fade was cut short
+        self.done = False
+        self._began = None
+        self._slot = 0
+        self._slow = 0
+        self._after = None
+
+    def start(self):
+        if not self.windows:
+            self.done = True
+            return
+        self._began = time.perf_counter()
+        self._frame()
+
+    def _apply(self, alpha):
+        started = time.perf_counter()
+        for win in self.windows:
+            try:
+                win.attributes('-alpha', alpha)
+            except TclError:
+                pass    # window already closed
+        return (time.perf_counter() - started) * 1000
+
+    def _frame(self):
+        self._after = None
+        now = time.perf_counter()
+        elapsed = now - self._began
+        # after() may fire a little early: that is still the slot it was due for
+        slot = max(int(elapsed / self.period), self._slot)
+        if slot > self._slot:
+            # Slots between the one we were due for and now were never drawn
+            self.dropped += slot - self._slot
+        self.worst_late_ms = max(self.worst_late_ms, (elapsed - self._slot * self.period) * 1000)
+        t = min(elapsed / self.duration, 1.0)
+        cost = self._apply(self.start_alpha + (self.end_alpha - self.start_alpha) * _ease(t))
+        self.apply_ms += cost
+        self.frames += 1
+        self._slow = self._slow + 1 if cost > self.period * 1000 * SLOW_FRAME_SHARE else 0
+        if t >= 1.0:
+            self.done = True
+            return
+        if self._slow >= MAX_SLOW_FRAMES:
+            self.finish(f"alpha updates take {cost:.1f} ms per frame")
+            return
+        self._slot = slot + 1
+        delay = self._began + self._slot * self.period - time.perf_counter()
+        self._after = self.windows[0].after(max(0, math.ceil(delay * 1000)), self._frame)
+
+    def finish(self, reason=None):
+        """Jump to the end alpha now (instant fallback, or the break ended early)"""
+        self.stop()
+        if not self.done:
+            self.fell_back = reason
+            self._apply(self.end_alpha)
+            self.done = True
+
+    def stop(self):
+        """Cancel the next frame (windows being destroyed)"""
+        if self._after is not None:
+            try:
+                self.windows[0].after_cancel(self._after)
+            except TclError:
+                pass
+            self._after = None
+
+    def describe(self):
+        text = (f"{self.frames} frames, {self.dropped} dropped, worst {self.worst_late_ms:.0f} ms late, "
+                f"{self.apply_ms / max(self.frames, 1):.2f} ms alpha per frame")
+        if self.fell_back:
+            text += f", cut short: {self.fell_back}"
+        return text
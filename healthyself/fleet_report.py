@@ -0,0 +1,420 @@
+"""
+Fleet reports: break histories of many workstations merged into one view.
+
+Each machine's history is the columnar store from break_history.py, copied
+(e.g. by a login script) into a fleet directory:
+
+    fleet/<team>/<machine>/timestamp.col, break_type.col, ...
+    fleet/<machine>/...                      (team "-", or from --teams)
+
+Machines are split into one shard per worker. A worker streams each
+machine's column files a chunk of rows at a time, folds them into one
+counter block per machine and UTC day, and k-way merges the machines'
+blocks (heapq.merge) into one day-ordered stream, combined day by day as
+it goes. Merging day blocks rather than single events keeps the heap work
+to one operation per machine-day. Memory is bounded by the chunk size
+times the shard size, not by the length of the history. The parent merges
+the workers' day streams the same way and rolls them up into the tables
+below.
+
+    compliance by team      taken / snoozed / skipped, compliance
+    snooze choices          how often each DisengagePopup snooze (15/30/60 min) is picked
+    compliance by period    the whole fleet per day, week or month
+
+Days and weeks are UTC (machines can sit in different time zones).
+
+Usage:
+    python -m healthyself.fleet_report report fleet/ --period week --workers 8
+    python -m healthyself.fleet_report report fleet/ --teams teams.csv --since 2026-01-01
+    python -m healthyself.fleet_report generate /tmp/fleet --machines 10000 --days 365
+    python -m healthyself.fleet_report bench /tmp/fleet --machines 10000 --days 365
+"""
+import os
+import sys
+import time
+import heapq
+import random
+import argparse
+import calendar
+from array import array
+from itertools import repeat
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+
+from .break_history import (COLUMNS, BREAK_SHORT, BREAK_LONG, BREAK_MICRO, BREAK_NAMES,
+                            OUTCOME_TAKEN, OUTCOME_SNOOZED, OUTCOME_SKIPPED, compliance)
+
+DAY = 86400
+# DisengagePopup snooze buttons, in seconds
+SNOOZE_OPTIONS = (15 * 60, 30 * 60, 60 * 60)
+# Bytes per history row across all columns
+ROW_BYTES = sum(array(code).itemsize for _, code in COLUMNS)
+MIN_CHUNK = 64                  # rows per machine per read, at least
+DEFAULT_MEMORY_MB = 64          # per worker, for the merge buffers
+PERIODS = {"day": "%Y-%m-%d", "week": "%G-W%V", "month": "%Y-%m"}
+
+
+# ============================================================
+# DISCOVERY AND READING
+# ============================================================
+
+def _has_history(path):
+    return os.path.exists(os.path.join(path, "timestamp.col"))
+
+
+def read_teams(path):
+    """machine -> team from "machine,team" lines (# comments allowed)"""
+    teams = {}
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                machine, _, team = line.partition(",")
+                teams[machine.strip()] = team.strip() or "-"
+    return teams
+
+
+def discover(root, teams=None):
+    """[(machine, team, directory)] for every history directory under root"""
+    teams = teams or {}
+    machines = []
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        if _has_history(entry.path):
+            machines.append((entry.name, teams.get(entry.name, "-"), entry.path))
+            continue
+        for sub in sorted(os.scandir(entry.path), key=lambda e: e.name):
+            if sub.is_dir() and _has_history(sub.path):
+                machines.append((sub.name, teams.get(sub.name, entry.name), sub.path))
+    return machines
+
+
+def read_rows(directory, chunk):
+    """
+    Yield (timestamp, break_type, outcome, snooze, duration) for one
+    machine, reading chunk rows per column at a time. No file stays open
+    between chunks, so ten thousand readers don't need ten thousand fds.
+    Columns of different lengths (crash mid-append) are cut to the shortest.
+    """
+    paths = [(os.path.join(directory, f"{name}.col"), code) for name, code in COLUMNS]
+    try:
+        rows = min(os.path.getsize(path) // array(code).itemsize for path, code in paths)
+    except OSError as e:
+        print(f"Skipping {directory}: {e}")
+        return
+    for start in range(0, rows, chunk):
+        count = min(chunk, rows - start)
+        columns = []
+        for path, code in paths:
+            column = array(code)
+            with open(path, "rb") as f:
+                f.seek(start * column.itemsize)
+                column.frombytes(f.read(count * column.itemsize))
+            columns.append(column)
+        yield from zip(*columns)
+
+
+def read_days(directory, team, chunk, since=None, until=None):
+    """
+    Yield (day, {(team, break_type, outcome, snooze): [events, duration]})
+    for one machine, one block per UTC day in day order.
+    """
+    since = float("-inf") if since is None else since
+    until = float("inf") if until is None else until
+    current, counts = None, None
+    for timestamp, kind, outcome, snooze, duration in read_rows(directory, chunk):
+        if timestamp < since or timestamp >= until:
+            continue
+        day = int(timestamp // DAY)
+        if day != current:
+            if counts:
+                yield current, counts
+            current, counts = day, {}
+        key = (team, kind, outcome, snooze)
+        entry = counts.get(key)
+        if entry is None:
+            counts[key] = [1, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+    if counts:
+        yield current, counts
+
+
+def merge_days(streams):
+    """k-way merge of day-ordered (day, counts) streams; yields one combined block per day"""
+    current, merged = None, {}
+    for day, counts in heapq.merge(*streams, key=itemgetter(0)):
+        if day != current:
+            # Day order: no later block can belong to an earlier day
+            if merged:
+                yield current, merged
+            current, merged = day, {}
+        for key, (n, seconds) in counts.items():
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = [n, seconds]
+            else:
+                entry[0] += n
+                entry[1] += seconds
+    if merged:
+        yield current, merged
+
+
+# ============================================================
+# AGGREGATION
+# ============================================================
+
+def aggregate_shard(shard, memory_mb=DEFAULT_MEMORY_MB, since=None, until=None):
+    """
+    Worker: a shard's machines merged into [(day, counts)] in day order
+    (counts as in read_days, summed over the shard).
+    """
+    chunk = max(MIN_CHUNK, memory_mb * 2 ** 20 // ROW_BYTES // max(len(shard), 1))
+    return list(merge_days(read_days(directory, team, chunk, since, until)
+                           for _machine, team, directory in shard))
+
+
+class FleetSummary:
+    """Tables rolled up from per-day counters, fed in day order"""
+
+    def __init__(self, machines, period="week"):
+        self.period = PERIODS[period]
+        self.machines = {}
+        for _machine, team, _directory in machines:
+            self.machines[team] = self.machines.get(team, 0) + 1
+        self.teams = {}             # team -> [taken, snoozed, skipped]
+        self.periods = {}           # period -> [taken, snoozed, skipped]
+        self.triggered = {}         # break_type -> breaks shown (not skipped)
+        self.snoozes = {}           # (break_type, snooze) -> n
+        self.duration = {}          # break_type -> [breaks enforced, seconds]
+        self.events = 0
+        self.days = 0
+
+    def add(self, day, counts):
+        self.days += 1
+        label = time.strftime(self.period, time.gmtime(day * DAY))
+        period = self.periods.setdefault(label, [0, 0, 0])
+        for (team, kind, outcome, snooze), (n, seconds) in counts.items():
+            self.events += n
+            if kind == BREAK_MICRO:
+                continue
+            team_counts = self.teams.setdefault(team, [0, 0, 0])
+            team_counts[outcome] += n
+            period[outcome] += n
+            if outcome == OUTCOME_SKIPPED:
+                continue
+            self.triggered[kind] = self.triggered.get(kind, 0) + n
+            enforced = self.duration.setdefault(kind, [0, 0.0])
+            enforced[0] += n
+            enforced[1] += seconds
+            if outcome == OUTCOME_SNOOZED:
+                self.snoozes[(kind, snooze)] = self.snoozes.get((kind, snooze), 0) + n
+
+    def print_tables(self, out=sys.stdout):
+        def row(label, taken, snoozed, skipped, extra=""):
+            print(f"{label:<16}{extra}{taken:>10} {snoozed:>9} {skipped:>9} "
+                  f"{compliance(taken, snoozed):>11.1%}", file=out)
+
+        print("\nCompliance by team", file=out)
+        print(f"{'Team':<16}{'Machines':>9}{'Taken':>10} {'Snoozed':>9} {'Skipped':>9} {'Compliance':>11}",
+              file=out)
+        totals = [0, 0, 0]
+        for team in sorted(self.teams):
+            counts = self.teams[team]
+            row(team, *counts, extra=f"{self.machines.get(team, 0):>9}")
+            totals = [a + b for a, b in zip(totals, counts)]
+        row("fleet", *totals, extra=f"{sum(self.machines.values()):>9}")
+
+        print("\nSnooze choices", file=out)
+        header = "".join(f"{option // 60:>9} min" for option in SNOOZE_OPTIONS)
+        print(f"{'Break':<8}{'Shown':>10} {'Snoozed':>9} {'Rate':>6}{header}{'other':>13}  Avg enforced",
+              file=out)
+        for kind in (BREAK_SHORT, BREAK_LONG):
+            shown = self.triggered.get(kind, 0)
+            picks = {option: n for (k, option), n in self.snoozes.items() if k == kind}
+            snoozed = sum(picks.values())
+            cells = ""
+            for option in SNOOZE_OPTIONS:
+                n = picks.pop(option, 0)
+                cells += f"{n:>8} {n / snoozed if snoozed else 0:>4.0%}"
+            other = sum(picks.values())
+            enforced, seconds = self.duration.get(kind, (0, 0.0))
+            print(f"{BREAK_NAMES[kind]:<8}{shown:>10} {snoozed:>9} {snoozed / shown if shown else 0:>6.1%}"
+                  f"{cells}{other:>13}  {seconds / enforced / 60 if enforced else 0:>8.1f} min", file=out)
+
+        print(f"\nCompliance by {[k for k, v in PERIODS.items() if v == self.period][0]}", file=out)
+        print(f"{'Period':<16}{'Taken':>10} {'Snoozed':>9} {'Skipped':>9} {'Compliance':>11}", file=out)
+        for label in sorted(self.periods):
+            row(label, *self.periods[label])
+
+
+def aggregate(machines, workers=None, period="week", memory_mb=DEFAULT_MEMORY_MB, since=None, until=None):
+    """FleetSummary for machines, one k-way merging shard per worker process"""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(machines) or 1))
+    shards = [machines[i::workers] for i in range(workers)]
+    summary = FleetSummary(machines, period)
+    if workers == 1:
+        streams = [aggregate_shard(shards[0], memory_mb, since, until)]
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(workers)
+        streams = list(pool.map(aggregate_shard, shards, repeat(memory_mb), repeat(since), repeat(until)))
+    try:
+        # Second merge: the shards' day streams
+        for day, counts in merge_days(streams):
+            summary.add(day, counts)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return summary
+
+
+# ============================================================
+# SYNTHETIC FLEET
+# ============================================================
+
+def _machine_events(rng, start, days):
+    """One machine's year: workdays of short/long breaks, some snoozes and skips"""
+    snooze_rate = rng.uniform(0.02, 0.35)
+    snooze_weights = (rng.uniform(2, 6), rng.uniform(1, 3), rng.uniform(0.2, 1.5))
+    micro = rng.random() < 0.2
+    rows = []
+    for day in range(days):
+        midnight = start + day * DAY
+        if time.gmtime(midnight).tm_wday >= 5 or rng.random() < 0.06:
+            continue
+        clock = midnight + rng.uniform(7, 10) * 3600
+        end = clock + rng.uniform(6.5, 9.5) * 3600
+        last_short = last_long = last_micro = clock
+        while True:
+            next_long = last_long + 3 * 3600
+            next_short = last_short + 58 * 60
+            next_micro = max(last_micro, last_short) + 20 * 60 if micro else end
+            clock = min(next_long, next_short, next_micro)
+            if clock >= end:
+                break
+            if clock == next_long:
+                kind = BREAK_LONG
+            elif clock == next_short:
+                kind = BREAK_SHORT
+                if next_long - clock <= 25 * 60:
+                    rows.append((clock, kind, OUTCOME_SKIPPED, 0, 0.0))
+                    last_short = clock
+                    continue
+            else:
+                rows.append((clock, BREAK_MICRO, OUTCOME_TAKEN, 0, 20.0))
+                last_micro = clock + 20
+                continue
+            duration = (5 if kind == BREAK_LONG else 2) * 60 * rng.uniform(0.97, 1.0)
+            if rng.random() < snooze_rate:
+                snooze = rng.choices(SNOOZE_OPTIONS, snooze_weights)[0]
+                rows.append((clock, kind, OUTCOME_SNOOZED, snooze, duration))
+                clock += snooze + duration
+            else:
+                rows.append((clock, kind, OUTCOME_TAKEN, 0, duration))
+                clock += duration
+            if kind == BREAK_LONG:
+                last_long = clock
+            last_short = clock
+    return rows
+
+
+def generate(root, machines=10000, days=365, teams=50, seed=1):
+    """Write a synthetic fleet under root/team-NN/host-NNNNN; returns the number of events"""
+    rng = random.Random(seed)
+    start = calendar.timegm(time.strptime("2025-01-01", "%Y-%m-%d"))
+    total = 0
+    for index in range(machines):
+        directory = os.path.join(root, f"team-{index % teams:02d}", f"host-{index:05d}")
+        os.makedirs(directory, exist_ok=True)
+        rows = _machine_events(rng, start, days)
+        total += len(rows)
+        columns = list(zip(*rows)) or [()] * len(COLUMNS)
+        for (name, code), values in zip(COLUMNS, columns):
+            with open(os.path.join(directory, f"{name}.col"), "wb") as f:
+                array(code, values).tofile(f)
+    return total
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def _date(text):
+    return calendar.timegm(time.strptime(text, "%Y-%m-%d"))
+
+
+def _peak_rss_mb():
+    """Peak RSS of this process and of its largest finished child (None on Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    scale = 1 if sys.platform == "darwin" else 1024     # ru_maxrss: bytes on macOS, KB elsewhere
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 2 ** 20)
+
+
+def run_report(root, args):
+    teams = read_teams(args.teams) if args.teams else None
+    started = time.perf_counter()
+    machines = discover(root, teams)
+    if not machines:
+        print(f"No break histories under {root}")
+        return None
+    summary = aggregate(machines, args.workers, args.period, args.memory_mb,
+                        _date(args.since) if args.since else None, _date(args.until) if args.until else None)
+    elapsed = time.perf_counter() - started
+    return summary, len(machines), elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fleet-wide break reports from per-machine histories")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="summary tables")
+    bench = sub.add_parser("bench", help="generate a synthetic fleet (if missing) and time a report")
+    generate_cmd = sub.add_parser("generate", help="write a synthetic fleet")
+    for p in (report, bench, generate_cmd):
+        p.add_argument("root", help="fleet directory")
+    for p in (report, bench):
+        p.add_argument("--teams", help='"machine,team" CSV (default: parent directory name)')
+        p.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+        p.add_argument("--period", choices=PERIODS, default="week")
+        p.add_argument("--since", help="YYYY-MM-DD (UTC)")
+        p.add_argument("--until", help="YYYY-MM-DD (UTC), exclusive")
+        p.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB,
+                       help="merge buffer budget per worker")
+    for p in (bench, generate_cmd):
+        p.add_argument("--machines", type=int, default=10000)
+        p.add_argument("--days", type=int, default=365)
+        p.add_argument("--team-count", type=int, default=50)
+        p.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == "generate" or (args.command == "bench" and not os.path.isdir(args.root)):
+        started = time.perf_counter()
+        events = generate(args.root, args.machines, args.days, args.team_count, args.seed)
+        print(f"Generated {args.machines} machines x {args.days} days: {events} events "
+              f"in {time.perf_counter() - started:.1f}s -> {args.root}")
+        if args.command == "generate":
+            return 0
+
+    result = run_report(args.root, args)
+    if result is None:
+        return 1
+    summary, machines, elapsed = result
+    summary.print_tables()
+    print(f"\n{machines} machines, {summary.events} events, {summary.days} days "
+          f"in {elapsed:.1f}s ({summary.events / elapsed / 1e6:.2f} M events/s)")
+    if args.command == "bench":
+        parent, child = _peak_rss_mb()
+        if parent is not None:
+            print(f"Peak RSS: {parent:.0f} MB report process, {child:.0f} MB largest worker "
+                  f"(--memory-mb {args.memory_mb}, {args.workers or os.cpu_count()} worker(s))")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""
+Fullscreen / presentation window detection.
+
+main_loop() asks is_fullscreen() before showing DisengagePopup so a break
+never blacks out a screen share or fullscreen video.
+
+Backends:
+- X11 (libxcb through ctypes, no extra packages): a daemon thread listens
+  for _NET_ACTIVE_WINDOW, _NET_WM_STATE and ConfigureNotify events and
+  keeps a cached answer. is_fullscreen() only reads that cache, so its
+  latency is bounded and it never enumerates windows. Nothing beyond the
+  standard library is imported, so the scheduler process stays small.
+- Windows (ctypes, no extra packages): foreground window rectangle compared
+  with its monitor rectangle - two cheap user32 calls.
+- Anything else: never fullscreen.
+
+Every check records its latency in last_check_ms.
+"""
+import os
+import sys
+import time
+import ctypes
+import threading
+
+
+class NullDetector:
+    """Fallback when no backend is available - never defers a break"""
+
+    name = "none"
+
+    def __init__(self):
+        self.last_check_ms = 0.0
+
+    def is_fullscreen(self):
+        return False
+
+    def describe(self):
+        return f"{self.name} ({self.last_check_ms:.3f} ms)"
+
+
+def _covers_monitor(x, y, width, height, monitors):
+    """True if the rectangle covers any whole monitor"""
+    for m in monitors:
+        if x <= m.x and y <= m.y and x + width >= m.x + m.width and y + height >= m.y + m.height:
+            return True
+    return False
+
+
+# X protocol constants (xcb/xproto.h)
+_PROPERTY_NOTIFY = 28
+_CONFIGURE_NOTIFY = 22
+_CW_EVENT_MASK = 1 << 11
+_EVENT_MASK_STRUCTURE_NOTIFY = 1 << 17
+_EVENT_MASK_PROPERTY_CHANGE = 1 << 22
+_ATOM_ANY = 0
+
+
+class _Cookie(ctypes.Structure):
+    _fields_ = [("sequence", ctypes.c_uint)]
+
+
+class _ScreenIterator(ctypes.Structure):
+    # data points at an xcb_screen_t, whose first field is the root window
+    _fields_ = [("data", ctypes.POINTER(ctypes.c_uint32)), ("rem", ctypes.c_int), ("index", ctypes.c_int)]
+
+
+class _InternAtomReply(ctypes.Structure):
+    _fields_ = [("response_type", ctypes.c_uint8), ("pad0", ctypes.c_uint8), ("sequence", ctypes.c_uint16),
+                ("length", ctypes.c_uint32), ("atom", ctypes.c_uint32)]
+
+
+class _GeometryReply(ctypes.Structure):
+    _fields_ = [("response_type", ctypes.c_uint8), ("depth", ctypes.c_uint8), ("sequence", ctypes.c_uint16),
+                ("length", ctypes.c_uint32), ("root", ctypes.c_uint32), ("x", ctypes.c_int16),
+                ("y", ctypes.c_int16), ("width", ctypes.c_uint16), ("height", ctypes.c_uint16),
+                ("border_width", ctypes.c_uint16)]
+
+
+class _TranslateReply(ctypes.Structure):
+    _fields_ = [("response_type", ctypes.c_uint8), ("same_screen", ctypes.c_uint8),
+                ("sequence", ctypes.c_uint16), ("length", ctypes.c_uint32), ("child", ctypes.c_uint32),
+                ("dst_x", ctypes.c_int16), ("dst_y", ctypes.c_int16)]
+
+
+class _PropertyNotify(ctypes.Structure):
+    _fields_ = [("response_type", ctypes.c_uint8), ("pad0", ctypes.c_uint8), ("sequence", ctypes.c_uint16),
+                ("window", ctypes.c_uint32), ("atom", ctypes.c_uint32)]
+
+
+class _Xcb:
+    """
+    The few libxcb calls the detector needs, through ctypes (no Python
+    package). XCB rather than Xlib: errors come back with each reply instead
+    of through a process-wide handler that Tk also sets, and a connection
+    may be used from any thread.
+    """
+
+    def __init__(self):
+        self.lib = lib = ctypes.CDLL("libxcb.so.1")
+        self.libc = ctypes.CDLL(None)
+        self.libc.free.argtypes = [ctypes.c_void_p]
+        c, u8, u16, u32, ptr = ctypes.c_void_p, ctypes.c_uint8, ctypes.c_uint16, ctypes.c_uint32, ctypes.c_void_p
+        lib.xcb_connect.argtypes = [ctypes.c_char_p, ctypes.POINTER(ctypes.c_int)]
+        lib.xcb_connect.restype = c
+        lib.xcb_connection_has_error.argtypes = [c]
+        lib.xcb_get_setup.argtypes = [c]
+        lib.xcb_get_setup.restype = ptr
+        lib.xcb_setup_roots_iterator.argtypes = [ptr]
+        lib.xcb_setup_roots_iterator.restype = _ScreenIterator
+        lib.xcb_screen_next.argtypes = [ctypes.POINTER(_ScreenIterator)]
+        lib.xcb_intern_atom.argtypes = [c, u8, u16, ctypes.c_char_p]
+        lib.xcb_intern_atom.restype = _Cookie
+        lib.xcb_intern_atom_reply.argtypes = [c, _Cookie, ptr]
+        lib.xcb_intern_atom_reply.restype = ctypes.POINTER(_InternAtomReply)
+        lib.xcb_get_property.argtypes = [c, u8, u32, u32, u32, u32, u32]
+        lib.xcb_get_property.restype = _Cookie
+        lib.xcb_get_property_reply.argtypes = [c, _Cookie, ptr]
+        lib.xcb_get_property_reply.restype = ptr
+        lib.xcb_get_property_value.argtypes = [ptr]
+        lib.xcb_get_property_value.restype = ptr
+        lib.xcb_get_property_value_length.argtypes = [ptr]
+        lib.xcb_get_geometry.argtypes = [c, u32]
+        lib.xcb_get_geometry.restype = _Cookie
+        lib.xcb_get_geometry_reply.argtypes = [c, _Cookie, ptr]
+        lib.xcb_get_geometry_reply.restype = ctypes.POINTER(_GeometryReply)
+        lib.xcb_translate_coordinates.argtypes = [c, u32, u32, ctypes.c_int16, ctypes.c_int16]
+        lib.xcb_translate_coordinates.restype = _Cookie
+        lib.xcb_translate_coordinates_reply.argtypes = [c, _Cookie, ptr]
+        lib.xcb_translate_coordinates_reply.restype = ctypes.POINTER(_TranslateReply)
+        lib.xcb_change_window_attributes.argtypes = [c, u32, u32, ptr]
+        lib.xcb_change_window_attributes.restype = _Cookie
+        lib.xcb_flush.argtypes = [c]
+        lib.xcb_wait_for_event.argtypes = [c]
+        lib.xcb_wait_for_event.restype = ptr
+
+        screen = ctypes.c_int(0)
+        self.conn = lib.xcb_connect(None, ctypes.byref(screen))
+        if not self.conn or lib.xcb_connection_has_error(self.conn):
+            raise OSError("cannot connect to the X server")
+        roots = lib.xcb_setup_roots_iterator(lib.xcb_get_setup(self.conn))
+        for _ in range(screen.value):
+            lib.xcb_screen_next(ctypes.byref(roots))
+        self.root = roots.data[0]
+
+    def _reply(self, function, cookie):
+        """Reply pointer, or None when the server answered with an error (freed)"""
+        error = ctypes.c_void_p()
+        reply = function(self.conn, cookie, ctypes.byref(error))
+        if error.value:
+            self.libc.free(error)
+        return reply or None
+
+    def _free(self, reply):
+        self.libc.free(ctypes.cast(reply, ctypes.c_void_p))
+
+    def atom(self, name):
+        name = name.encode()
+        reply = self._reply(self.lib.xcb_intern_atom_reply,
+                            self.lib.xcb_intern_atom(self.conn, 0, len(name), name))
+        if reply is None:
+            raise OSError(f"cannot intern {name!r}")
+        atom = reply.contents.atom
+        self._free(reply)
+        return atom
+
+    def property(self, window, atom):
+        """32-bit values of a window property ([] when unset or the window is gone)"""
+        reply = self._reply(self.lib.xcb_get_property_reply,
+                            self.lib.xcb_get_property(self.conn, 0, window, atom, _ATOM_ANY, 0, 64))
+        if reply is None:
+            return []
+        try:
+            count = self.lib.xcb_get_property_value_length(reply) // 4
+            values = ctypes.cast(self.lib.xcb_get_property_value(reply), ctypes.POINTER(ctypes.c_uint32))
+            return [values[i] for i in range(count)]
+        finally:
+            self._free(reply)
+
+    def rectangle(self, window):
+        """(x, y, width, height) in root coordinates, or None if the window is gone"""
+        geometry = self._reply(self.lib.xcb_get_geometry_reply, self.lib.xcb_get_geometry(self.conn, window))
+        if geometry is None:
+            return None
+        width, height = geometry.contents.width, geometry.contents.height
+        self._free(geometry)
+        origin = self._reply(self.lib.xcb_translate_coordinates_reply,
+                             self.lib.xcb_translate_coordinates(self.conn, window, self.root, 0, 0))
+        if origin is None:
+            return None
+        x, y = origin.contents.dst_x, origin.contents.dst_y
+        self._free(origin)
+        return x, y, width, height
+
+    def watch(self, window, mask):
+        values = (ctypes.c_uint32 * 1)(mask)
+        self.lib.xcb_change_window_attributes(self.conn, window, _CW_EVENT_MASK, values)
+        self.lib.xcb_flush(self.conn)
+
+    def wait_for_event(self):
+        """(type, window, atom) of the next event; None when the connection is lost"""
+        event = self.lib.xcb_wait_for_event(self.conn)
+        if not event:
+            return None
+        notify = ctypes.cast(event, ctypes.POINTER(_PropertyNotify)).contents
+        result = (notify.response_type & 0x7f, notify.window, notify.atom)
+        self.libc.free(event)
+        return result
+
+
+class X11Detector(NullDetector):
+    """Event-driven cache of the active window's fullscreen state"""
+
+    name = "x11"
+
+    def __init__(self, monitors):
+        super().__init__()
+        self.monitors = list(monitors)
+        self.xcb = _Xcb()
+        self.atom_active = self.xcb.atom("_NET_ACTIVE_WINDOW")
+        self.atom_state = self.xcb.atom("_NET_WM_STATE")
+        self.atom_fullscreen = self.xcb.atom("_NET_WM_STATE_FULLSCREEN")
+
+        self._fullscreen = False
+        self._active = None
+        self.updated_at = 0.0
+        self.updates = 0
+
+        self.xcb.watch(self.xcb.root, _EVENT_MASK_PROPERTY_CHANGE)
+        self._evaluate()
+        threading.Thread(target=self._listen, name="fullscreen-x11", daemon=True).start()
+
+    def _evaluate(self):
+        """Re-read the active window (only called on X events)"""
+        xcb = self.xcb
+        fullscreen = False
+        active = xcb.property(xcb.root, self.atom_active)
+        wid = active[0] if active else 0
+        if wid:
+            if wid != self._active:
+                # Follow the new active window's state and geometry changes
+                xcb.watch(wid, _EVENT_MASK_PROPERTY_CHANGE | _EVENT_MASK_STRUCTURE_NOTIFY)
+                self._active = wid
+            if self.atom_fullscreen in xcb.property(wid, self.atom_state):
+                fullscreen = True
+            else:
+                # None: the window vanished between the event and the query
+                rectangle = xcb.rectangle(wid)
+                fullscreen = rectangle is not None and _covers_monitor(*rectangle, self.monitors)
+        else:
+            self._active = None
+        self._fullscreen = fullscreen
+        self.updated_at = time.monotonic()
+        self.updates += 1
+
+    def _listen(self):
+        while True:
+            event = self.xcb.wait_for_event()
+            if event is None:
+                return
+            kind, window, atom = event
+            if kind == _PROPERTY_NOTIFY and atom in (self.atom_active, self.atom_state):
+                self._evaluate()
+            elif kind == _CONFIGURE_NOTIFY:
+                self._evaluate()
+
+    def is_fullscreen(self):
+        started = time.perf_counter()
+        result = self._fullscreen
+        self.last_check_ms = (time.perf_counter() - started) * 1000
+        return result
+
+    def describe(self):
+        age = time.monotonic() - self.updated_at
+        return f"{self.name} ({self.last_check_ms:.3f} ms, cache age {age:.0f} s, {self.updates} updates)"
+
+
+class WindowsDetector(NullDetector):
+    """Foreground window vs. its monitor rectangle via user32"""
+
+    name = "win32"
+
+    def __init__(self):
+        super().__init__()
+        from ctypes import wintypes
+
+        class MONITORINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.DWORD), ("rcMonitor", wintypes.RECT),
+                        ("rcWork", wintypes.RECT), ("dwFlags", wintypes.DWORD)]
+
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._MONITORINFO = MONITORINFO
+        self.user32 = ctypes.windll.user32
+        # Desktop and shell windows cover the screen but are not "fullscreen apps"
+        self._ignored = {self.user32.GetDesktopWindow(), self.user32.GetShellWindow()}
+
+    def is_fullscreen(self):
+        started = time.perf_counter()
+        ctypes, wintypes, user32 = self._ctypes, self._wintypes, self.user32
+        result = False
+        hwnd = user32.GetForegroundWindow()
+        if hwnd and hwnd not in self._ignored:
+            class_name = ctypes.create_unicode_buffer(64)
+            user32.GetClassNameW(hwnd, class_name, 64)
+            if class_name.value not in ("Progman", "WorkerW"):
+                rect = wintypes.RECT()
+                info = self._MONITORINFO()
+                info.cbSize = ctypes.sizeof(info)
+                monitor = user32.MonitorFromWindow(hwnd, 2)  # MONITOR_DEFAULTTONEAREST
+                if user32.GetWindowRect(hwnd, ctypes.byref(rect)) and \
+                        user32.GetMonitorInfoW(monitor, ctypes.byref(info)):
+                    mon = info.rcMonitor
+                    result = (rect.left <= mon.left and rect.top <= mon.top and
+                              rect.right >= mon.right and rect.bottom >= mon.bottom)
+        self.last_check_ms = (time.perf_counter() - started) * 1000
+        return result
+
+
+def create_detector(monitors):
+    """Pick the best available backend; never raises"""
+    try:
+        if sys.platform == "win32":
+            return WindowsDetector()
+        if os.environ.get("DISPLAY"):
+            return X11Detector(monitors)
+    except Exception as e:
+        print(f"Fullscreen detection unavailable: {e}")
+    return NullDetector()
@@ -0,0 +1,145 @@
+"""
+Break presentation under full CPU and I/O load.
+
+Starts one busy-loop process per core (plus one) and a disk writer, then
+shows popups and blackouts through the same UI runner the scheduler uses
+(zygote or in-process, see UI_PROCESS) and reports:
+
+    popup       request -> first paint (median, max)
+    black       blackout start -> every window painted (median, max)
+    stutter     worst lateness of a countdown step
+
+in three phases: idle, loaded without the priority boost, loaded with it
+(PRESENTATION_BOOST). Assets are pre-warmed before each phase as the
+scheduler does before a warning. A phase is on time when every figure is
+within the budgets below.
+
+Usage:
+    python -m healthyself.load_bench
+    python -m healthyself.load_bench --runs 5 --seconds 4 --display sdl --audio none
+    xvfb-run -a python -m healthyself.load_bench          # Linux, headless
+
+Lowering the nice value needs privileges on Linux - see priority.py.
+"""
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+from . import config, supervisor
+
+POPUP_BUDGET_MS = 500
+BLACK_BUDGET_MS = 250
+TICK_BUDGET_MS = 100
+
+CPU_HOG = "while True: pass"
+# Rewrites a 64 MB file with fsync and drops it from the page cache, forever
+IO_HOG = """
+import os, sys
+path, block = sys.argv[1], os.urandom(1 << 20)
+while True:
+    with open(path, "wb") as f:
+        for _ in range(64):
+            f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+"""
+
+
+def start_hogs(scratch):
+    """Saturate every core and the disk; returns the processes"""
+    hogs = [subprocess.Popen([sys.executable, "-c", CPU_HOG]) for _ in range((os.cpu_count() or 1) + 1)]
+    hogs.append(subprocess.Popen([sys.executable, "-c", IO_HOG, os.path.join(scratch, "io-hog.bin")]))
+    return hogs
+
+
+def stop_hogs(hogs):
+    for hog in hogs:
+        hog.kill()
+    for hog in hogs:
+        hog.wait()
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else None
+
+
+def run_phase(args, boost):
+    """{"popup": [...], "black": [...], "stutter": [...]} in ms for one phase"""
+    config.PRESENTATION_BOOST = boost
+    # A new runner per phase: the zygote forks with the current config
+    ui = supervisor.create_ui(args.display, args.audio)
+    results = {"popup": [], "black": [], "stutter": []}
+    try:
+        ui.prewarm(config.MUSIC_FILES)
+        for _ in range(args.runs):
+            if not args.no_popup:
+                try:
+                    # Unanswered popup: counts down for the whole --seconds
+                    ui.popup(countdown=int(args.seconds), is_long=False)
+                    if ui.last_popup["latency_ms"] is not None:
+                        results["popup"].append(ui.last_popup["latency_ms"])
+                    results["stutter"].append(ui.last_popup["tick_lag_ms"])
+                except supervisor.UIError as e:
+                    print(f"Popups skipped: {e}")
+                    args.no_popup = True
+            result = ui.blackout(args.seconds, False)
+            if result["time_to_black_ms"] is not None:
+                results["black"].append(result["time_to_black_ms"])
+            results["stutter"].append(result["tick_lag_ms"])
+    finally:
+        ui.shutdown()
+    return results
+
+
+def on_time(results):
+    checks = (("popup", POPUP_BUDGET_MS), ("black", BLACK_BUDGET_MS), ("stutter", TICK_BUDGET_MS))
+    return all(max(results[key]) <= budget for key, budget in checks if results[key])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Popup/blackout timing under synthetic CPU and I/O load")
+    parser.add_argument("--runs", type=int, default=3, help="popups and blackouts per phase")
+    parser.add_argument("--seconds", type=float, default=3.0, help="length of each popup and blackout")
+    parser.add_argument("--display", default=config.DISPLAY_BACKEND)
+    parser.add_argument("--audio", default="none")
+    parser.add_argument("--no-popup", action="store_true", help="blackouts only")
+    args = parser.parse_args(argv)
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY") and args.display != "sdl":
+        print("No DISPLAY - run under a virtual display, e.g. xvfb-run -a python -m healthyself.load_bench")
+        return 2
+
+    phases = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        print("Phase: idle")
+        phases["idle"] = run_phase(args, boost=True)
+        hogs = start_hogs(scratch)
+        try:
+            print(f"Phase: loaded ({len(hogs) - 1} CPU hogs + disk writer), no boost")
+            phases["loaded"] = run_phase(args, boost=False)
+            print("Phase: loaded, boost")
+            phases["loaded+boost"] = run_phase(args, boost=True)
+        finally:
+            stop_hogs(hogs)
+
+    def cell(values):
+        if not values:
+            return f"{'-':>17}"
+        return f"{median(values):>7.0f} / {max(values):>5.0f}ms"
+
+    print(f"\n{'Phase':<14} {'Popup med/max':>17} {'Black med/max':>17} {'Stutter med/max':>17}  On time")
+    for name, results in phases.items():
+        print(f"{name:<14} {cell(results['popup'])} {cell(results['black'])} {cell(results['stutter'])}"
+              f"  {'yes' if on_time(results) else 'NO'}")
+    print(f"\nBudgets: popup {POPUP_BUDGET_MS} ms, black {BLACK_BUDGET_MS} ms, stutter {TICK_BUDGET_MS} ms "
+          f"(UI: {config.UI_PROCESS}, boost nice {config.BOOST_NICE})")
+    return 0 if on_time(phases["loaded+boost"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
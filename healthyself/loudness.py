@@ -0,0 +1,174 @@
+"""
+Per-track loudness normalization.
+
+Each music file is decoded once and its loudness measured with vectorized
+NumPy passes over the PCM, CHUNK_SECONDS at a time. 16-bit WAV files are
+read in chunks with the wave module, so only one chunk is ever in memory;
+compressed formats are decoded whole by the audio backend (pygame has no
+streaming decoder) and then analysed in the same chunks. The result is stored in a small JSON
+cache keyed by the file's path, mtime and size, so a track is analysed
+again only when the file itself changes. At break time the gain is a
+dictionary lookup applied through the mixer volume - nothing is decoded
+or analysed on the break path.
+
+Loudness is gated RMS in dBFS over 400 ms blocks, with the absolute
+(-70 dB) and relative (-10 dB) gates of EBU R128 but without its
+K-weighting filter. The mixer volume can only attenuate, so loud tracks
+are brought down to LOUDNESS_TARGET and quieter ones play at full volume.
+"""
+import os
+import json
+import math
+
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".disengage", "cache", "loudness.json")
+BLOCK_SECONDS = 0.4
+ABSOLUTE_GATE = -70.0       # dBFS
+RELATIVE_GATE = -10.0       # dB below the absolute-gated loudness
+CHUNK_SECONDS = 60          # decoded PCM is analysed in chunks to bound memory
+MIN_VOLUME = 0.05
+
+
+def analyse(samples, rate):
+    """Gated loudness (dBFS) of int16 PCM shaped (samples,) or (samples, channels)"""
+    frames = samples.reshape(len(samples), -1)
+    step = int(rate * BLOCK_SECONDS) * max(1, int(CHUNK_SECONDS / BLOCK_SECONDS))
+    return analyse_chunks((frames[start:start + step] for start in range(0, len(frames), step)), rate)
+
+
+def analyse_chunks(chunks, rate):
+    """
+    Gated loudness (dBFS) of int16 PCM arriving as chunks shaped
+    (frames, channels); a block split between two chunks is carried over.
+    """
+    import numpy as np
+
+    block = int(rate * BLOCK_SECONDS)
+    energies = []
+    carry = None
+    for chunk in chunks:
+        if carry is not None and len(carry):
+            chunk = np.concatenate([carry, chunk])
+        usable = len(chunk) - len(chunk) % block
+        carry = chunk[usable:]
+        if not usable:
+            continue
+        part = chunk[:usable].astype(np.float32) / 32768.0
+        # Mean square per block, averaged over channels
+        energies.append((part * part).reshape(-1, block, part.shape[1]).mean(axis=(1, 2)))
+    if not energies:
+        return ABSOLUTE_GATE
+    energy = np.concatenate(energies)
+
+    with np.errstate(divide="ignore"):
+        block_db = 10 * np.log10(energy)
+    gated = energy[block_db > ABSOLUTE_GATE]
+    if not len(gated):
+        return ABSOLUTE_GATE
+    threshold = 10 * math.log10(gated.mean()) + RELATIVE_GATE
+    gated = energy[block_db > max(threshold, ABSOLUTE_GATE)]
+    return 10 * math.log10(gated.mean())
+
+
+def wav_chunks(path):
+    """
+    (chunks, rate) for a 16-bit PCM WAV file, read CHUNK_SECONDS at a time;
+    None for any other file (the backend decodes it whole instead)
+    """
+    import wave
+
+    try:
+        with wave.open(path, "rb") as wav:
+            rate, width, channels = wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+    except (OSError, EOFError, wave.Error):
+        return None
+    if width != 2:
+        return None
+
+    def chunks():
+        import numpy as np
+
+        with wave.open(path, "rb") as wav:
+            while True:
+                data = wav.readframes(rate * CHUNK_SECONDS)
+                if not data:
+                    return
+                yield np.frombuffer(data, dtype="<i2").reshape(-1, channels)
+
+    return chunks(), rate
+
+
+def gain_for(loudness, target):
+    """Mixer volume (MIN_VOLUME..1.0) that brings loudness down to target"""
+    return min(1.0, max(MIN_VOLUME, 10 ** ((target - loudness) / 20)))
+
+
+def stale(names, cache):
+    """(name, path) of music files not yet measured or changed since"""
+    from . import assets
+
+    result = []
+    for name in names:
+        path = None if name.startswith("ambient:") else assets.resolve(name)
+        if path is not None and not cache.fresh(path):
+            result.append((name, path))
+    return result
+
+
+class LoudnessCache:
+    """path -> measured loudness, persisted with each file's mtime and size"""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        self._loaded = None         # cache file mtime when last read/written
+        self.refresh()
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def refresh(self):
+        """Re-read the file if another process (a UI worker) rewrote it"""
+        mtime = self._file_mtime()
+        if mtime is None or mtime == self._loaded:
+            return
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+            self._loaded = mtime
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def _signature(path):
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+
+    def fresh(self, path):
+        """True if path was measured and is unchanged since"""
+        entry = self.entries.get(path)
+        try:
+            return entry is not None and entry["signature"] == self._signature(path)
+        except OSError:
+            return False
+
+    def loudness(self, path):
+        """Measured loudness (None if the file could not be analysed)"""
+        return self.entries[path]["loudness"]
+
+    def store(self, path, loudness):
+        self.entries[path] = {"signature": self._signature(path), "loudness": loudness}
+
+    def save(self):
+        """Write atomically so a crash never leaves a truncated cache"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f, indent=1)
+            os.replace(tmp, self.path)
+            self._loaded = self._file_mtime()
+        except OSError as e:
+            print(f"Loudness cache write error: {e}")
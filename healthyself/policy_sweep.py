@@ -0,0 +1,242 @@
+"""
+Vectorized break-policy sweep over recorded activity traces.
+
+Replays the main_loop() break logic (long break first, short break skipped
+when the long break is within SKIP_THRESHOLD) for a whole grid of
+BREAK_INTERVAL_SHORT / BREAK_INTERVAL_LONG / SKIP_THRESHOLD combinations at
+once. All combinations advance together, one break decision per step, so
+the Python loop runs once per break rather than once per combination.
+
+Trace format (one or more files, concatenated in time order):
+    *.csv  - "epoch_seconds,active" rows (active = 1 while typing/using mouse)
+    *.npy  - 1-D array with one 0/1 sample per minute
+
+Usage:
+    python -m healthyself.policy_sweep trace.csv --short 30:90:5 --long 120:240:15 --skip 0:45:5
+    python -m healthyself.policy_sweep --synthetic 90
+"""
+import sys
+import time
+import argparse
+import numpy as np
+
+# Defaults mirror config.py (minutes)
+DEFAULT_DURATION_SHORT = 2
+DEFAULT_DURATION_LONG = 5
+WARNING_MINUTES = 1         # DisengagePopup countdown before the blackout
+NATURAL_BREAK_MINUTES = 5   # Idle stretch long enough to count as a real break
+
+
+# ============================================================
+# TRACE LOADING
+# ============================================================
+
+def load_trace(paths):
+    """Load activity traces into one boolean per-minute array (gaps are idle)"""
+    parts = []
+    for path in paths:
+        if path.endswith(".npy"):
+            parts.append(np.load(path).astype(bool))
+            continue
+        data = np.loadtxt(path, delimiter=",", ndmin=2)
+        minutes = ((data[:, 0] - data[0, 0]) // 60).astype(np.int64)
+        trace = np.zeros(minutes[-1] + 1, dtype=bool)
+        np.logical_or.at(trace, minutes, data[:, 1] > 0)
+        parts.append(trace)
+    return np.concatenate(parts)
+
+
+def synthetic_trace(days, seed=0):
+    """Workday-shaped trace: 9:00-17:30 weekdays with lunch and random pauses"""
+    rng = np.random.default_rng(seed)
+    minute_of_day = np.arange(days * 1440) % 1440
+    day = np.arange(days * 1440) // 1440
+    working = (minute_of_day >= 540) & (minute_of_day < 1050) & (day % 7 < 5)
+    lunch = (minute_of_day >= 720) & (minute_of_day < 765)
+    active = working & ~lunch & (rng.random(days * 1440) > 0.08)
+    return active
+
+
+# ============================================================
+# TRACE PRE-PROCESSING
+# ============================================================
+
+class RunIndex:
+    """
+    Per-minute run lengths of continuous screen time plus a sparse table,
+    so "longest continuous stretch in [a, b)" is an O(1) vectorized query.
+    Idle gaps of NATURAL_BREAK_MINUTES or more end a run.
+    """
+
+    def __init__(self, active, natural_break=NATURAL_BREAK_MINUTES):
+        n = len(active)
+        idx = np.arange(n)
+
+        # A minute is "on screen" if active, or idle but inside a short gap
+        idle = ~active
+        gap_start = np.where(idle & np.r_[True, ~idle[:-1]], idx, 0)
+        gap_start = np.maximum.accumulate(gap_start)
+        gap_end = np.where(idle & np.r_[~idle[1:], True], idx, n)
+        gap_end = np.minimum.accumulate(gap_end[::-1])[::-1]
+        on_screen = active | (gap_end - gap_start + 1 < natural_break)
+
+        run_start = np.where(on_screen & np.r_[True, ~on_screen[:-1]], idx, 0)
+        self.run_start = np.maximum.accumulate(run_start)
+        run_end = np.where(on_screen & np.r_[~on_screen[1:], True], idx, n)
+        self.run_end = np.minimum.accumulate(run_end[::-1])[::-1]
+        self.on_screen = on_screen
+        self.length_at = np.where(on_screen, idx - self.run_start + 1, 0).astype(np.int32)
+
+        # Sparse table for range-max over length_at, one padded row per level
+        levels = max(1, int(np.log2(max(n, 1))) + 1)
+        self.table = np.zeros((levels, n), dtype=np.int32)
+        self.table[0] = self.length_at
+        span = 1
+        for k in range(1, levels):
+            prev = self.table[k - 1]
+            self.table[k, :n - span] = np.maximum(prev[:n - span], prev[span:])
+            span *= 2
+
+    def _range_max(self, lo, hi):
+        """Max of length_at[lo:hi] for arrays of bounds (0 where empty)"""
+        width = np.maximum(hi - lo, 1)
+        level = np.log2(width).astype(np.int64)
+        n = self.table.shape[1]
+        left = self.table[level, np.minimum(lo, n - 1)]
+        right = self.table[level, np.clip(hi - (1 << level), 0, n - 1)]
+        return np.where(hi > lo, np.maximum(left, right), 0)
+
+    def longest(self, lo, hi):
+        """Longest on-screen stretch inside [lo, hi) for each pair of bounds"""
+        n = len(self.on_screen)
+        lo = np.clip(lo, 0, n)
+        hi = np.clip(hi, 0, n)
+        probe = np.minimum(lo, n - 1)
+        inside = self.on_screen[probe] & (lo < hi)
+        # The run straddling lo is clipped to start at lo
+        first_end = np.where(inside, np.minimum(self.run_end[probe], hi - 1), lo - 1)
+        clipped = np.where(inside, first_end - lo + 1, 0)
+        rest = self._range_max(np.minimum(first_end + 1, hi), hi)
+        return np.maximum(clipped, rest)
+
+
+# ============================================================
+# SWEEP
+# ============================================================
+
+def parse_range(spec):
+    """'30:90:5' -> [30, 35, ..., 90]; '60' -> [60]"""
+    parts = [int(p) for p in spec.split(":")]
+    if len(parts) == 1:
+        return np.array(parts)
+    start, stop = parts[0], parts[1]
+    step = parts[2] if len(parts) > 2 else 1
+    return np.arange(start, stop + 1, step)
+
+
+def sweep(active, shorts, longs, skips, duration_short=DEFAULT_DURATION_SHORT,
+          duration_long=DEFAULT_DURATION_LONG, runs=None):
+    """
+    Evaluate every (short, long, skip) combination over the trace.
+    Returns a dict of equal-length arrays, one entry per combination.
+    """
+    S, L, K = (g.ravel().astype(np.int64) for g in np.meshgrid(shorts, longs, skips, indexing="ij"))
+    n = len(active)
+    runs = runs or RunIndex(active)
+    combos = len(S)
+
+    taken = np.zeros(combos, dtype=np.int64)
+    skipped = np.zeros(combos, dtype=np.int64)
+    interrupted = np.zeros(combos, dtype=np.int64)
+    max_screen = np.zeros(combos, dtype=np.int64)
+
+    # Working set: only combinations that have not run off the end of the trace
+    ids = np.arange(combos)
+    s, l, k = S, L, K
+    last_short = np.zeros(combos, dtype=np.int64)
+    last_long = np.zeros(combos, dtype=np.int64)
+
+    while len(ids):
+        due_long = last_long + l - WARNING_MINUTES
+        due_short = last_short + s - WARNING_MINUTES
+
+        # Short break due first but long break within SKIP_THRESHOLD -> wait for long
+        skip = (due_short < due_long) & (due_long + WARNING_MINUTES - due_short <= k)
+        is_long = (due_long <= due_short) | skip
+        blackout = np.where(is_long, due_long, due_short) + WARNING_MINUTES
+
+        # Finished combinations: account for the tail, then drop them
+        done = blackout >= n
+        if done.any():
+            gone = ids[done]
+            max_screen[gone] = np.maximum(max_screen[gone], runs.longest(last_short[done], np.full(len(gone), n)))
+            keep = ~done
+            ids, s, l, k = ids[keep], s[keep], l[keep], k[keep]
+            last_short, last_long = last_short[keep], last_long[keep]
+            skip, is_long, blackout = skip[keep], is_long[keep], blackout[keep]
+            if not len(ids):
+                break
+
+        skipped[ids] += skip
+        taken[ids] += 1
+        interrupted[ids] += active[blackout]
+        # Screen time since the previous break ended (last_short is always the last break end)
+        max_screen[ids] = np.maximum(max_screen[ids], runs.longest(last_short, blackout))
+
+        end = blackout + np.where(is_long, duration_long, duration_short)
+        last_short = end
+        last_long = np.where(is_long, end, last_long)
+
+    return {
+        "short": S, "long": L, "skip": K,
+        "taken": taken, "skipped": skipped,
+        "interrupted": interrupted, "max_screen": max_screen,
+    }
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep break policy parameters over activity traces")
+    parser.add_argument("traces", nargs="*", help="activity trace files (.csv or .npy)")
+    parser.add_argument("--synthetic", type=int, metavar="DAYS", help="use a generated workday trace")
+    parser.add_argument("--short", default="30:90:5", help="short interval range in minutes (start:stop:step)")
+    parser.add_argument("--long", default="120:240:15", help="long interval range in minutes")
+    parser.add_argument("--skip", default="0:45:5", help="skip threshold range in minutes")
+    parser.add_argument("--short-duration", type=int, default=DEFAULT_DURATION_SHORT)
+    parser.add_argument("--long-duration", type=int, default=DEFAULT_DURATION_LONG)
+    parser.add_argument("--sort", default="interrupted",
+                        choices=["interrupted", "max_screen", "taken", "skipped"])
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        active = synthetic_trace(args.synthetic)
+    elif args.traces:
+        active = load_trace(args.traces)
+    else:
+        parser.error("give trace files or --synthetic DAYS")
+
+    started = time.perf_counter()
+    result = sweep(active, parse_range(args.short), parse_range(args.long), parse_range(args.skip),
+                   args.short_duration, args.long_duration)
+    elapsed = time.perf_counter() - started
+
+    # Ignore combinations where the long break comes before the short one
+    valid = result["long"] > result["short"]
+    order = np.lexsort((result["max_screen"], result[args.sort]))
+    order = order[valid[order]][:args.top]
+
+    print(f"{'Short':>6} {'Long':>6} {'Skip':>5} {'Taken':>7} {'Skipped':>8} {'Interrupted':>12} {'MaxScreen':>10}")
+    for i in order:
+        print(f"{result['short'][i]:>5}m {result['long'][i]:>5}m {result['skip'][i]:>4}m "
+              f"{result['taken'][i]:>7} {result['skipped'][i]:>8} {result['interrupted'][i]:>12} "
+              f"{result['max_screen'][i]:>9}m")
+    print(f"\n{len(result['short'])} combinations x {len(active) / 1440:.0f} days in {elapsed:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
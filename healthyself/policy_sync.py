@@ -0,0 +1,442 @@
+"""
+Central break policy: pulled over HTTP, cached on disk, applied live.
+
+A policy is a JSON object of config.py settings (plus an optional
+"version" label):
+
+    {"version": "2026-10-19", "BREAK_INTERVAL_SHORT": 3000,
+     "WELLNESS_MESSAGES": ["Stretch", "Drink water"], "BREAK_RULES": ["weekends off"]}
+
+With POLICY_URL set, a background thread polls the endpoint every
+POLICY_POLL_INTERVAL seconds, +/- POLICY_POLL_JITTER so a fleet started
+at 9:00 doesn't poll in lockstep. Requests are conditional
+(If-None-Match / If-Modified-Since): an unchanged policy costs one
+304 with no body. Every accepted policy is written atomically to
+POLICY_CACHE_FILE and applied from there at the next start, so a laptop
+that boots offline keeps the last policy it saw. Failed polls back off
+exponentially (capped at the poll interval).
+
+A policy is validated as a whole (types, ranges, BREAK_RULES compile)
+and rejected as a whole. The poller only hands it over; the scheduler
+applies it between decisions with apply_pending(), so no decision ever
+sees half a policy. Timers keep their start times and are measured
+against the new intervals from the next check on; wait() returns early
+when a policy arrives so the new intervals take effect immediately.
+
+Stand-in server for testing (serves a file with ETag/Last-Modified):
+
+    python -m healthyself.policy_sync serve policy.json --port 8765
+    python -m healthyself.policy_sync fetch http://127.0.0.1:8765/policy.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import config, power
+from .audio import AMBIENT_KINDS
+
+MIN_BACKOFF = 30            # seconds after the first failed poll
+FIRST_POLL_SPREAD = 30      # first poll within this many seconds of startup
+WARNING_SECONDS = 60        # the popup comes this long before a break is due
+LOUDNESS_RANGE = (-60.0, 0.0)   # dBFS
+
+# Settings a policy may set -> expected type
+POLICY_KEYS = {
+    "BREAK_INTERVAL_SHORT": int,
+    "BREAK_DURATION_SHORT": int,
+    "BREAK_INTERVAL_LONG": int,
+    "BREAK_DURATION_LONG": int,
+    "SKIP_THRESHOLD": int,
+    "BREAK_RULES": list,
+    "MUSIC_FILES": list,
+    "AMBIENT_SOUND": str,
+    "LOUDNESS_TARGET": float,
+    "WELLNESS_MESSAGES": list,
+    "MESSAGE_MODE": str,
+    "MICRO_BREAK_ENABLED": bool,
+    "MICRO_BREAK_INTERVAL": int,
+    "MICRO_BREAK_DURATION": int,
+    "MICRO_BREAK_MESSAGE": str,
+}
+
+# int settings where 0 is meaningful (SKIP_THRESHOLD 0: never skip a short break)
+ZERO_ALLOWED = {"SKIP_THRESHOLD"}
+
+# Unknown settings already reported (every poll would repeat them)
+_ignored = set()
+
+
+class PolicyError(ValueError):
+    """A policy document that must not be applied"""
+
+
+def validate(document, base=None):
+    """
+    Settings dict from a policy document; raises PolicyError on any problem.
+    base: the local settings the policy is laid over (default: current config),
+    for checks between settings such as a duration against its interval.
+    """
+    if not isinstance(document, dict):
+        raise PolicyError("policy must be a JSON object")
+    settings = {}
+    for key, value in document.items():
+        if key == "version":
+            continue
+        expected = POLICY_KEYS.get(key)
+        if expected is None:
+            # Newer policy than this client - ignore rather than reject
+            if key not in _ignored:
+                _ignored.add(key)
+                print(f"Policy: ignoring unknown setting {key}")
+            continue
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise PolicyError(f"{key} must be {expected.__name__}, got {type(value).__name__}")
+        if expected is int and (value < 0 or (value == 0 and key not in ZERO_ALLOWED)):
+            raise PolicyError(f"{key} must be positive" if key not in ZERO_ALLOWED
+                              else f"{key} must not be negative")
+        if expected is list and not all(isinstance(item, str) for item in value):
+            raise PolicyError(f"{key} must be a list of strings")
+        if key in ("MUSIC_FILES", "WELLNESS_MESSAGES") and not value:
+            raise PolicyError(f"{key} must not be empty")
+        settings[key] = value
+    if settings.get("MESSAGE_MODE", "RANDOM") not in ("SEQUENTIAL", "RANDOM"):
+        raise PolicyError("MESSAGE_MODE must be SEQUENTIAL or RANDOM")
+    if base is None:
+        base = {key: getattr(config, key) for key in POLICY_KEYS}
+    _check_combined(dict(base, **settings))
+    if "BREAK_RULES" in settings:
+        from . import break_rules
+        try:
+            break_rules.RuleTable(settings["BREAK_RULES"])
+        except break_rules.RuleError as e:
+            raise PolicyError(f"BREAK_RULES: {e}")
+    return settings
+
+
+def _check_combined(merged):
+    """Enum and range checks on the settings as they would be applied"""
+    kinds = [merged["AMBIENT_SOUND"]] + [name.split(":", 1)[1] for name in merged["MUSIC_FILES"]
+                                         if name.startswith("ambient:")]
+    for kind in kinds:
+        if kind not in AMBIENT_KINDS:
+            raise PolicyError(f"Unknown ambient sound '{kind}' (expected one of {', '.join(AMBIENT_KINDS)})")
+    low, high = LOUDNESS_RANGE
+    if not low <= merged["LOUDNESS_TARGET"] <= high:
+        raise PolicyError(f"LOUDNESS_TARGET must be between {low:.0f} and {high:.0f} dBFS")
+    for kind in ("SHORT", "LONG"):
+        interval, duration = merged[f"BREAK_INTERVAL_{kind}"], merged[f"BREAK_DURATION_{kind}"]
+        if interval <= WARNING_SECONDS:
+            raise PolicyError(f"BREAK_INTERVAL_{kind} must be longer than the {WARNING_SECONDS}s warning")
+        if duration >= interval:
+            raise PolicyError(f"BREAK_DURATION_{kind} must be shorter than BREAK_INTERVAL_{kind}")
+    if merged["BREAK_INTERVAL_SHORT"] >= merged["BREAK_INTERVAL_LONG"]:
+        raise PolicyError("BREAK_INTERVAL_SHORT must be shorter than BREAK_INTERVAL_LONG")
+    if merged["SKIP_THRESHOLD"] >= merged["BREAK_INTERVAL_LONG"]:
+        raise PolicyError("SKIP_THRESHOLD must be shorter than BREAK_INTERVAL_LONG")
+    if merged["MICRO_BREAK_DURATION"] >= merged["MICRO_BREAK_INTERVAL"]:
+        raise PolicyError("MICRO_BREAK_DURATION must be shorter than MICRO_BREAK_INTERVAL")
+
+
+def fetch(url, etag=None, last_modified=None, timeout=10):
+    """
+    Conditional GET. Returns (document, etag, last_modified), or None when
+    the server answers 304 Not Modified. Raises OSError / ValueError on failure.
+    """
+    request = urllib.request.Request(url, headers={"Accept": "application/json",
+                                                   "User-Agent": "disengage-policy"})
+    if etag:
+        request.add_header("If-None-Match", etag)
+    if last_modified:
+        request.add_header("If-Modified-Since", last_modified)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            return (json.loads(body.decode("utf-8")),
+                    response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+
+
+class PolicySync:
+    """Background poller + on-disk cache; the scheduler applies what it finds"""
+
+    def __init__(self):
+        self.url = None
+        self.interval = 15 * 60
+        self.jitter = 0.2
+        self.cache_file = None
+        self.defaults = {}          # local config values, restored when a policy drops a key
+        self.etag = None
+        self.last_modified = None
+        self.version = None
+        self.failures = 0
+        self.polls = 0
+        self.not_modified = 0
+        self._pending = None        # validated settings waiting for the scheduler
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []        # called when a policy is queued (aio.py wakes its loop)
+
+    def configure(self, url, interval, jitter, cache_file):
+        self.url = url
+        self.interval = interval
+        self.jitter = jitter
+        self.cache_file = cache_file
+        self.defaults = {key: getattr(config, key) for key in POLICY_KEYS}
+
+    # ---------------- cache ----------------
+
+    def load_cached(self):
+        """Queue the cached policy (offline start); its validators are reused"""
+        if not self.url:
+            return False
+        try:
+            with open(self.cache_file) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(cached, dict) or cached.get("url") != self.url:
+            return False
+        try:
+            self._offer(cached["document"])
+        except (PolicyError, KeyError) as e:
+            print(f"Policy: cached policy rejected: {e}")
+            return False
+        self.etag = cached.get("etag")
+        self.last_modified = cached.get("last_modified")
+        return True
+
+    def _save(self, document):
+        """Write atomically so a crash never leaves a truncated cache"""
+        entry = {"url": self.url, "etag": self.etag, "last_modified": self.last_modified,
+                 "fetched_at": time.time(), "document": document}
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp = self.cache_file + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(entry, f, indent=1)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"Policy cache write error: {e}")
+
+    # ---------------- polling (background thread) ----------------
+
+    def _offer(self, document):
+        settings = validate(document, self.defaults or None)
+        with self._lock:
+            self.version = document.get("version")
+            self._pending = settings
+            self._changed.set()
+        for listener in self._listeners:
+            listener()
+
+    def poll(self):
+        """One conditional fetch; True if a new policy was queued"""
+        self.polls += 1
+        power.count_wakeup("policy")
+        try:
+            result = fetch(self.url, self.etag, self.last_modified, timeout=config.POLICY_TIMEOUT)
+        except (OSError, ValueError) as e:
+            self.failures += 1
+            print(f"\nPolicy: fetch failed ({e}) - keeping current policy")
+            return False
+        self.failures = 0
+        if result is None:
+            self.not_modified += 1
+            return False
+        document, etag, last_modified = result
+        try:
+            self._offer(document)
+        except PolicyError as e:
+            # Validators not updated: the same bad document is re-fetched
+            # (and re-rejected) only until the server changes it
+            print(f"\nPolicy: rejected ({e}) - keeping current policy")
+            return False
+        self.etag, self.last_modified = etag, last_modified
+        self._save(document)
+        return True
+
+    def next_delay(self):
+        """Jittered poll interval; exponential backoff while failing"""
+        base = self.interval
+        if self.failures:
+            base = min(self.interval, MIN_BACKOFF * 2 ** (self.failures - 1))
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run(self):
+        delay = random.uniform(0, min(FIRST_POLL_SPREAD, self.interval))
+        while not self._stop.wait(delay):
+            self.poll()
+            delay = self.next_delay()
+
+    def start(self):
+        if not self.url or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="policy-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------------- scheduler thread ----------------
+
+    def apply_pending(self):
+        """
+        Apply a queued policy to config in one step; settings the policy
+        doesn't mention go back to the local config. Returns {key: value}
+        for what changed.
+        """
+        with self._lock:
+            settings, self._pending = self._pending, None
+            self._changed.clear()
+        if settings is None:
+            return {}
+        target = dict(self.defaults, **settings)
+        changed = {key: value for key, value in target.items() if getattr(config, key) != value}
+        for key, value in changed.items():
+            setattr(config, key, value)
+        return changed
+
+    def discard(self, reason):
+        """
+        Drop an applied policy that passed validation but can't be used (the
+        UI process rejected it): back to the local config, and the cache file
+        is removed so the next start doesn't apply it again. The validators
+        are kept, so the same document isn't fetched again this session.
+        """
+        print(f"Policy {self.version or ''} dropped: {reason}")
+        for key, value in self.defaults.items():
+            setattr(config, key, value)
+        self.version = None
+        try:
+            os.remove(self.cache_file)
+        except OSError:
+            pass
+
+    def add_listener(self, callback):
+        """callback() runs (on the poll thread) whenever a policy is queued"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def wait(self, timeout):
+        """Sleep like time.sleep(timeout), but return early when a policy arrives"""
+        return self._changed.wait(timeout)
+
+    def report(self):
+        if not self.url:
+            return "Policy sync: off"
+        return (f"Policy sync: {self.url} version {self.version or '?'}, {self.polls} polls "
+                f"({self.not_modified} not modified, {self.failures} failing now)")
+
+
+syncer = PolicySync()
+report = syncer.report
+
+
+# ============================================================
+# STAND-IN SERVER (testing)
+# ============================================================
+
+def make_handler(path):
+    """Request handler serving one policy file with ETag / Last-Modified validators"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+                mtime = int(os.stat(path).st_mtime)
+            except OSError:
+                self.send_error(404)
+                return
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            last_modified = formatdate(mtime, usegmt=True)
+            if self.headers.get("If-None-Match") == etag or self._not_modified_since(mtime):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _not_modified_since(self, mtime):
+            # If-None-Match takes precedence when both are sent
+            since = self.headers.get("If-Modified-Since")
+            if not since or self.headers.get("If-None-Match"):
+                return False
+            try:
+                return mtime <= parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+
+        def log_message(self, fmt, *args):
+            print(f"[{time.strftime('%H:%M:%S')}] {self.address_string()} {fmt % args}")
+
+    return Handler
+
+
+def serve(path, host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), make_handler(path))
+    print(f"Serving {path} at http://{host}:{server.server_address[1]}/policy.json (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Break policy sync tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = sub.add_parser("serve", help="serve a policy file for testing")
+    serve_cmd.add_argument("file")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8765)
+    fetch_cmd = sub.add_parser("fetch", help="fetch and validate a policy once")
+    fetch_cmd.add_argument("url", nargs="?", default=config.POLICY_URL)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.file, args.host, args.port)
+        return 0
+    if not args.url:
+        print("No URL given and POLICY_URL is not set")
+        return 2
+    try:
+        document, etag, last_modified = fetch(args.url, timeout=config.POLICY_TIMEOUT)
+        settings = validate(document)
+    except (OSError, ValueError) as e:
+        print(f"Policy fetch failed: {e}")
+        return 1
+    print(f"Version {document.get('version', '?')}, ETag {etag}, Last-Modified {last_modified}")
+    for key, value in settings.items():
+        print(f"  {key} = {value!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
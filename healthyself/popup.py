@@ -0,0 +1,272 @@
+"""
+Warning popup and micro-break overlay (Tk).
+"""
+import sys
+import time
+from tkinter import Tk, Label, Button, StringVar, Frame, TclError
+
+from . import config, power, tracing, ui_dispatch
+
+
+class DisengagePopup:
+    """Popup window with countdown and snooze options (59-minute warning)"""
+    
+    def __init__(self, countdown_seconds=60, is_long_break=False, allow_snooze=True):
+        self.construct_start = tracing.now_us()
+        self.first_paint_at = None      # time.monotonic() of the first Expose
+        self.on_first_paint = None      # called (when idle) once the popup is visible
+        self.tick_lag_ms = 0.0          # worst lateness of a countdown step
+        self._next_tick = None
+        self.snooze_time = 0
+        self.ok_clicked = False
+        self.root = Tk()
+        ui_dispatch.dispatcher.attach_tk(self.root)
+        
+        # Title based on break type
+        if is_long_break:
+            self.root.title("Long Break Coming!")
+        else:
+            self.root.title("Short Break Time!")
+        
+        # FIX: Calculate window size dynamically based on screen resolution
+        # Get primary screen resolution for scaling
+        screen_width = self.root.winfo_screenwidth()
+        screen_height = self.root.winfo_screenheight()
+        
+        # Scale window based on monitor DPI/resolution
+        # For 1920x1080: use 600x320
+        # For 2560x1600: use 700x400 (scaled up proportionally)
+        if screen_height >= 1600:
+            # High-resolution monitor detected
+            window_width = 700
+            window_height = 400
+        else:
+            # Standard resolution monitor
+            window_width = 600
+            window_height = 320
+        
+        self.root.geometry(f"{window_width}x{window_height}")
+        self.root.resizable(False, False)
+        
+        # CRITICAL: Make window always on top
+        self.root.wm_attributes('-topmost', True)
+        self.root.lift()
+        self.root.focus_force()
+        
+        # Message label with adjusted wraplength
+        self.label_var = StringVar()
+        self.label = Label(
+            self.root, 
+            textvariable=self.label_var, 
+            font=("Helvetica", 28, "bold"),
+            fg="red",
+            wraplength=window_width - 50  # Dynamic wraplength
+        )
+        self.label.pack(pady=20)  # Reduced from 30 to save space
+        
+        # Button frame
+        btn_frame = Frame(self.root)
+        btn_frame.pack(pady=15)  # Reduced from 20 to save space
+        
+        snooze_options = [(0, "OK"), (15*60, "15 min"), (30*60, "30 min"), (60*60, "60 min")]
+        for snooze_sec, text in snooze_options:
+            btn = Button(
+                btn_frame, 
+                text=text, 
+                font=("Helvetica", 12),  # Slightly smaller font for more space 
+                width=10,
+                height=2,
+                command=lambda st=snooze_sec: self.on_button(st)
+            )
+            if snooze_sec and not allow_snooze:
+                # Daily snooze limit reached (BREAK_RULES)
+                btn.configure(state="disabled")
+            btn.pack(side="left", padx=5)
+        
+        self.seconds = countdown_seconds
+        self.running = True
+        
+        tracing.complete("popup.construct", self.construct_start, tracing.now_us() - self.construct_start)
+        self._paint_binding = self.root.bind('<Expose>', self._on_first_paint, add='+')
+        
+    def _on_first_paint(self, event):
+        """Record (and trace) the first Expose - when the popup is actually visible"""
+        if self.first_paint_at is not None:
+            return
+        self.first_paint_at = time.monotonic()
+        self.root.unbind('<Expose>', self._paint_binding)
+        tracing.complete("popup.first_paint", self.construct_start, tracing.now_us() - self.construct_start)
+        if self.on_first_paint is not None:
+            self.root.after_idle(self.on_first_paint)
+        
+    def on_button(self, snooze_sec):
+        tracing.instant("popup.choice", snooze=snooze_sec)
+        self.snooze_time = snooze_sec
+        self.ok_clicked = True
+        self.running = False
+        self.root.destroy()
+        
+    def countdown(self):
+        if self.running and self.seconds >= 0:
+            power.count_wakeup("popup")
+            now = time.monotonic()
+            if self._next_tick is not None:
+                self.tick_lag_ms = max(self.tick_lag_ms, (now - self._next_tick) * 1000)
+            self.label_var.set(f"Time to be healthy again in\n{self.seconds} seconds")
+            # 1 s steps on AC, coarser on battery
+            step = min(power.current().popup_step, max(self.seconds, 1))
+            self.seconds -= step
+            self._next_tick = now + step
+            self.root.after(step * 1000, self.countdown)
+        elif self.running:
+            # Countdown finished, user didn't respond
+            tracing.instant("popup.timeout")
+            self.running = False
+            self.root.destroy()
+            
+    def show(self):
+        self.countdown()
+        self.root.mainloop()
+        return self.snooze_time, self.ok_clicked
+
+
+class MicroBreakOverlay:
+    """Small topmost, click-through countdown overlay for eye breaks"""
+    
+    def __init__(self, duration_seconds=None, message=None):
+        self.duration = duration_seconds or config.MICRO_BREAK_DURATION
+        self.message = message or config.MICRO_BREAK_MESSAGE
+        self.cpu_ms = None
+        self.root = None
+        self.label = None
+        
+    def _build(self):
+        root = Tk()
+        root.withdraw()
+        root.overrideredirect(True)
+        root.attributes('-topmost', True)
+        try:
+            root.attributes('-alpha', 0.85)
+            # X11: tell the window manager this is a notification (no focus, no taskbar)
+            root.attributes('-type', 'notification')
+        except TclError:
+            pass
+        root.configure(bg='black')
+        
+        self.label = Label(root, font=("Helvetica", 16), fg="cyan", bg="black", padx=18, pady=10)
+        self.label.pack()
+        
+        # Bottom-right corner of the primary screen
+        root.update_idletasks()
+        width, height = 320, root.winfo_reqheight()
+        x = root.winfo_screenwidth() - width - 30
+        y = root.winfo_screenheight() - height - 60
+        root.geometry(f"{width}x{height}+{x}+{y}")
+        root.deiconify()
+        self._make_click_through(root)
+        ui_dispatch.dispatcher.attach_tk(root)
+        self.root = root
+        
+    def _make_click_through(self, root):
+        """Mouse clicks pass through to whatever is underneath (Windows and X11)"""
+        try:
+            if sys.platform == "win32":
+                import ctypes
+                user32 = ctypes.windll.user32
+                root.update_idletasks()
+                hwnd = user32.GetParent(root.winfo_id())
+                GWL_EXSTYLE = -20
+                WS_EX_LAYERED, WS_EX_TRANSPARENT, WS_EX_NOACTIVATE = 0x80000, 0x20, 0x08000000
+                style = user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
+                user32.SetWindowLongW(hwnd, GWL_EXSTYLE, style | WS_EX_LAYERED | WS_EX_TRANSPARENT | WS_EX_NOACTIVATE)
+            elif root.tk.call("tk", "windowingsystem") == "x11":
+                root.update_idletasks()
+                # The wrapper is the top-level X window; its input region clips every child
+                _x11_empty_input_region(int(root.wm_frame(), 16))
+        except Exception as e:
+            print(f"Click-through unavailable: {e}")
+            
+    def tick(self, remaining):
+        if remaining <= 0:
+            self.root.destroy()
+            return
+        self.label.configure(text=f"{self.message} - {remaining}s")
+        self.root.after(1000, self.tick, remaining - 1)
+        
+    def show(self):
+        """Blocks for the countdown; records the CPU time it cost"""
+        cpu_start = time.process_time()
+        self._build()
+        self.tick(self.duration)
+        self.root.mainloop()
+        self.root = None
+        self.label = None
+        self.cpu_ms = (time.process_time() - cpu_start) * 1000
+        return self.cpu_ms
+
+
+def _x11_empty_input_region(window):
+    """
+    Give an X11 window an empty input region (SHAPE extension), so pointer
+    events go to the window below. Done on a private connection - the shape
+    stays with the window after it closes. libxcb-shape first (errors come
+    back with the request), else libXext after checking the extension is
+    there: an Xlib error on a display Tk doesn't own would end the process.
+    """
+    import ctypes
+    SHAPE_SET, SHAPE_INPUT, UNSORTED = 0, 2, 0
+    try:
+        xcb, xcb_shape = ctypes.CDLL("libxcb.so.1"), ctypes.CDLL("libxcb-shape.so.0")
+    except OSError:
+        xcb = None
+    if xcb is not None:
+        class Cookie(ctypes.Structure):
+            _fields_ = [("sequence", ctypes.c_uint)]
+        xcb.xcb_connect.argtypes = [ctypes.c_char_p, ctypes.c_void_p]
+        xcb.xcb_connect.restype = ctypes.c_void_p
+        xcb.xcb_connection_has_error.argtypes = [ctypes.c_void_p]
+        xcb.xcb_request_check.argtypes = [ctypes.c_void_p, Cookie]
+        xcb.xcb_request_check.restype = ctypes.c_void_p
+        xcb.xcb_disconnect.argtypes = [ctypes.c_void_p]
+        xcb_shape.xcb_shape_rectangles_checked.argtypes = [
+            ctypes.c_void_p, ctypes.c_uint8, ctypes.c_uint8, ctypes.c_uint8, ctypes.c_uint32,
+            ctypes.c_int16, ctypes.c_int16, ctypes.c_uint32, ctypes.c_void_p]
+        xcb_shape.xcb_shape_rectangles_checked.restype = Cookie
+        conn = xcb.xcb_connect(None, None)
+        try:
+            if not conn or xcb.xcb_connection_has_error(conn):
+                raise OSError("cannot connect to the X server")
+            error = xcb.xcb_request_check(conn, xcb_shape.xcb_shape_rectangles_checked(
+                conn, SHAPE_SET, SHAPE_INPUT, UNSORTED, window, 0, 0, 0, None))
+            if error:
+                ctypes.CDLL(None).free(ctypes.c_void_p(error))
+                raise OSError("SHAPE request failed (no input shapes on this server?)")
+        finally:
+            if conn:
+                xcb.xcb_disconnect(conn)
+        return
+
+    x11, xext = ctypes.CDLL("libX11.so.6"), ctypes.CDLL("libXext.so.6")
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XOpenDisplay.restype = ctypes.c_void_p
+    x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    xext.XShapeQueryExtension.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+    xext.XShapeQueryVersion.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+    xext.XShapeCombineRectangles.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    display = x11.XOpenDisplay(None)
+    if not display:
+        raise OSError("cannot connect to the X server")
+    try:
+        major, minor = ctypes.c_int(), ctypes.c_int()
+        # Input shapes are SHAPE 1.1
+        if (not xext.XShapeQueryExtension(display, ctypes.byref(major), ctypes.byref(minor))
+                or not xext.XShapeQueryVersion(display, ctypes.byref(major), ctypes.byref(minor))
+                or (major.value, minor.value) < (1, 1)):
+            raise OSError("the X server has no input shapes (SHAPE 1.1)")
+        xext.XShapeCombineRectangles(display, window, SHAPE_INPUT, 0, 0, None, 0, SHAPE_SET, UNSORTED)
+        x11.XSync(display, 0)
+    finally:
+        x11.XCloseDisplay(display)
@@ -0,0 +1,211 @@
+"""
+Power-aware scheduling profiles.
+
+On battery every wakeup costs energy: the main_loop check, the music
+thread's poll loop and the blackout/popup countdown callbacks. When the
+laptop is unplugged the low-power profile:
+
+- coalesces main_loop wakeups (sleep straight to the next due break
+  instead of waking every 60 s)
+- with BATTERY_AUDIO = "simple", polls the music thread once a second
+  instead of 10 times and gives the mixer a larger buffer, so the audio
+  device wakes the CPU less often ("normal" keeps the AC audio settings,
+  "off" plays no audio at all)
+- refreshes the blackout countdown once a minute and the popup countdown
+  every 5 seconds
+
+Wakeups are counted per profile, so wakeups-per-hour can be compared.
+
+AC detection: /sys/class/power_supply on Linux, GetSystemPowerStatus on
+Windows. Anything else is treated as AC.
+"""
+import os
+import sys
+import time
+import threading
+
+POWER_SUPPLY_DIR = "/sys/class/power_supply"
+DETECT_INTERVAL = 30        # seconds between power-source checks
+SIMPLE_AUDIO_BUFFER_SCALE = 4   # mixer buffer multiple with BATTERY_AUDIO = "simple"
+
+
+class PowerProfile:
+    """Timer and audio settings for one power source"""
+
+    def __init__(self, name, coalesce, max_sleep, music_poll, audio, countdown_minute_steps, popup_step,
+                 audio_buffer_scale=1):
+        self.name = name
+        self.coalesce = coalesce                    # sleep until next due event
+        self.max_sleep = max_sleep                  # upper bound on one main_loop sleep
+        self.music_poll = music_poll                # seconds between music checks
+        self.audio = audio                          # "normal", "simple" or "off"
+        self.audio_buffer_scale = audio_buffer_scale    # AUDIO_BUFFER multiple
+        self.countdown_minute_steps = countdown_minute_steps
+        self.popup_step = popup_step                # seconds per popup countdown tick
+
+    def countdown_step(self, remaining):
+        """Seconds until the blackout countdown needs its next refresh"""
+        remaining = int(remaining)
+        if not self.countdown_minute_steps:
+            return 1
+        if remaining > 60:
+            return remaining % 60 or 60             # land on the next M:00
+        return min(10, remaining)                   # last minute in 10 s steps
+
+
+AC = PowerProfile("ac", coalesce=False, max_sleep=60, music_poll=0.1, audio="normal",
+                  countdown_minute_steps=False, popup_step=1)
+
+
+def battery_profile(audio="simple"):
+    simple = audio == "simple"
+    return PowerProfile("battery", coalesce=True, max_sleep=15 * 60, music_poll=1.0 if simple else AC.music_poll,
+                        audio=audio, countdown_minute_steps=True, popup_step=5,
+                        audio_buffer_scale=SIMPLE_AUDIO_BUFFER_SCALE if simple else 1)
+
+
+# ============================================================
+# POWER SOURCE DETECTION
+# ============================================================
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _linux_on_battery():
+    try:
+        supplies = os.listdir(POWER_SUPPLY_DIR)
+    except OSError:
+        return False
+    discharging = False
+    for name in supplies:
+        base = os.path.join(POWER_SUPPLY_DIR, name)
+        kind = _read(os.path.join(base, "type"))
+        if kind == "Mains" and _read(os.path.join(base, "online")) == "1":
+            return False
+        if kind == "Battery" and _read(os.path.join(base, "status")) == "Discharging":
+            discharging = True
+    return discharging
+
+
+def _windows_on_battery():
+    import ctypes
+
+    class SYSTEM_POWER_STATUS(ctypes.Structure):
+        _fields_ = [("ACLineStatus", ctypes.c_ubyte), ("BatteryFlag", ctypes.c_ubyte),
+                    ("BatteryLifePercent", ctypes.c_ubyte), ("SystemStatusFlag", ctypes.c_ubyte),
+                    ("BatteryLifeTime", ctypes.c_ulong), ("BatteryFullLifeTime", ctypes.c_ulong)]
+
+    status = SYSTEM_POWER_STATUS()
+    if not ctypes.windll.kernel32.GetSystemPowerStatus(ctypes.byref(status)):
+        return False
+    return status.ACLineStatus == 0
+
+
+def on_battery():
+    try:
+        if sys.platform == "win32":
+            return _windows_on_battery()
+        if sys.platform.startswith("linux"):
+            return _linux_on_battery()
+    except Exception:
+        pass
+    return False
+
+
+# ============================================================
+# PROFILE SELECTION + WAKEUP ACCOUNTING
+# ============================================================
+
+class PowerManager:
+    """Tracks the active profile and counts wakeups per profile"""
+
+    def __init__(self):
+        self.enabled = False
+        self.battery = battery_profile()
+        self.profile = AC
+        self._checked_at = 0.0
+        self._since = time.monotonic()
+        self._lock = threading.Lock()
+        self.seconds = {}       # profile name -> seconds spent in it
+        self.wakeups = {}       # profile name -> {source: count}
+
+    def configure(self, enabled, battery_audio="simple"):
+        self.enabled = enabled
+        self.battery = battery_profile(battery_audio)
+        self._checked_at = 0.0
+        return self.update()
+
+    def current(self):
+        return self.profile
+
+    def follow(self, name, battery_audio="simple"):
+        """UI worker process: use the profile the scheduler detected (no detection here)"""
+        self.profile = battery_profile(battery_audio) if name == "battery" else AC
+        self._checked_at = float("inf")
+
+    def update(self):
+        """Re-detect the power source (rate limited); returns the active profile"""
+        now = time.monotonic()
+        if now - self._checked_at < DETECT_INTERVAL:
+            return self.profile
+        self._checked_at = now
+        new = self.battery if self.enabled and on_battery() else AC
+        if new.name != self.profile.name:
+            self._account(now)
+            old, self.profile = self.profile, new
+            print(f"\n[{time.strftime('%H:%M:%S')}] Power: switched {old.name} -> {new.name} profile")
+            print(self.report())
+        return self.profile
+
+    def _account(self, now):
+        with self._lock:
+            self.seconds[self.profile.name] = self.seconds.get(self.profile.name, 0.0) + now - self._since
+            self._since = now
+
+    def count_wakeup(self, source):
+        with self._lock:
+            sources = self.wakeups.setdefault(self.profile.name, {})
+            sources[source] = sources.get(source, 0) + 1
+
+    def collect(self):
+        """Wakeups counted in this process since the last collect(); resets them"""
+        with self._lock:
+            counts, self.wakeups = self.wakeups, {}
+        return counts
+
+    def merge(self, counts):
+        """Add wakeups a UI worker process counted ({profile: {source: count}})"""
+        with self._lock:
+            for name, sources in counts.items():
+                mine = self.wakeups.setdefault(name, {})
+                for source, count in sources.items():
+                    mine[source] = mine.get(source, 0) + count
+
+    def wakeups_per_hour(self):
+        """{profile: (total per hour, {source: per hour})} for time measured so far"""
+        self._account(time.monotonic())
+        result = {}
+        with self._lock:
+            for name, seconds in self.seconds.items():
+                hours = max(seconds / 3600, 1e-9)
+                sources = self.wakeups.get(name, {})
+                result[name] = (sum(sources.values()) / hours, {s: c / hours for s, c in sources.items()})
+        return result
+
+    def report(self):
+        lines = []
+        for name, (total, sources) in sorted(self.wakeups_per_hour().items()):
+            detail = ", ".join(f"{s} {v:.0f}" for s, v in sorted(sources.items()))
+            hours = self.seconds.get(name, 0.0) / 3600
+            lines.append(f"  {name:<8} {total:8.0f} wakeups/hour over {hours:.2f} h ({detail or 'none'})")
+        return "Wakeups per hour by power profile:\n" + "\n".join(lines)
+
+
+manager = PowerManager()
+current = manager.current
+count_wakeup = manager.count_wakeup
@@ -0,0 +1,155 @@
+"""
+Scheduling priority boost for the warning popup and the blackout.
+
+With a build pinning every core, a nice-0 Tk process gets its share of
+the CPU only after every compiler job has had its slice, so windows
+appear seconds late and the countdown stutters. While a popup or blackout
+is on screen the presenting process runs at a higher priority and goes
+back to its previous priority afterwards:
+
+    with priority.boosted("blackout"):
+        ...
+
+- POSIX: nice BOOST_NICE (or as far as RLIMIT_NICE allows). Lowering the
+  nice value needs CAP_SYS_NICE or a nice limit, e.g. in
+  /etc/security/limits.conf:   youruser  -  nice  -10
+- Linux: I/O priority best-effort level 0 (allowed for every user)
+- Windows: HIGH_PRIORITY_CLASS (allowed for every user)
+
+On Linux nice is per thread; threads started inside the block (the music
+thread) inherit it. When no boost is permitted the block runs unchanged
+and the reason is kept for report().
+"""
+import os
+import sys
+import platform
+from contextlib import contextmanager
+
+from . import config
+
+# ioprio_set / ioprio_get syscall numbers by architecture
+_IOPRIO_SYSCALLS = {
+    "x86_64": (251, 252),
+    "aarch64": (30, 31),
+    "i686": (289, 290),
+    "armv7l": (314, 315),
+}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_BE = 2
+_IOPRIO_CLASS_SHIFT = 13
+
+_HIGH_PRIORITY_CLASS = 0x80
+
+# Outcome of the last boost, for report()
+last_result = None
+
+
+def _libc_syscall():
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    return libc.syscall
+
+
+def _set_io_priority():
+    """Best-effort level 0; returns a restore callable or None"""
+    numbers = _IOPRIO_SYSCALLS.get(platform.machine())
+    if not sys.platform.startswith("linux") or numbers is None:
+        return None
+    set_nr, get_nr = numbers
+    try:
+        syscall = _libc_syscall()
+        previous = syscall(get_nr, _IOPRIO_WHO_PROCESS, 0)
+        if previous < 0:
+            return None
+        if syscall(set_nr, _IOPRIO_WHO_PROCESS, 0, _IOPRIO_CLASS_BE << _IOPRIO_CLASS_SHIFT) < 0:
+            return None
+    except (OSError, AttributeError):
+        return None
+    return lambda: syscall(set_nr, _IOPRIO_WHO_PROCESS, 0, previous)
+
+
+def _set_nice(target):
+    """Lower the nice value towards target; returns (achieved, restore) or (None, reason)"""
+    previous = os.getpriority(os.PRIO_PROCESS, 0)
+    if target >= previous:
+        return previous, lambda: None
+    candidates = [target]
+    try:
+        import resource
+        # RLIMIT_NICE allows nice down to 20 - soft limit
+        floor = 20 - resource.getrlimit(resource.RLIMIT_NICE)[0]
+        if target < floor < previous:
+            candidates.append(floor)
+    except (ImportError, AttributeError, ValueError, OSError):
+        pass
+    for nice in candidates:
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, nice)
+        except PermissionError:
+            continue
+        return nice, lambda: os.setpriority(os.PRIO_PROCESS, 0, previous)
+    return None, "needs CAP_SYS_NICE or a nice limit (limits.conf)"
+
+
+def _set_windows_class():
+    import ctypes
+    kernel32 = ctypes.windll.kernel32
+    process = kernel32.GetCurrentProcess()
+    previous = kernel32.GetPriorityClass(process)
+    if not previous or not kernel32.SetPriorityClass(process, _HIGH_PRIORITY_CLASS):
+        return None
+    return lambda: kernel32.SetPriorityClass(process, previous)
+
+
+def raise_priority(reason=""):
+    """Boost this process/thread; returns a list of restore callables"""
+    global last_result
+    restores = []
+    notes = []
+    if sys.platform == "win32":
+        restore = _set_windows_class()
+        if restore:
+            restores.append(restore)
+            notes.append("HIGH_PRIORITY_CLASS")
+        else:
+            notes.append("priority class unchanged")
+    elif hasattr(os, "setpriority"):
+        nice, result = _set_nice(config.BOOST_NICE)
+        if nice is None:
+            notes.append(f"nice unchanged ({result})")
+        else:
+            restores.append(result)
+            notes.append(f"nice {nice}")
+        restore = _set_io_priority()
+        if restore:
+            restores.append(restore)
+            notes.append("I/O best-effort 0")
+    last_result = f"{reason}: " + ", ".join(notes) if reason else ", ".join(notes)
+    return restores
+
+
+def restore_priority(restores):
+    for restore in reversed(restores):
+        try:
+            restore()
+        except OSError as e:
+            print(f"Priority restore error: {e}")
+
+
+@contextmanager
+def boosted(reason=""):
+    """Run the block at raised priority when PRESENTATION_BOOST is on"""
+    if not config.PRESENTATION_BOOST:
+        yield
+        return
+    restores = raise_priority(reason)
+    try:
+        yield
+    finally:
+        restore_priority(restores)
+
+
+def report():
+    if not config.PRESENTATION_BOOST:
+        return "Priority boost: off"
+    return f"Priority boost: {last_result or 'not used yet'}"
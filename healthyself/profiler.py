@@ -0,0 +1,471 @@
+"""
+On-demand profiling of a running Disengage instance.
+
+The process is long-lived and usually has no console, so profiling is
+requested from outside:
+
+    python -m healthyself.profiler --seconds 30              # sample all threads for 30 s
+    python -m healthyself.profiler --cycle                   # profile the next full break cycle
+    python -m healthyself.profiler --seconds 30 --pid 1234   # POSIX: signal this process
+
+Triggers (nothing wakes up between requests):
+- POSIX: SIGUSR1 (timed profile) / SIGUSR2 (next break cycle). The running
+  instance writes its pid and start time to PROFILE_PID_FILE (removed at
+  exit) so the command line finds it, and never signals a reused pid; the
+  request file only carries the details and is read when a signal arrives
+- Windows, and POSIX when the scheduler is not on the main thread (aio.py):
+  a watcher thread blocks on a directory change notification (inotify on
+  Linux) and reads the request file (PROFILE_REQUEST_FILE) when it changes.
+  Where neither is available it checks every FALLBACK_POLL_INTERVAL seconds,
+  counted as "profiler" wakeups
+
+Output (in PROFILE_DIR):
+- profile-<time>.txt     hottest stacks per thread (Tk main thread, music thread, ...)
+- profile-<time>.folded  collapsed stacks for flamegraph.pl / speedscope
+- profile-<time>.pstats  cProfile stats of the main thread (cycle mode only)
+- profile-<time>-<task>-<pid>.pstats  the same for each UI worker (zygote mode)
+
+With UI_PROCESS = "zygote" the popup and blackout run in forked workers:
+requests made while a profile runs carry worker_options(), the worker
+samples itself (WorkerProfile) and the samples come back with its result
+to be merged into the scheduler's report.
+"""
+import os
+import sys
+import time
+import ctypes
+import struct
+import pstats
+import atexit
+import signal
+import argparse
+import subprocess
+import cProfile
+import threading
+
+from . import power
+
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".disengage", "profiles")
+PROFILE_REQUEST_FILE = os.path.join(os.path.expanduser("~"), ".disengage", "profile-request")
+PROFILE_PID_FILE = os.path.join(os.path.expanduser("~"), ".disengage", "profiler.pid")
+PROFILE_SECONDS = 30
+SAMPLE_INTERVAL = 0.005     # 200 Hz
+FALLBACK_POLL_INTERVAL = 60.0
+MAX_DEPTH = 64
+
+
+class SamplingProfiler:
+    """Samples every thread's stack with sys._current_frames()"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = {}       # (thread name, stack tuple) -> count
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.started_at = None
+
+    def start(self, duration=None):
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(duration,), name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self, duration):
+        own = threading.get_ident()
+        deadline = time.monotonic() + duration if duration else None
+        while not self._stop.wait(self.interval):
+            if deadline and time.monotonic() >= deadline:
+                break
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                key = (names.get(ident, str(ident)), tuple(reversed(stack)))
+                self.samples[key] = self.samples.get(key, 0) + 1
+            self.sample_count += 1
+
+    def add(self, samples, prefix):
+        """Merge samples from another process ([thread, stack, count] lists)"""
+        for thread, stack, count in samples:
+            key = (f"{prefix}{thread}", tuple(stack))
+            self.samples[key] = self.samples.get(key, 0) + count
+
+    def write(self, base_path, top=15):
+        """Write the per-thread report (.txt) and collapsed stacks (.folded)"""
+        by_thread = {}
+        for (thread, stack), count in self.samples.items():
+            by_thread.setdefault(thread, []).append((count, stack))
+
+        with open(base_path + ".folded", "w") as f:
+            for (thread, stack), count in self.samples.items():
+                f.write(";".join((thread,) + stack) + f" {count}\n")
+
+        with open(base_path + ".txt", "w") as f:
+            f.write(f"Sampling profile: {self.sample_count} samples every {self.interval * 1000:.0f} ms, "
+                    f"started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))}\n")
+            for thread, stacks in sorted(by_thread.items()):
+                total = sum(c for c, _ in stacks)
+                f.write(f"\n=== Thread: {thread} ({total} samples) ===\n")
+                for count, stack in sorted(stacks, reverse=True)[:top]:
+                    f.write(f"\n{count:>6} ({count / total:.0%})\n")
+                    for line in stack[-12:]:
+                        f.write(f"         {line}\n")
+
+
+class ProfileController:
+    """Receives profile requests and runs one profile at a time"""
+
+    def __init__(self, profile_dir=PROFILE_DIR, request_file=PROFILE_REQUEST_FILE, pid_file=PROFILE_PID_FILE):
+        self.profile_dir = profile_dir
+        self.request_file = request_file
+        self.pid_file = pid_file
+        # Re-entrant: a signal handler may run while the main thread holds it
+        self.lock = threading.RLock()
+        self.sampler = None
+        self.cprofile = None
+        self.cycle_pending = False
+        self.cycle_active = False
+        self.base = None            # output path of the running profile, without extension
+        self.worker_stats = []      # cProfile files written by UI workers during it
+
+    # ---------------- triggers ----------------
+
+    def install(self):
+        """POSIX signal handlers, or a request-file watcher where signals can't be used"""
+        if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda *_: self._check_request(default=["seconds"]))
+            signal.signal(signal.SIGUSR2, lambda *_: self._check_request(default=["cycle"]))
+            pid = os.getpid()
+            try:
+                os.makedirs(os.path.dirname(self.pid_file), exist_ok=True)
+                # The start time tells this process apart from a later one reusing the pid
+                with open(self.pid_file, "w") as f:
+                    f.write(f"{pid} {process_start(pid) or ''}\n")
+            except OSError as e:
+                print(f"Profiler: could not write {self.pid_file} ({e}) - use --pid")
+                return
+            atexit.register(self._remove_pid_file, pid)
+            return
+        # No signals here: a stale pid file would send the command line to another process
+        try:
+            os.remove(self.pid_file)
+        except OSError:
+            pass
+        threading.Thread(target=self._watch, name="profile-watch", daemon=True).start()
+
+    def _remove_pid_file(self, pid):
+        # Forked UI processes inherit the handler; only the owner removes the file
+        if os.getpid() != pid or read_pid_file(self.pid_file)[0] != pid:
+            return
+        try:
+            os.remove(self.pid_file)
+        except OSError:
+            pass
+
+    def _check_request(self, default=None):
+        """Act on the request file (removed once read), else on the default request"""
+        try:
+            with open(self.request_file) as f:
+                request = f.read().split()
+            os.remove(self.request_file)
+        except OSError:
+            request = default
+        if not request:
+            return
+        if request[:1] == ["cycle"]:
+            self.request_cycle()
+            return
+        try:
+            seconds = float(request[1]) if len(request) > 1 else PROFILE_SECONDS
+        except ValueError:
+            seconds = None
+        if seconds is None or not 0 < seconds < 24 * 3600:
+            print(f"Profile request ignored - malformed request: {' '.join(request)!r}")
+            return
+        self.request_seconds(seconds)
+
+    def _watch(self):
+        if sys.platform == "win32":
+            self._watch_windows()
+        elif sys.platform.startswith("linux"):
+            self._watch_inotify()
+        print(f"Profiler: checking {self.request_file} every {FALLBACK_POLL_INTERVAL:.0f} s")
+        while True:
+            time.sleep(FALLBACK_POLL_INTERVAL)
+            power.manager.count_wakeup("profiler")
+            self._check_request()
+
+    def _watch_inotify(self):
+        """Block until the request file is written or moved into place; returns if inotify is unavailable"""
+        IN_CLOEXEC, IN_CLOSE_WRITE, IN_MOVED_TO = 0o2000000, 0x8, 0x80
+        libc = ctypes.CDLL(None, use_errno=True)
+        directory, name = os.path.split(self.request_file)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd = libc.inotify_init1(IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            return
+        try:
+            if libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+                return
+            # A request written before we started watching
+            self._check_request()
+            while True:
+                data = os.read(fd, 4096)
+                # struct inotify_event: wd, mask, cookie, len, then len bytes of name
+                offset, names = 0, set()
+                while offset < len(data):
+                    length = struct.unpack_from("iIII", data, offset)[3]
+                    names.add(data[offset + 16:offset + 16 + length].rstrip(b"\0").decode(errors="replace"))
+                    offset += 16 + length
+                if name in names:
+                    power.manager.count_wakeup("profiler")
+                    self._check_request()
+        except OSError:
+            return
+        finally:
+            os.close(fd)
+
+    def _watch_windows(self):
+        """Block until the request file's directory changes; returns if notifications are unavailable"""
+        from ctypes import wintypes
+        kernel32 = ctypes.windll.kernel32
+        kernel32.FindFirstChangeNotificationW.argtypes = [wintypes.LPCWSTR, wintypes.BOOL, wintypes.DWORD]
+        kernel32.FindFirstChangeNotificationW.restype = wintypes.HANDLE
+        kernel32.FindNextChangeNotification.argtypes = [wintypes.HANDLE]
+        kernel32.FindCloseChangeNotification.argtypes = [wintypes.HANDLE]
+        kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        kernel32.WaitForSingleObject.restype = wintypes.DWORD
+        FILE_NOTIFY_CHANGE_FILE_NAME, FILE_NOTIFY_CHANGE_LAST_WRITE = 0x1, 0x10
+        INFINITE, WAIT_OBJECT_0 = 0xFFFFFFFF, 0
+
+        directory = os.path.dirname(self.request_file)
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            return
+        handle = kernel32.FindFirstChangeNotificationW(
+            directory, False, FILE_NOTIFY_CHANGE_FILE_NAME | FILE_NOTIFY_CHANGE_LAST_WRITE)
+        if handle in (None, wintypes.HANDLE(-1).value):
+            return
+        # A request written before we started watching
+        self._check_request()
+        while kernel32.WaitForSingleObject(handle, INFINITE) == WAIT_OBJECT_0:
+            # Only when something in ~/.disengage changed - rare, but counted
+            power.manager.count_wakeup("profiler")
+            self._check_request()
+            if not kernel32.FindNextChangeNotification(handle):
+                break
+        kernel32.FindCloseChangeNotification(handle)
+
+    # ---------------- timed profiles ----------------
+
+    def request_seconds(self, seconds):
+        with self.lock:
+            if self.sampler is not None:
+                print("Profile request ignored - a profile is already running")
+                return
+            print(f"\nProfiling all threads for {seconds:.0f} s")
+            self._start(seconds)
+        timer = threading.Timer(seconds + 0.1, self._finish)
+        timer.daemon = True
+        timer.start()
+
+    # ---------------- break-cycle profiles ----------------
+
+    def request_cycle(self):
+        print("\nProfiling the next break cycle")
+        self.cycle_pending = True
+
+    def cycle_begin(self):
+        """Called on the thread that runs the UI calls when a break warning is about to show"""
+        if not self.cycle_pending:
+            return
+        with self.lock:
+            if self.sampler is not None:
+                return
+            self.cycle_pending = False
+            self.cycle_active = True
+            self._start()
+            # cProfile only sees the thread that enables it - the one running the UI calls
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def cycle_end(self):
+        """Called on the same thread as cycle_begin() when the blackout has closed"""
+        if not self.cycle_active:
+            return
+        self.cprofile.disable()
+        self.cycle_active = False
+        self._finish()
+
+    def _start(self, duration=None):
+        self.base = os.path.join(self.profile_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}")
+        self.worker_stats = []
+        self.sampler = SamplingProfiler()
+        self.sampler.start(duration)
+
+    # ---------------- UI workers (zygote mode) ----------------
+
+    def worker_options(self):
+        """What a UI worker should profile for the running profile, or None"""
+        with self.lock:
+            if self.sampler is None:
+                return None
+            return {"base": self.base, "cprofile": self.cycle_active}
+
+    def merge(self, result, task):
+        """Add a UI worker's WorkerProfile result to the running profile"""
+        if not result:
+            return
+        with self.lock:
+            if self.sampler is None:
+                return
+            self.sampler.add(result["samples"], f"UI worker ({task}): ")
+            if "pstats" in result:
+                self.worker_stats.append(result["pstats"])
+
+    def _finish(self):
+        with self.lock:
+            sampler, profile = self.sampler, self.cprofile
+            base, worker_stats = self.base, self.worker_stats
+            self.sampler, self.cprofile = None, None
+        if sampler is None:
+            return
+        sampler.stop()
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            sampler.write(base)
+            if profile is not None:
+                profile.dump_stats(base + ".pstats")
+                with open(base + ".txt", "a") as f:
+                    f.write("\n=== cProfile: main thread (top 40 by cumulative time) ===\n")
+                    pstats.Stats(profile, stream=f).sort_stats("cumulative").print_stats(40)
+            with open(base + ".txt", "a") as f:
+                for path in worker_stats:
+                    f.write(f"\n=== cProfile: {os.path.basename(path)} (top 40 by cumulative time) ===\n")
+                    pstats.Stats(path, stream=f).sort_stats("cumulative").print_stats(40)
+            print(f"\nProfile written: {base}.txt")
+        except OSError as e:
+            print(f"Profile write error: {e}")
+
+
+class WorkerProfile:
+    """Profiles one UI worker process for the scheduler's running profile"""
+
+    def __init__(self, options, task):
+        self.options = options
+        self.task = task
+        self.sampler = SamplingProfiler()
+        self.sampler.start()
+        self.cprofile = None
+        if options.get("cprofile"):
+            # The worker's main thread is the Tk thread
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def finish(self):
+        """Samples for ProfileController.merge(); cProfile stats go straight to a file"""
+        self.sampler.stop()
+        result = {"samples": [[thread, list(stack), count]
+                              for (thread, stack), count in self.sampler.samples.items()]}
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            path = f"{self.options['base']}-{self.task}-{os.getpid()}.pstats"
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self.cprofile.dump_stats(path)
+                result["pstats"] = path
+            except OSError as e:
+                print(f"Profile write error: {e}")
+        return result
+
+
+controller = ProfileController()
+
+
+def process_start(pid):
+    """Start time of a process as an opaque string, or None if it isn't running (or unknown)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # pid (comm) state ppid ... - comm may contain spaces; starttime is field 22
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except FileNotFoundError:
+        if os.path.isdir("/proc/self"):
+            return None
+    except (OSError, IndexError):
+        return None
+    try:
+        start = subprocess.run(["ps", "-o", "lstart=", "-p", str(pid)], capture_output=True,
+                               text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return start or None
+
+
+def read_pid_file(path):
+    """(pid, start time) written by install(); (None, None) when missing or unreadable"""
+    try:
+        with open(path) as f:
+            pid, _, start = f.read().strip().partition(" ")
+        return int(pid), start or None
+    except (OSError, ValueError):
+        return None, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ask a running Disengage instance to profile itself")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--seconds", type=float, help="sample all threads for this many seconds")
+    group.add_argument("--cycle", action="store_true", help="profile the next full break cycle")
+    parser.add_argument("--pid", type=int,
+                        help=f"POSIX: signal this process (default: the pid in {PROFILE_PID_FILE})")
+    args = parser.parse_args(argv)
+    signals = hasattr(signal, "SIGUSR1")
+    if args.pid and not signals:
+        parser.error("--pid needs POSIX signals; omit it to use the request file")
+
+    os.makedirs(os.path.dirname(PROFILE_REQUEST_FILE), exist_ok=True)
+    # Written whole, then moved into place: a watcher never reads half a request
+    with open(PROFILE_REQUEST_FILE + ".tmp", "w") as f:
+        f.write("cycle\n" if args.cycle else f"seconds {args.seconds}\n")
+    os.replace(PROFILE_REQUEST_FILE + ".tmp", PROFILE_REQUEST_FILE)
+
+    pid = args.pid
+    if pid is None and signals:
+        pid, start = read_pid_file(PROFILE_PID_FILE)
+        # Signal only the instance that wrote the file: a reused pid may be any process,
+        # and SIGUSR1/SIGUSR2 terminate a process that doesn't handle them
+        if pid is not None and (start is None or process_start(pid) != start):
+            print(f"Process {pid} from {PROFILE_PID_FILE} is not a running Disengage instance - "
+                  f"use --pid if it is")
+            pid = None
+    if pid is None:
+        # No signal-driven instance: its watcher picks the file up
+        print(f"Request written to {PROFILE_REQUEST_FILE} (results in {PROFILE_DIR})")
+        return 0
+    try:
+        os.kill(pid, signal.SIGUSR2 if args.cycle else signal.SIGUSR1)
+    except OSError as e:
+        os.remove(PROFILE_REQUEST_FILE)
+        print(f"Could not signal process {pid} ({e}) - is Disengage running?")
+        return 1
+    print(f"Signal sent to {pid} (results in {PROFILE_DIR})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Soak harness for the break engine.
+
+Drives thousands of accelerated break cycles (warning popup + blackout +
+music) through the real DisengagePopup and BreakEnforcer classes and
+samples resource usage after every cycle:
+
+    RSS, traced Python memory, open file descriptors, thread count,
+    Tcl command count of the live interpreter, live Tk() objects
+
+After a warm-up, the early and late windows are compared; any metric that
+keeps growing beyond its allowance fails the run (exit code 1). The
+tracemalloc allocators that grew the most are printed either way.
+
+With --ui zygote the cycles go through the zygote UI runner instead, as on
+Linux by default: every popup and blackout runs in a fresh worker, the UI
+host is started and released around each break, and what can leak is the
+scheduler and the zygote - their RSS and file descriptors are sampled, plus
+the child processes left behind (unreaped hosts or workers).
+
+Headless usage (Linux):
+    xvfb-run -a python -m healthyself.soak_harness --cycles 2000
+    xvfb-run -a python -m healthyself.soak_harness --cycles 300 --ui zygote
+    python -m healthyself.soak_harness --cycles 200 --csv soak.csv --display singlescreen
+"""
+import os
+import gc
+import sys
+import csv
+import time
+import math
+import wave
+import argparse
+import tempfile
+import threading
+import tracemalloc
+
+# Headless audio: pygame must see this before it is imported
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "hide")
+
+from . import config, display, audio, supervisor
+
+# Allowed growth per 1000 cycles between the early and late windows
+LIMITS = {
+    "rss_kb": 4096,
+    "traced_kb": 2048,
+    "fds": 2,
+    "threads": 1,
+    "tcl_commands": 5,
+    "tk_objects": 1,
+    # --ui zygote
+    "zygote_rss_kb": 1024,
+    "zygote_fds": 1,
+    "children": 0,
+}
+
+
+def write_tone(path, seconds=0.5, rate=22050):
+    """Small WAV file so the mixer path is exercised without the bundled MP3"""
+    frames = bytearray()
+    for i in range(int(seconds * rate)):
+        sample = int(8000 * math.sin(2 * math.pi * 440 * i / rate))
+        frames += sample.to_bytes(2, "little", signed=True)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(frames))
+
+
+# ============================================================
+# RESOURCE PROBES
+# ============================================================
+
+def rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def open_fds():
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return 0
+
+
+def live_tk_objects():
+    import tkinter
+    return sum(1 for o in gc.get_objects() if isinstance(o, tkinter.Tk))
+
+
+def process_fds(pid):
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return 0
+
+
+def child_processes(parents):
+    """Processes (zombies included) whose parent is one of parents"""
+    count = 0
+    for entry in os.listdir("/proc"):
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # pid (comm) state ppid ... - comm may contain spaces
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        count += ppid in parents
+    return count
+
+
+# ============================================================
+# ACCELERATED CYCLE
+# ============================================================
+
+class Cycle:
+    """One warning + blackout, shortened and auto-answered"""
+
+    def __init__(self, break_seconds, display_backend, audio_backend):
+        from .popup import DisengagePopup
+        from .enforcer import BreakEnforcer
+        self.break_seconds = break_seconds
+        self.display_backend = display_backend
+        self.audio_backend = audio_backend
+        self.popup_class = DisengagePopup
+        self.tcl_commands = 0
+
+        harness = self
+
+        class ProbedEnforcer(BreakEnforcer):
+            def close_all_windows(self):
+                # Sample the interpreter while it is still alive
+                if self.windows:
+                    harness.tcl_commands = len(self.windows[0].tk.call("info", "commands"))
+                super().close_all_windows()
+
+        self.enforcer_class = ProbedEnforcer
+
+    def run(self, index):
+        is_long = index % 3 == 2
+        popup = self.popup_class(countdown_seconds=1, is_long_break=is_long)
+        popup.root.after(10, lambda: popup.on_button(0))
+        popup.show()
+
+        enforcer = self.enforcer_class(self.break_seconds, is_long_break=is_long,
+                                       display_backend=self.display_backend, audio_backend=self.audio_backend)
+        enforcer.enforce()
+
+
+class ZygoteCycle:
+    """The same cycle through the zygote UI runner (popup auto-dismissed in its worker)"""
+
+    def __init__(self, break_seconds, ui):
+        self.break_seconds = break_seconds
+        self.ui = ui
+
+    def run(self, index):
+        is_long = index % 3 == 2
+        self.ui.popup(countdown=1, is_long=is_long, dismiss_after_ms=10)
+        # Releases the UI host afterwards, as after a real break
+        self.ui.blackout(duration=self.break_seconds, is_long=is_long)
+
+
+def sample(cycle, index):
+    current, _peak = tracemalloc.get_traced_memory()
+    result = {
+        "cycle": index,
+        "rss_kb": rss_kb(),
+        "traced_kb": current // 1024,
+        "fds": open_fds(),
+        "threads": threading.active_count(),
+    }
+    if isinstance(cycle, ZygoteCycle):
+        zygote = cycle.ui.pid
+        result["zygote_rss_kb"] = supervisor.memory_kb(zygote)[0] or 0
+        result["zygote_fds"] = process_fds(zygote)
+        result["children"] = child_processes({os.getpid(), zygote})
+    else:
+        result["tcl_commands"] = cycle.tcl_commands
+        result["tk_objects"] = live_tk_objects()
+    return result
+
+
+def growth_report(samples, warmup):
+    """Compare medians of the first and last windows after warm-up"""
+    steady = samples[warmup:]
+    if len(steady) < 2:
+        print(f"\nToo few cycles after the warm-up ({len(steady)}) to measure growth")
+        return []
+    window = max(1, len(steady) // 10)
+    early, late = steady[:window], steady[-window:]
+    span = max(1, late[0]["cycle"] - early[0]["cycle"])
+    failures = []
+    print(f"\n{'Metric':<14} {'Early':>10} {'Late':>10} {'Per 1000':>10} {'Limit':>8}")
+    for metric, limit in LIMITS.items():
+        if metric not in steady[0]:
+            continue
+        a = sorted(s[metric] for s in early)[window // 2]
+        b = sorted(s[metric] for s in late)[window // 2]
+        per_1000 = (b - a) * 1000 / span
+        flag = "" if per_1000 <= limit else "  <-- GROWING"
+        print(f"{metric:<14} {a:>10} {b:>10} {per_1000:>10.1f} {limit:>8}{flag}")
+        if flag:
+            failures.append(metric)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak test break cycles for resource leaks")
+    parser.add_argument("--cycles", type=int, default=1000)
+    parser.add_argument("--ui", choices=("inprocess", "zygote"), default="inprocess",
+                        help="run the cycles in this process, or through the zygote UI runner")
+    parser.add_argument("--break-seconds", type=float, default=0.05, help="accelerated break duration")
+    parser.add_argument("--warmup", type=float, default=0.1, help="fraction of cycles ignored at start")
+    parser.add_argument("--csv", help="write per-cycle samples to this file")
+    parser.add_argument("--top", type=int, default=10, help="tracemalloc allocators to show")
+    parser.add_argument("--display", choices=display.BACKENDS, default=config.DISPLAY_BACKEND)
+    parser.add_argument("--audio", choices=list(audio.BACKENDS), default=config.AUDIO_BACKEND)
+    args = parser.parse_args(argv)
+    if args.cycles < 1:
+        parser.error("--cycles must be at least 1")
+    if args.ui == "zygote" and not supervisor.zygote_supported():
+        parser.error("--ui zygote needs fork() (Linux)")
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        print("No DISPLAY - run under a virtual display, e.g. xvfb-run -a python -m healthyself.soak_harness")
+        return 2
+
+    tone = os.path.join(tempfile.mkdtemp(prefix="soak-"), "tone.wav")
+    write_tone(tone)
+    config.MUSIC_FILES = [tone]
+
+    if args.ui == "zygote":
+        # Forked before tracemalloc and any thread, like the scheduler's
+        ui = supervisor.ZygoteUI(args.display, args.audio)
+        cycle = ZygoteCycle(args.break_seconds, ui)
+    else:
+        ui = None
+        cycle = Cycle(args.break_seconds, display.get(args.display), audio.get(args.audio))
+    warmup = min(max(1, int(args.cycles * args.warmup)), args.cycles)
+    samples = []
+    baseline = None
+    tracemalloc.start(10)
+
+    started = time.perf_counter()
+    try:
+        for i in range(args.cycles):
+            cycle.run(i)
+            gc.collect()
+            samples.append(sample(cycle, i))
+            if i + 1 == warmup:
+                baseline = tracemalloc.take_snapshot()
+            if (i + 1) % 100 == 0:
+                s = samples[-1]
+                detail = (f"zygote rss {s['zygote_rss_kb']} kB, zygote fds {s['zygote_fds']}, "
+                          f"children {s['children']}" if ui else f"tcl {s['tcl_commands']}, tk {s['tk_objects']}")
+                print(f"cycle {i + 1:>5}: rss {s['rss_kb']} kB, fds {s['fds']}, threads {s['threads']}, {detail}")
+    finally:
+        if ui is not None:
+            ui.shutdown()
+    elapsed = time.perf_counter() - started
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(samples[0]))
+            writer.writeheader()
+            writer.writerows(samples)
+
+    print(f"\n{args.cycles} cycles in {elapsed:.1f} s ({elapsed / args.cycles * 1000:.0f} ms/cycle)")
+    print(f"\nTop {args.top} allocators since warm-up:")
+    snapshot = tracemalloc.take_snapshot()
+    for stat in snapshot.compare_to(baseline, "lineno")[:args.top]:
+        print(f"  {stat}")
+
+    failures = growth_report(samples, warmup)
+    if failures:
+        print(f"\nFAIL: unbounded growth in {', '.join(failures)}")
+        return 1
+    print("\nPASS: no unbounded growth")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
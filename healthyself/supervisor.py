@@ -0,0 +1,692 @@
+"""
+Long-lived scheduler process with a pre-forked UI zygote.
+
+The scheduler only sleeps, checks timers and writes history, so it needs
+nothing beyond the standard library. Tk, pygame, numpy and screeninfo are
+what make the process big; here they are loaded only around breaks:
+
+    supervisor (stdlib)  --- socketpair, one JSON line per request --->  zygote (stdlib)
+                                                                          |  fork() at pre-warm,
+                                                                          |  exits after the break
+                                                                      UI host (Tk, pygame, ...)
+                                                                      fork() per popup/blackout
+                                                                          |
+                                                                      UI worker (shares the
+                                                                      host's warm imports)
+
+The zygote is forked before the scheduler starts any thread and stays as
+small as the scheduler. When the scheduler pre-warms for a break (or any
+other request finds no host) it forks the UI host, which imports the UI
+stack; the audio backend is imported, and its buffers rendered once, only
+when a request needs sound, so a host started for a micro-break or a
+monitor query never loads it. Requests are relayed to the host until the
+scheduler releases it after the blackout. Between breaks only the two
+stdlib processes are left.
+
+Each popup, blackout or micro-break runs in a fresh worker forked from the
+host, so it starts with every module already imported (no import cost
+on the break path) and exits afterwards, returning its memory to the OS.
+The one exception: a popup worker whose warning ends in a break waits
+for the blackout request and runs it too, on the audio device it opened
+during the warning (an open device can't be handed across a fork).
+A leak or crash in the UI code ends with its worker and cannot take the
+scheduler down; a host that dies is started again by the zygote, a zygote
+that dies by the scheduler. Workers follow the scheduler's power profile
+and send their wakeup counts back with each result.
+
+fork() is POSIX-only; on Windows and macOS (where Tk/Cocoa is not
+fork-safe) the UI runs in the scheduler's own process as before.
+UI_PROCESS in config.py selects the mode.
+
+    python -m healthyself.supervisor                 # footprint, both layouts
+    python -m healthyself.supervisor --popups 10     # + popup latency (needs a display)
+"""
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import subprocess
+from collections import namedtuple
+
+from . import config, loudness, power, priority, profiler, tracing
+
+LATENCY_WINDOW = 50         # recent popup latencies kept for report()
+# Tasks that play no sound: a UI host started for them never imports audio
+SILENT_TASKS = ("monitors", "micro")
+
+# Same fields as display.Monitor; not imported from there to keep the
+# scheduler free of the display package
+Monitor = namedtuple("Monitor", "name x y width height is_primary")
+
+
+class UIError(Exception):
+    """A UI request failed (worker crashed or raised)"""
+
+
+def memory_kb(pid="self"):
+    """(RSS, PSS) of a process in KiB from /proc; None where unavailable"""
+    rss = pss = None
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Rss:"):
+                    rss = int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss = int(line.split()[1])
+        except OSError:
+            pass
+    return rss, pss
+
+
+def _format_kb(rss, pss):
+    if rss is None:
+        return "n/a"
+    text = f"{rss / 1024:.1f} MB RSS"
+    if pss is not None:
+        text += f" / {pss / 1024:.1f} MB PSS"
+    return text
+
+
+class _Runner:
+    """Break UI requests shared by both modes; subclasses provide _call()"""
+
+    mode = None
+
+    def __init__(self, display_name, audio_name):
+        self.display_name = display_name
+        self.audio_name = audio_name
+        self.latencies = []     # popup request -> first paint, ms
+        self.last_popup = None
+
+    def popup(self, countdown, is_long, dismiss_after_ms=None, allow_snooze=True):
+        """Warning popup; returns (snooze seconds, clicked)"""
+        args = {"countdown": countdown, "is_long": is_long, "requested_at": time.monotonic(),
+                "allow_snooze": allow_snooze}
+        if dismiss_after_ms is not None:
+            args["dismiss_after_ms"] = dismiss_after_ms
+        result = self.last_popup = self._call("popup", **args)
+        if result.get("latency_ms") is not None:
+            self.latencies.append(result["latency_ms"])
+            del self.latencies[:-LATENCY_WINDOW]
+        return result["snooze"], result["clicked"]
+
+    def blackout(self, duration, is_long):
+        return self._call("blackout", duration=duration, is_long=is_long)
+
+    def micro(self, duration, message):
+        """
+        Micro-break overlay; returns (overlay CPU ms, UI CPU ms): the first is
+        the overlay's own loop, the second everything the UI spent on it
+        """
+        started = time.process_time()
+        result = self._call("micro", duration=duration, message=message)
+        return result["cpu_ms"], self._ui_cpu_ms(result, started)
+
+    def _ui_cpu_ms(self, result, started):
+        """CPU the UI spent on a request that started at process_time() started"""
+        return (time.process_time() - started) * 1000
+
+    def monitors(self):
+        return [Monitor(*m) for m in self._call("monitors")["monitors"]]
+
+    def prepare(self, names):
+        """Measure new or changed music files between breaks"""
+        if self.audio_name == "none" or not config.LOUDNESS_NORMALIZE:
+            return
+        self._call("prepare", names=list(names))
+
+    def prewarm(self, names):
+        """Page in assets, fonts and windows ahead of the next warning"""
+        return self._call("prewarm", names=list(names))
+
+    def configure(self, settings):
+        """Config changes (central policy) for the UI; in-process it shares config"""
+
+    def release(self):
+        """The break is over: unload what the UI holds for it (in-process, nothing)"""
+
+    def footprint(self):
+        """{process: (RSS, PSS)} for the processes kept alive between breaks"""
+        return {"scheduler": memory_kb()}
+
+    def describe(self):
+        parts = [f"{name} {_format_kb(*kb)}" for name, kb in self.footprint().items()]
+        return f"UI: {self.mode}; idle footprint: " + ", ".join(parts)
+
+    def report(self):
+        if not self.latencies:
+            return f"UI ({self.mode}): no popups shown"
+        ordered = sorted(self.latencies)
+        return (f"UI ({self.mode}): popup latency median {ordered[len(ordered) // 2]:.0f} ms, "
+                f"max {ordered[-1]:.0f} ms over {len(ordered)} popups")
+
+    def shutdown(self):
+        pass
+
+
+class InProcessUI(_Runner):
+    """UI in the scheduler's own process (Windows, macOS, UI_PROCESS = "inprocess")"""
+
+    mode = "in-process"
+
+    def __init__(self, display_name, audio_name):
+        super().__init__(display_name, audio_name)
+        # Tk and the selected backends are imported here, not at module import
+        from . import ui_tasks, display, audio
+        self._tasks = ui_tasks
+        self.display_backend = display.get(display_name)
+        self.audio_backend = audio.get(audio_name)
+
+    def _call(self, task, **args):
+        return self._tasks.run(task, args, self.display_backend, self.audio_backend)
+
+    def shutdown(self):
+        self.audio_backend.shutdown()
+
+
+class ZygoteUI(_Runner):
+    """UI in workers forked from a UI host, which runs only around breaks"""
+
+    mode = "zygote"
+
+    # Requests that leave nothing to keep warm when they found the host stopped
+    ONE_OFF = ("monitors", "prepare", "micro")
+
+    def __init__(self, display_name, audio_name):
+        super().__init__(display_name, audio_name)
+        self.cache = None
+        self.host_pid = None        # UI host, from pre-warm until the break ends
+        self.import_ms = None       # last UI host start: imports + pre-render
+        self.import_cpu_ms = None   # CPU of that start
+        self.respawns = 0
+        self._spawn()
+
+    def _spawn(self):
+        parent, child = socket.socketpair()
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            parent.close()
+            code = 1
+            try:
+                _zygote_main(child, self.display_name, self.audio_name)
+                code = 0
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+        child.close()
+        self.pid = pid
+        self.host_pid = None
+        self._sock = parent
+        self._reader = parent.makefile("r", encoding="utf-8")
+        self._receive()
+
+    def _respawn(self, reason):
+        """
+        The zygote is gone: reap it and fork a new one. It starts from the
+        scheduler's current config; of the scheduler's threads only the
+        calling one exists in the child, and the zygote runs no code of theirs.
+        """
+        print(f"\nUI zygote lost ({reason}) - starting a new one")
+        self._stop()
+        self.respawns += 1
+        try:
+            self._spawn()
+        except (OSError, ValueError, UIError) as e:
+            # The next request tries again
+            print(f"UI zygote restart failed: {e}")
+
+    def _receive(self):
+        line = self._reader.readline()
+        if not line:
+            raise UIError("UI zygote exited")
+        return json.loads(line)
+
+    def _request(self, task, args):
+        # The worker follows the scheduler's power profile, and profiles itself while the scheduler does
+        request = {"task": task, "args": args, "power": power.current().name,
+                   "profile": profiler.controller.worker_options()}
+        try:
+            self._sock.sendall((json.dumps(request) + "\n").encode())
+            result = self._receive()
+        except (OSError, ValueError, UIError) as e:
+            self._respawn(e)
+            raise UIError(f"UI {task} lost: {e}")
+        self.host_pid = result.pop("host_pid", None)
+        if "import_ms" in result:
+            # import_cpu_ms stays in the result: this request paid for the start
+            self.import_ms = result.pop("import_ms")
+            self.import_cpu_ms = result.get("import_cpu_ms")
+        return result
+
+    def _ui_cpu_ms(self, result, started):
+        # The worker's whole life, plus the host start if this request paid for it
+        return result.get("worker_cpu_ms", 0.0) + result.get("import_cpu_ms", 0.0)
+
+    def _call(self, task, **args):
+        cold = self.host_pid is None
+        try:
+            result = self._request(task, args)
+            if "error" in result:
+                raise UIError(f"UI {task} failed: {result['error']}")
+            power.manager.merge(result.pop("wakeups", {}))
+            tracing.merge(result.pop("trace", None))
+            profiler.controller.merge(result.pop("profile", None), task)
+            return result
+        finally:
+            if task == "blackout" or (cold and task in self.ONE_OFF):
+                # The break is over, or nothing is coming: back to the idle footprint
+                self.release()
+
+    def release(self):
+        """Stop the UI host; the next request starts it again"""
+        if self.host_pid is None:
+            return
+        try:
+            self._request("release", {})
+        except UIError as e:
+            print(f"\nUI host release failed: {e}")
+
+    def prepare(self, names):
+        """Stale check here (one stat per file); decoding happens in a worker"""
+        if self.audio_name == "none" or not config.LOUDNESS_NORMALIZE:
+            return
+        if self.cache is None:
+            self.cache = loudness.LoudnessCache()
+        self.cache.refresh()
+        if loudness.stale(names, self.cache):
+            self._call("prepare", names=list(names))
+
+    def configure(self, settings):
+        """Set config values in the zygote (and a running UI host), so every later worker inherits them"""
+        if settings:
+            self._call("config", settings=settings)
+
+    def footprint(self):
+        footprint = {"scheduler": memory_kb(), "zygote": memory_kb(self.pid)}
+        if self.host_pid is not None:
+            footprint["UI host"] = memory_kb(self.host_pid)
+        return footprint
+
+    def describe(self):
+        text = f"{super().describe()} (zygote pid {self.pid}"
+        if self.import_ms is not None:
+            text += f", UI host start {self.import_ms:.0f} ms"
+        return text + ")"
+
+    def report(self):
+        text = super().report()
+        if self.respawns:
+            text += f"; zygote restarted {self.respawns} times"
+        return text
+
+    def _stop(self):
+        try:
+            self._reader.close()
+            self._sock.close()
+        except OSError:
+            pass
+        try:
+            os.kill(self.pid, signal.SIGTERM)
+            os.waitpid(self.pid, 0)
+        except OSError:
+            pass
+
+    def shutdown(self):
+        """Close the channel; the zygote stops the UI host and any running worker and exits"""
+        self._stop()
+
+
+def _send(sock, message):
+    sock.sendall((json.dumps(message) + "\n").encode())
+
+
+def _zygote_main(sock, display_name, audio_name):
+    """
+    Zygote: stdlib only, like the scheduler it was forked from. Starts the
+    UI host for the first request that needs it and relays every request
+    to it until the scheduler sends "release".
+    """
+    # Ctrl+C goes to the whole process group; the scheduler decides
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    host = None                 # (pid, socket, reader) of the running UI host
+
+    def stop_host():
+        nonlocal host
+        if host is None:
+            return
+        pid, host_sock, reader = host
+        host = None
+        # The host's request loop ends with its socket (the fd stays open
+        # while the reader made from it does)
+        reader.close()
+        host_sock.close()
+        try:
+            os.waitpid(pid, 0)
+        except OSError:
+            pass
+
+    def on_term(signum, frame):
+        if host:
+            try:
+                os.kill(host[0], signal.SIGTERM)
+            except OSError:
+                pass
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, on_term)
+    _send(sock, {"ready": True})
+
+    for line in sock.makefile("r", encoding="utf-8"):
+        request = json.loads(line)
+        task = request["task"]
+        if task == "release":
+            stop_host()
+            _send(sock, {"host_pid": None})
+            continue
+        if task == "config":
+            # Kept here too, so the next UI host starts with it
+            settings = request["args"]["settings"]
+            previous = {key: getattr(config, key) for key in settings}
+            for key, value in settings.items():
+                setattr(config, key, value)
+            if host is None:
+                _send(sock, {"host_pid": None})
+                continue
+        reply = {}
+        if host is None:
+            started = time.perf_counter()
+            try:
+                host, reply["import_cpu_ms"] = _start_host(sock, display_name, audio_name)
+                reply["import_ms"] = (time.perf_counter() - started) * 1000
+            except (OSError, ValueError, UIError) as e:
+                _send(sock, {"error": f"UI host failed to start: {e}", "host_pid": None})
+                continue
+        try:
+            host[1].sendall(line.encode())
+            answer = host[2].readline()
+        except OSError:
+            answer = ""
+        if answer:
+            reply.update(json.loads(answer))
+        else:
+            stop_host()
+            reply["error"] = "UI host died"
+        if task == "config" and "error" in reply:
+            for key, value in previous.items():
+                setattr(config, key, value)
+        reply["host_pid"] = host[0] if host else None
+        _send(sock, reply)
+
+
+def _start_host(zygote_sock, display_name, audio_name):
+    """
+    Fork the UI host and wait until it has imported the UI stack; returns
+    ((pid, socket, reader), CPU ms the host spent starting)
+    """
+    parent, child = socket.socketpair()
+    sys.stdout.flush()
+    pid = os.fork()
+    if pid == 0:
+        # The scheduler must see EOF when the zygote dies, not wait on the
+        # host. detach(): the zygote's reader would keep the fd open
+        os.close(zygote_sock.detach())
+        parent.close()
+        code = 1
+        try:
+            _host_main(child, display_name, audio_name)
+            code = 0
+        finally:
+            sys.stdout.flush()
+            os._exit(code)
+    child.close()
+    reader = parent.makefile("r", encoding="utf-8")
+    line = reader.readline()
+    if not line:
+        reader.close()
+        parent.close()
+        os.waitpid(pid, 0)
+        raise UIError("UI host exited during start")
+    return (pid, parent, reader), json.loads(line)["cpu_ms"]
+
+
+def _host_main(sock, display_name, audio_name):
+    """Import the UI stack once, then fork a worker per request"""
+    # numpy's BLAS pool would be copied into every worker for nothing
+    os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+    from . import ui_tasks, display
+    display_backend = display.get(display_name)
+    audio_backend = None        # imported for the first request that uses audio
+    prewarmed = False
+    tracing.configure(config.TRACE_ENABLED, config.TRACE_DIR)
+
+    def load_audio(task):
+        """Import the audio backend, and render its buffers for tasks that play, before forking"""
+        nonlocal audio_backend, prewarmed
+        if task in SILENT_TASKS:
+            return
+        if audio_backend is None:
+            from . import audio
+            audio_backend = audio.get(audio_name)
+        if task != "prepare" and not prewarmed:
+            prewarmed = True
+            try:
+                # Rendered here, so every later worker inherits the buffers
+                audio_backend.prewarm(config.MUSIC_FILES)
+            except Exception as e:
+                print(f"UI host: audio pre-warm failed: {e}")
+
+    if config.PRESENTATION_BOOST:
+        # The host only runs around breaks, so its priority costs nothing;
+        # workers start boosted with no gap between fork and first paint
+        priority.raise_priority("UI host")
+    worker = None
+    follower = None             # (pid, request pipe) of a popup worker waiting for its blackout
+
+    def on_term(signum, frame):
+        for pid in (worker, follower and follower[0]):
+            if pid:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+        os._exit(0)
+
+    def reap(pid):
+        _, status = os.waitpid(pid, 0)
+        # A worker that replied exits 0; anything else died without replying
+        if not (os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0):
+            _send(sock, {"error": f"UI worker died (status {status})"})
+
+    def dismiss():
+        """The break didn't follow the warning: the waiting popup worker exits"""
+        nonlocal follower
+        pid, pipe = follower
+        follower = None
+        os.close(pipe)
+        try:
+            os.waitpid(pid, 0)
+        except OSError:
+            pass
+
+    signal.signal(signal.SIGTERM, on_term)
+    # A forked child's CPU clock starts at zero: this is the host's start
+    _send(sock, {"ready": True, "cpu_ms": time.process_time() * 1000})
+
+    for line in sock.makefile("r", encoding="utf-8"):
+        request = json.loads(line)
+        if follower is not None and request["task"] == "blackout":
+            pid, pipe = follower
+            follower = None
+            try:
+                os.write(pipe, line.encode())
+                handed = True
+            except OSError:
+                handed = False
+            os.close(pipe)
+            if handed:
+                # It replies on sock itself, like any worker
+                reap(pid)
+                continue
+            os.waitpid(pid, 0)
+        elif follower is not None:
+            dismiss()
+        if request["task"] == "config":
+            # Handled in the host itself: forked workers inherit it.
+            # All or nothing - settings the UI can't use leave the old ones
+            settings = request["args"]["settings"]
+            previous = {key: getattr(config, key) for key in settings}
+            try:
+                for key, value in settings.items():
+                    setattr(config, key, value)
+                if prewarmed:
+                    audio_backend.prewarm(config.MUSIC_FILES)
+                reply = {}
+            except Exception as e:
+                for key, value in previous.items():
+                    setattr(config, key, value)
+                reply = {"error": f"{type(e).__name__}: {e}"}
+            _send(sock, reply)
+            continue
+        try:
+            load_audio(request["task"])
+        except Exception as e:
+            _send(sock, {"error": f"audio backend '{audio_name}' unavailable: {type(e).__name__}: {e}"})
+            continue
+        # A popup worker can stay for the blackout: requests reach it on one
+        # pipe, and it says on the other that it is waiting for one
+        warning = request["task"] == "popup"
+        if warning:
+            requests_r, requests_w = os.pipe()
+            waiting_r, waiting_w = os.pipe()
+        sys.stdout.flush()
+        worker = os.fork()
+        if worker == 0:
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 1
+            try:
+                result = _serve(sock, request, ui_tasks, display_backend, audio_backend)
+                if warning:
+                    os.close(requests_w)
+                    os.close(waiting_r)
+                    if "error" not in result and (result["snooze"] == 0 or not result["clicked"]):
+                        os.write(waiting_w, b"\n")
+                        os.close(waiting_w)
+                        with os.fdopen(requests_r, encoding="utf-8") as pipe:
+                            line = pipe.readline()
+                        # EOF: the host sent something else first
+                        if line:
+                            _serve(sock, json.loads(line), ui_tasks, display_backend, audio_backend)
+                code = 0
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+        if warning:
+            os.close(requests_r)
+            os.close(waiting_w)
+            waiting = os.read(waiting_r, 1)
+            os.close(waiting_r)
+            if waiting:
+                follower = (worker, requests_w)
+                worker = None
+                continue
+            os.close(requests_w)
+        reap(worker)
+        worker = None
+    if follower is not None:
+        dismiss()
+
+
+def _serve(sock, request, ui_tasks, display_backend, audio_backend):
+    """In a UI worker: run one request under the scheduler's power profile and send the result"""
+    power.manager.follow(request.get("power"), config.BATTERY_AUDIO)
+    power.manager.collect()
+    try:
+        result = ui_tasks.run(request["task"], request["args"], display_backend, audio_backend,
+                              collect_trace=True, profile=request.get("profile"))
+        # Countdown, popup and music wakeups, for the scheduler's report
+        result["wakeups"] = power.manager.collect()
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    # Everything this worker spent since the fork (its clock started at zero)
+    result["worker_cpu_ms"] = time.process_time() * 1000
+    _send(sock, result)
+    return result
+
+
+def zygote_supported():
+    return hasattr(os, "fork") and sys.platform != "darwin"
+
+
+def create_ui(display_name, audio_name):
+    """UI runner for config.UI_PROCESS; call before starting any thread"""
+    mode = config.UI_PROCESS
+    if mode not in ("auto", "zygote", "inprocess"):
+        raise ValueError(f"Unknown UI_PROCESS '{mode}' (choose from: auto, zygote, inprocess)")
+    if mode == "zygote" or (mode == "auto" and zygote_supported()):
+        return ZygoteUI(display_name, audio_name)
+    return InProcessUI(display_name, audio_name)
+
+
+def _monolith_footprint(display_name, audio_name):
+    """Footprint of a single process holding the whole UI stack (the old layout)"""
+    code = ("import sys, json; from healthyself import ui_tasks, display, audio, supervisor; "
+            f"display.get({display_name!r}); audio.get({audio_name!r}); "
+            "print(json.dumps(supervisor.memory_kb()))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+    if out.returncode != 0:
+        return None, None
+    return tuple(json.loads(out.stdout.strip().splitlines()[-1]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the zygote UI with the in-process UI")
+    parser.add_argument("--display", default=config.DISPLAY_BACKEND)
+    parser.add_argument("--audio", default=config.AUDIO_BACKEND)
+    parser.add_argument("--popups", type=int, default=0,
+                        help="popups to show per mode for latency (needs a display)")
+    args = parser.parse_args(argv)
+
+    print(f"Idle footprint ({args.display} display, {args.audio} audio):")
+    print(f"  single process : {_format_kb(*_monolith_footprint(args.display, args.audio))}")
+    ui = ZygoteUI(args.display, args.audio)
+    try:
+        footprint = ui.footprint()
+        print(f"  supervisor     : {_format_kb(*footprint['scheduler'])}")
+        print(f"  zygote         : {_format_kb(*footprint['zygote'])}")
+        # As PREWARM_LEAD before a warning: the UI host starts
+        try:
+            ui.prewarm(config.MUSIC_FILES)
+        except UIError as e:
+            print(f"  (pre-warm: {e})")
+        print(f"Around a break (pre-warm until the blackout ends):")
+        print(f"  UI host        : {_format_kb(*ui.footprint()['UI host'])} "
+              f"(start {ui.import_ms:.0f} ms)")
+        if args.popups:
+            for _ in range(args.popups):
+                ui.popup(60, False, dismiss_after_ms=200)
+            print(ui.report())
+        ui.release()
+    finally:
+        ui.shutdown()
+    if args.popups:
+        ui = InProcessUI(args.display, args.audio)
+        for _ in range(args.popups):
+            ui.popup(60, False, dismiss_after_ms=200)
+        print(ui.report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Opt-in break-cycle tracing in Chrome trace-event format.
+
+Each break cycle (warning popup through blackout close) is written to its
+own JSON file that opens in chrome://tracing or https://ui.perfetto.dev.
+
+    with tracing.span("blackout.create_window", monitor=m.name):
+        ...
+    tracing.instant("audio.first_play")
+
+When tracing is off, span() hands back one shared no-op context manager
+and instant() returns immediately, so the instrumentation can stay in the
+hot path permanently.
+"""
+import os
+import json
+import time
+import threading
+
+_enabled = False
+_trace_dir = os.path.join(os.path.expanduser("~"), ".disengage", "traces")
+_events = []
+_thread_names = {}
+_process_names = {}     # pid -> name, for events merged from UI worker processes
+_foreign_threads = {}   # (pid, tid) -> name
+_cycle_label = None
+_pid = os.getpid()
+
+
+def _after_fork():
+    """A forked UI worker records under its own pid, starting empty"""
+    global _pid
+    _pid = os.getpid()
+    _events.clear()
+    _thread_names.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _now_us():
+    return time.perf_counter_ns() // 1000
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, *exc):
+        complete(self.name, self.start, _now_us() - self.start, self.cat, **self.args)
+        return False
+
+
+def configure(enabled, trace_dir=None):
+    """Turn tracing on/off (DISENGAGE_TRACE=1 in the environment also enables it)"""
+    global _enabled, _trace_dir
+    _enabled = bool(enabled) or os.environ.get("DISENGAGE_TRACE") == "1"
+    if trace_dir:
+        _trace_dir = trace_dir
+
+
+def enabled():
+    return _enabled
+
+
+def _tid():
+    ident = threading.get_ident()
+    if ident not in _thread_names:
+        _thread_names[ident] = threading.current_thread().name
+    return ident
+
+
+def span(name, cat="break", **args):
+    """Context manager recording a complete ("X") event"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, cat, args)
+
+
+def complete(name, start_us, dur_us, cat="break", **args):
+    """Record a span whose start and duration were measured by the caller"""
+    if not _enabled:
+        return
+    _events.append({"name": name, "cat": cat, "ph": "X", "ts": start_us, "dur": dur_us,
+                    "pid": _pid, "tid": _tid(), "args": args})
+
+
+def instant(name, cat="break", **args):
+    """Record a point-in-time ("i") event"""
+    if not _enabled:
+        return
+    _events.append({"name": name, "cat": cat, "ph": "i", "s": "t", "ts": _now_us(),
+                    "pid": _pid, "tid": _tid(), "args": args})
+
+
+def now_us():
+    """Timestamp for complete(); 0 when disabled to keep the fast path cheap"""
+    return _now_us() if _enabled else 0
+
+
+def collect():
+    """Hand this process's events to another process (a UI worker's result)"""
+    if not _enabled:
+        return None
+    events = list(_events)
+    _events.clear()
+    return {"pid": _pid, "events": events, "threads": {str(t): n for t, n in _thread_names.items()}}
+
+
+def merge(payload, process_name="disengage-ui"):
+    """Add events collected in a UI worker process to the current cycle"""
+    if not _enabled or not payload:
+        return
+    _process_names[payload["pid"]] = process_name
+    for tid, name in payload["threads"].items():
+        _foreign_threads[(payload["pid"], int(tid))] = name
+    _events.extend(payload["events"])
+
+
+def begin_cycle(label):
+    """Start a new trace file for one break cycle"""
+    global _cycle_label
+    if not _enabled:
+        return
+    _events.clear()
+    _cycle_label = label
+    instant("cycle.begin", label=label)
+
+
+def end_cycle():
+    """Write the current cycle's events; returns the file path (or None)"""
+    global _cycle_label
+    if not _enabled or _cycle_label is None:
+        return None
+    instant("cycle.end", label=_cycle_label)
+    events = list(_events)
+    _events.clear()
+
+    metadata = [{"name": "process_name", "ph": "M", "pid": _pid, "args": {"name": "disengage"}}]
+    for tid, name in list(_thread_names.items()):
+        metadata.append({"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid, "args": {"name": name}})
+    for pid, name in _process_names.items():
+        metadata.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}})
+    for (pid, tid), name in _foreign_threads.items():
+        metadata.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+    _process_names.clear()
+    _foreign_threads.clear()
+
+    path = os.path.join(_trace_dir, f"break-{time.strftime('%Y%m%d-%H%M%S')}-{_cycle_label}.json")
+    try:
+        os.makedirs(_trace_dir, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+    except OSError as e:
+        print(f"Trace write error: {e}")
+        path = None
+    _cycle_label = None
+    return path
@@ -0,0 +1,150 @@
+"""
+Cross-thread dispatch into the UI loop.
+
+Only the Tk thread may touch widgets, but the music thread, the scheduler
+and future IPC listeners need to tell the UI things (audio failed, break
+cancelled). They post a callable here; it runs on the UI thread.
+
+    ui_dispatch.post(label.configure, text="Music unavailable")
+
+Producers append to a deque (atomic under the GIL, no lock) and send one
+wake-up only if none is already pending: a '<<Dispatch>>' virtual event
+for Tk, a pygame event for the SDL blackout. The UI thread drains
+everything queued per wake-up, so there is no periodic after() polling.
+If Tcl was built without threads (cross-thread event_generate is unsafe),
+the Tk loop falls back to polling once per frame.
+
+Posts made while no UI loop is attached stay queued and run when the
+next popup / blackout attaches. Queue depth and enqueue-to-run latency
+are kept for report().
+"""
+import time
+import threading
+from collections import deque
+
+FRAME_MS = 16                   # fallback poll interval (non-threaded Tcl)
+MAX_PER_DRAIN = 100             # keep one drain from stalling the UI
+LATENCY_WINDOW = 512            # recent latencies kept for percentiles
+
+
+class UIDispatcher:
+    """Low-contention command queue drained on the UI thread"""
+
+    def __init__(self):
+        self._queue = deque()
+        self._wake = None           # callable waking the attached UI loop
+        self._owner = None
+        self._pending = False       # a wake-up is in flight
+        self.posted = 0
+        self.executed = 0
+        self.wakeups = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)   # seconds, most recent
+
+    # ---------------- producers (any thread) ----------------
+
+    def post(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the UI thread as soon as it can"""
+        self._queue.append((time.perf_counter(), func, args, kwargs))
+        self.posted += 1
+        depth = len(self._queue)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        # Appended before checking: a drain that already cleared _pending
+        # either sees this item or we wake it again
+        if not self._pending:
+            self._send_wake()
+
+    def _send_wake(self):
+        wake = self._wake
+        if wake is None:
+            return
+        self._pending = True
+        try:
+            wake()
+            self.wakeups += 1
+        except Exception:
+            # UI loop gone or not running yet - items stay queued for the next attach
+            self._pending = False
+
+    # ---------------- UI thread ----------------
+
+    def attach(self, owner, wake):
+        """Route wake-ups to a new UI loop and run anything queued meanwhile"""
+        self._owner = owner
+        self._wake = wake
+        self._pending = False
+        if self._queue:
+            self._send_wake()
+
+    def detach(self, owner):
+        if self._owner is owner:
+            self._owner = None
+            self._wake = None
+            self._pending = False
+
+    def drain(self):
+        """Run queued callables; call on the UI thread when woken"""
+        self._pending = False
+        for _ in range(MAX_PER_DRAIN):
+            try:
+                posted_at, func, args, kwargs = self._queue.popleft()
+            except IndexError:
+                return
+            self.latencies.append(time.perf_counter() - posted_at)
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                self.errors += 1
+                print(f"UI dispatch error in {getattr(func, '__name__', func)}: {e}")
+            self.executed += 1
+        if self._queue and not self._pending:
+            self._send_wake()
+
+    def attach_tk(self, root):
+        """Attach a Tk root: drained from a virtual event, detached on destroy"""
+        def wake():
+            root.event_generate('<<Dispatch>>', when='tail')
+
+        def on_destroy(event):
+            if event.widget is root:
+                self.detach(root)
+
+        root.bind('<<Dispatch>>', lambda e: self.drain())
+        root.bind('<Destroy>', on_destroy, add='+')
+        if root.tk.call('info', 'exists', 'tcl_platform(threaded)'):
+            self.attach(root, wake)
+        else:
+            self.attach(root, None)
+            self._poll_tk(root)
+
+    def _poll_tk(self, root):
+        if self._owner is not root:
+            return
+        self.drain()
+        root.after(FRAME_MS, self._poll_tk, root)
+
+    # ---------------- metrics ----------------
+
+    def depth(self):
+        return len(self._queue)
+
+    def latency_ms(self):
+        """(mean, p95, max) enqueue-to-run latency over recent commands, in ms"""
+        if not self.latencies:
+            return 0.0, 0.0, 0.0
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return sum(ordered) / len(ordered) * 1000, p95 * 1000, ordered[-1] * 1000
+
+    def report(self):
+        mean, p95, worst = self.latency_ms()
+        return (f"UI dispatch: {self.posted} posted, {self.executed} run, {self.errors} errors, "
+                f"{self.wakeups} wake-ups, depth {self.depth()} (max {self.max_depth}), "
+                f"latency mean {mean:.1f} ms / p95 {p95:.1f} ms / max {worst:.1f} ms")
+
+
+dispatcher = UIDispatcher()
+post = dispatcher.post
+report = dispatcher.report
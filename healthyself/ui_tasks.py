@@ -0,0 +1,116 @@
+"""
+UI work the scheduler hands out: warning popup, blackout, micro-break,
+monitor list, audio preparation and pre-warming.
+
+Runs either in the scheduler's own process or in a UI worker forked from
+the zygote (see supervisor.py); both call run(). Arguments and results
+are plain JSON-able dicts so they can cross the process boundary.
+"""
+import time
+from tkinter import Tk, Toplevel, Label, TclError, font as tkfont
+
+from . import config, priority, profiler, tracing
+from .popup import DisengagePopup, MicroBreakOverlay
+from .enforcer import BreakEnforcer
+
+# Fonts of the popup, blackout and micro-break overlay
+FONTS = (("Helvetica", 28, "bold"), ("Helvetica", 12),
+         ("Helvetica", 32, "bold"), ("Helvetica", 20), ("Helvetica", 16))
+
+
+def popup(display_backend, audio_backend, countdown, is_long, requested_at, dismiss_after_ms=None,
+          allow_snooze=True):
+    """Warning popup; latency_ms is request -> first paint"""
+    with priority.boosted("popup"):
+        window = DisengagePopup(countdown_seconds=countdown, is_long_break=is_long, allow_snooze=allow_snooze)
+        # The audio device opens while the warning is up, and stays open into
+        # the break (a UI worker runs the blackout itself, see supervisor.py)
+        window.on_first_paint = lambda: audio_backend.warm(config.MUSIC_FILES)
+        if dismiss_after_ms is not None:
+            # Benchmarks: answer "OK" automatically
+            window.root.after(dismiss_after_ms, lambda: window.on_button(0))
+        snooze, clicked = window.show()
+    latency = None
+    if window.first_paint_at is not None:
+        latency = (window.first_paint_at - requested_at) * 1000
+    return {"snooze": snooze, "clicked": clicked, "latency_ms": latency,
+            "tick_lag_ms": window.tick_lag_ms}
+
+
+def blackout(display_backend, audio_backend, duration, is_long):
+    enforcer = BreakEnforcer(duration, is_long_break=is_long,
+                             display_backend=display_backend, audio_backend=audio_backend)
+    with priority.boosted("blackout"):
+        enforcer.enforce()
+    return {"teardown_ms": enforcer.teardown_ms, "time_to_black_ms": enforcer.time_to_black_ms,
+            "tick_lag_ms": enforcer.tick_lag_ms, "first_sample_ms": enforcer.first_sample_ms,
+            "audio_open_ms": enforcer.audio_open_ms,
+            "fade_dropped": sum(f.dropped for f in (enforcer.fade_in, enforcer.fade_out) if f is not None)}
+
+
+def micro(display_backend, audio_backend, duration, message):
+    with priority.boosted("micro-break"):
+        return {"cpu_ms": MicroBreakOverlay(duration, message).show()}
+
+
+def prewarm(display_backend, audio_backend, names):
+    """
+    Shortly before the warning: page in the audio, load the fonts and
+    build a (withdrawn) break window once, so the deadline path reads
+    nothing from disk. Font files and X server resources stay warm for the
+    next process too.
+    """
+    resident = audio_backend.prewarm(names)
+    count = len(display_backend.monitors())
+    if hasattr(display_backend, "prewarm"):
+        display_backend.prewarm()
+    try:
+        root = Tk()
+    except TclError as e:
+        print(f"Font pre-warm skipped: {e}")
+        return {"resident_kb": resident // 1024, "monitors": count}
+    root.withdraw()
+    try:
+        win = Toplevel(root, bg="black")
+        win.withdraw()
+        for spec in FONTS:
+            tkfont.Font(root, font=spec).metrics()
+            Label(win, text="Break Time - 0:00", font=spec, fg="white", bg="black").pack()
+        root.update_idletasks()
+    finally:
+        root.destroy()
+    return {"resident_kb": resident // 1024, "monitors": count}
+
+
+def monitors(display_backend, audio_backend):
+    return {"monitors": [[m.name, m.x, m.y, m.width, m.height, bool(getattr(m, "is_primary", False))]
+                         for m in display_backend.monitors()]}
+
+
+def prepare(display_backend, audio_backend, names):
+    audio_backend.prepare(names)
+    return {}
+
+
+TASKS = {
+    "popup": popup,
+    "blackout": blackout,
+    "micro": micro,
+    "monitors": monitors,
+    "prepare": prepare,
+    "prewarm": prewarm,
+}
+
+
+def run(task, args, display_backend, audio_backend, collect_trace=False, profile=None):
+    """Run one task; in a worker process the result also carries its trace events
+    and, while the scheduler is profiling (profile options), this worker's samples"""
+    session = profiler.WorkerProfile(profile, task) if profile else None
+    started = time.perf_counter()
+    result = TASKS[task](display_backend, audio_backend, **args)
+    result["task_ms"] = (time.perf_counter() - started) * 1000
+    if collect_trace:
+        result["trace"] = tracing.collect()
+    if session is not None:
+        result["profile"] = session.finish()
+    return result
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+
+import pytest
+
+from healthyself import aio, config, profiler, tracing
+
+
+class FakeUI:
+    """UI runner whose warning stays on screen until answered"""
+
+    display_name = "fake"
+    audio_name = "none"
+
+    def __init__(self):
+        self.calls = []
+        self.shown = threading.Event()
+        self.answered = threading.Event()
+
+    def describe(self):
+        return "UI: fake"
+
+    def monitors(self):
+        self.calls.append("monitors")
+        return []
+
+    def prepare(self, names):
+        self.calls.append("prepare")
+
+    def prewarm(self, names):
+        self.calls.append("prewarm")
+        return {"resident_kb": 0}
+
+    def popup(self, countdown, is_long, allow_snooze=True):
+        self.calls.append("popup")
+        self.shown.set()
+        self.answered.wait(5)
+        return 0, True
+
+    def blackout(self, duration, is_long):
+        self.calls.append("blackout")
+
+    def release(self):
+        self.calls.append("release")
+
+    def shutdown(self):
+        self.calls.append("shutdown")
+
+
+@pytest.fixture
+def ui(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "HISTORY_DIR", str(tmp_path / "history"))
+    monkeypatch.setattr(config, "PLUGIN_DIR", str(tmp_path / "plugins"))
+    monkeypatch.setattr(config, "POLICY_CACHE_FILE", str(tmp_path / "policy.json"))
+    monkeypatch.setattr(config, "FULLSCREEN_DEFER", False)
+    monkeypatch.setattr(config, "TRACE_ENABLED", False)
+    # The pid file and request watcher belong to a real instance
+    monkeypatch.setattr(profiler.controller, "install", lambda: None)
+    fake = FakeUI()
+    monkeypatch.setattr(aio, "create_ui", lambda display_name, audio_name: fake)
+    return fake
+
+
+def test_close_between_breaks_ends_the_event_streams(ui):
+    async def scenario():
+        scheduler = aio.BreakScheduler()
+        stream = scheduler.events()
+        await scheduler.start()
+        upcoming = await scheduler.next_break()
+        await scheduler.close()
+        return upcoming, [event.kind async for event in stream]
+
+    upcoming, kinds = asyncio.run(scenario())
+    assert upcoming.break_type == "short"
+    assert kinds == ["next_break"]
+    assert ui.calls[-1] == "shutdown"
+
+
+def test_close_during_a_warning_waits_for_it_and_stops(ui, monkeypatch):
+    # A short break is due at once
+    monkeypatch.setattr(config, "BREAK_INTERVAL_SHORT", 60)
+    threads = {}
+    monkeypatch.setattr(tracing, "begin_cycle",
+                        lambda label: threads.setdefault("trace", threading.current_thread().name))
+    monkeypatch.setattr(profiler.controller, "cycle_begin",
+                        lambda: threads.setdefault("profile", threading.current_thread().name))
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        scheduler = aio.BreakScheduler()
+        stream = scheduler.events()
+        await scheduler.start()
+        assert await loop.run_in_executor(None, ui.shown.wait, 5)
+        closing = asyncio.create_task(scheduler.close())
+        await asyncio.sleep(0.05)
+        # The warning on screen is finished before the UI shuts down
+        assert not closing.done()
+        ui.answered.set()
+        await closing
+        return [event.kind async for event in stream]
+
+    kinds = asyncio.run(scenario())
+    assert kinds[-1] == "warning"
+    # The cycle starts ran on the UI thread, not on the loop
+    assert threads["trace"].startswith("break-ui") and threads["profile"].startswith("break-ui")
+    # Cancelled at the popup: no blackout follows, and nothing runs after the shutdown
+    assert ui.calls[-2:] == ["popup", "shutdown"]
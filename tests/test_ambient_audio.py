@@ -0,0 +1,40 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pygame")
+
+from healthyself import ambient_audio
+from healthyself.ambient_audio import KINDS, LOOP_SECONDS, PEAK_LEVEL, render
+
+RATE = 8000
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_loop_has_no_click_at_the_seam(kind):
+    audio = render(kind, RATE, 2).astype(np.int32)
+    assert audio.shape == (LOOP_SECONDS * RATE, 2)
+    steps = np.abs(np.diff(audio, axis=0)).max(axis=0)
+    seam = np.abs(audio[0] - audio[-1])
+    assert (seam <= steps).all()
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_level_and_determinism(kind):
+    audio = render(kind, RATE, 1)
+    assert np.abs(audio).max() == pytest.approx(PEAK_LEVEL * 32767, abs=1)
+    assert np.array_equal(audio, render(kind, RATE, 1))
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        render("thunder", RATE, 2)
+
+
+def test_prerender_renders_once(monkeypatch):
+    monkeypatch.setattr(ambient_audio, "_cache", {})
+    monkeypatch.setattr(ambient_audio, "_levels", {})
+    mono = ambient_audio.prerender("pink", RATE, 1)
+    assert mono.ndim == 1 and mono.flags.c_contiguous
+    assert ambient_audio.prerender("pink", RATE, 1) is mono
+    assert ambient_audio._levels[("pink", RATE, 1)] < 0
+    assert ambient_audio.touch() == mono.nbytes
@@ -0,0 +1,88 @@
+import pytest
+
+from healthyself import assets
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(assets, "_resolved", {})
+    monkeypatch.setattr(assets, "_buffers", {})
+
+
+def test_miss_is_not_cached(tmp_path):
+    track = tmp_path / "late.wav"
+    assert assets.resolve(str(track)) is None
+    track.write_bytes(b"RIFF")
+    assert assets.resolve(str(track)) == str(track)
+
+
+def test_empty_file_counts_as_missing(tmp_path):
+    track = tmp_path / "empty.mp3"
+    track.write_bytes(b"")
+    assert assets.preload([str(track)]) == {str(track): None}
+    assert assets.open_buffer(str(track)) is None
+
+
+def test_reader_serves_the_file(tmp_path):
+    track = tmp_path / "a.mp3"
+    track.write_bytes(b"0123456789")
+    reader = assets.open_buffer(str(track))
+    assert reader.read(4) == b"0123"
+    reader.seek(-2, 2)
+    assert reader.read() == b"89"
+
+
+def test_release_closes_maps_and_next_use_remaps(tmp_path):
+    track = tmp_path / "a.mp3"
+    track.write_bytes(b"x" * 100)
+    assert assets.touch([str(track)]) == 100
+    buf = assets._buffers[str(track)]
+    assets.release()
+    assert buf.closed and not assets._buffers
+    assert assets.open_buffer(str(track)).read() == b"x" * 100
+
+
+def test_preload_unmaps_tracks_dropped_from_the_playlist(tmp_path):
+    old, new = tmp_path / "old.mp3", tmp_path / "new.mp3"
+    old.write_bytes(b"old")
+    new.write_bytes(b"new")
+    assets.touch([str(old), str(new)])
+    old_buf = assets._buffers[str(old)]
+    assert assets.preload([str(new), "ambient:pink"]) == {str(new): str(new)}
+    assert old_buf.closed
+    assert list(assets._buffers) == [str(new)]
+
+
+def test_deleted_file_is_searched_again(tmp_path):
+    track = tmp_path / "gone.mp3"
+    track.write_bytes(b"data")
+    assert assets.resolve(str(track))
+    track.unlink()
+    assert assets.open_buffer(str(track)) is None
+    assert str(track) not in assets._resolved
+
+
+def test_bundle_found_from_any_working_directory(tmp_path, monkeypatch):
+    bundle, elsewhere = tmp_path / "bundle", tmp_path / "elsewhere"
+    bundle.mkdir()
+    elsewhere.mkdir()
+    (bundle / "soothing.mp3").write_bytes(b"bundled")
+    (elsewhere / "soothing.mp3").write_bytes(b"stray")
+    monkeypatch.setattr(assets.sys, "_MEIPASS", str(bundle), raising=False)
+    monkeypatch.chdir(elsewhere)
+    assert assets.search_dirs()[0] == str(bundle)
+    assert assets.search_dirs()[-1] == str(elsewhere)
+    assert assets.resolve("soothing.mp3") == str(bundle / "soothing.mp3")
+
+
+def test_readers_share_one_map(tmp_path):
+    track = tmp_path / "a.mp3"
+    track.write_bytes(b"0123456789")
+    first, second = assets.open_buffer(str(track)), assets.open_buffer(str(track))
+    assert first.read(3) == b"012"
+    assert second.read(3) == b"012"
+    assert len(assets._buffers) == 1
+    # pygame closes the stream on unload; the map stays for the next break
+    first.close()
+    assert not assets._buffers[str(track)].closed
+    assert second.read() == b"3456789"
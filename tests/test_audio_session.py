@@ -0,0 +1,69 @@
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from healthyself import config, power
+from healthyself.audio import pygame_mixer
+
+
+@pytest.fixture
+def mixer(monkeypatch):
+    """pygame.mixer stand-in that records opens and closes (no audio device)"""
+    state = {"open": None, "inits": 0, "quits": 0}
+
+    def init(frequency, channels, buffer):
+        state["open"] = (frequency, channels, buffer)
+        state["inits"] += 1
+
+    def quit():
+        state["open"] = None
+        state["quits"] += 1
+
+    monkeypatch.setattr(pygame.mixer, "init", init)
+    monkeypatch.setattr(pygame.mixer, "quit", quit)
+    monkeypatch.setattr(pygame.mixer, "get_init", lambda: state["open"])
+    monkeypatch.setattr(config, "AUDIO_IDLE_TIMEOUT", 3600)
+    return state
+
+
+def test_stays_open_between_uses(mixer):
+    session = pygame_mixer.AudioSession()
+    session.acquire(["ambient:brown"])
+    session.release()
+    session.acquire(["ambient:brown"])
+    assert mixer["inits"] == 1 and mixer["quits"] == 0
+    session.close()
+    assert mixer["open"] is None
+
+
+def test_stale_idle_timer_does_not_close_a_reacquired_mixer(mixer):
+    session = pygame_mixer.AudioSession()
+    session.acquire(["ambient:brown"])
+    session.release()
+    stale = session._timer
+    # The timer fired and was waiting on the lock while acquire() ran
+    session.acquire(["ambient:brown"])
+    stale.function(*stale.args)
+    assert mixer["open"] is not None and mixer["quits"] == 0
+    session.close()
+
+
+def test_idle_timer_closes_when_not_reacquired(mixer):
+    session = pygame_mixer.AudioSession()
+    session.acquire(["ambient:brown"])
+    session.release()
+    timer = session._timer
+    timer.cancel()
+    timer.function(*timer.args)
+    assert mixer["open"] is None
+
+
+def test_simple_battery_audio_uses_a_larger_buffer(mixer, monkeypatch):
+    session = pygame_mixer.AudioSession()
+    session.acquire(["ambient:brown"])
+    monkeypatch.setattr(power.manager, "profile", power.battery_profile("simple"))
+    session.acquire(["ambient:brown"])
+    # Reopened with the battery buffer
+    assert mixer["inits"] == 2
+    assert mixer["open"][2] == config.AUDIO_BUFFER * power.SIMPLE_AUDIO_BUFFER_SCALE
+    session.close()
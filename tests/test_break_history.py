@@ -0,0 +1,99 @@
+import time
+
+from healthyself import break_history
+from healthyself.break_history import BreakHistory, record_break
+from healthyself.break_rules import SnoozeCounter
+
+
+def _midnight(now):
+    t = time.localtime(now)
+    return now - (t.tm_hour * 3600 + t.tm_min * 60 + t.tm_sec)
+
+
+def test_row_carries_the_decision_time(tmp_path):
+    record_break(break_history.BREAK_SHORT, break_history.OUTCOME_TAKEN, duration=300.0,
+                 directory=str(tmp_path), timestamp=1000.0)
+    history = BreakHistory(str(tmp_path)).load()
+    assert list(history.columns["timestamp"]) == [1000.0]
+    assert list(history.columns["duration"]) == [300.0]
+
+
+def test_snooze_counted_on_the_day_it_was_chosen(tmp_path):
+    midnight = _midnight(time.time())
+    # Snoozed before midnight, break over after it: yesterday's snooze
+    record_break(break_history.BREAK_SHORT, break_history.OUTCOME_SNOOZED, snooze=3600,
+                 directory=str(tmp_path), timestamp=midnight - 600)
+    record_break(break_history.BREAK_LONG, break_history.OUTCOME_SNOOZED, snooze=900,
+                 directory=str(tmp_path), timestamp=midnight + 60)
+    record_break(break_history.BREAK_SHORT, break_history.OUTCOME_TAKEN,
+                 directory=str(tmp_path), timestamp=midnight + 120)
+    assert SnoozeCounter(str(tmp_path)).today() == 1
+
+
+def test_since_finds_first_row_at_or_after(tmp_path):
+    history = BreakHistory(str(tmp_path))
+    for ts in (10.0, 20.0, 20.0, 30.0):
+        history.append(break_history.BREAK_SHORT, break_history.OUTCOME_TAKEN, timestamp=ts)
+    assert history.since(20.0) == 1
+    assert history.since(25.0) == 3
+    assert history.since(99.0) == 4
+
+
+def test_torn_append_cut_to_the_shortest_column(tmp_path):
+    history = BreakHistory(str(tmp_path))
+    history.append(break_history.BREAK_SHORT, break_history.OUTCOME_TAKEN, timestamp=10.0)
+    history.append(break_history.BREAK_LONG, break_history.OUTCOME_TAKEN, timestamp=20.0)
+    # A crash between column writes: a whole row in one file, half a value in another
+    with open(tmp_path / "timestamp.col", "ab") as f:
+        f.write(b"\0" * 8)
+    with open(tmp_path / "duration.col", "ab") as f:
+        f.write(b"\0" * 2)
+    loaded = BreakHistory(str(tmp_path)).load()
+    assert len(loaded) == 2
+    assert all(len(column) == 2 for column in loaded.columns.values())
+    # The next append cuts the torn row first, so its values stay together
+    history.append(break_history.BREAK_LONG, break_history.OUTCOME_SNOOZED, 900, 300.0, timestamp=30.0)
+    loaded = BreakHistory(str(tmp_path)).load()
+    assert list(loaded.columns["timestamp"]) == [10.0, 20.0, 30.0]
+    assert list(loaded.columns["duration"]) == [0.0, 0.0, 300.0]
+    assert list(loaded.columns["snooze"]) == [0, 0, 900]
+    assert loaded.since(25.0) == 2
+
+
+def test_compliance_buckets_skip_micro_breaks(tmp_path):
+    history = BreakHistory(str(tmp_path))
+    day = _midnight(time.time()) - 86400 + 9 * 3600
+    for kind, outcome in ((break_history.BREAK_SHORT, break_history.OUTCOME_TAKEN),
+                          (break_history.BREAK_SHORT, break_history.OUTCOME_SNOOZED),
+                          (break_history.BREAK_LONG, break_history.OUTCOME_SKIPPED),
+                          (break_history.BREAK_MICRO, break_history.OUTCOME_TAKEN)):
+        history.append(kind, outcome, timestamp=day)
+        day += 600
+    buckets = break_history.daily_compliance(history, days=2)
+    assert list(buckets.values()) == [[1, 1, 1]]
+    assert break_history.compliance(1, 1) == 0.5
+    # Nothing due counts as fully compliant
+    assert break_history.compliance(0, 0) == 1.0
+    assert break_history.daily_compliance(history, days=0) == {}
+
+
+def test_snooze_rates_count_shown_breaks_only(tmp_path):
+    history = BreakHistory(str(tmp_path))
+    rows = ((break_history.BREAK_SHORT, break_history.OUTCOME_SNOOZED, 900),
+            (break_history.BREAK_SHORT, break_history.OUTCOME_SNOOZED, 1800),
+            (break_history.BREAK_SHORT, break_history.OUTCOME_TAKEN, 0),
+            (break_history.BREAK_SHORT, break_history.OUTCOME_SKIPPED, 0),
+            (break_history.BREAK_LONG, break_history.OUTCOME_SNOOZED, 900))
+    for ts, (kind, outcome, snooze) in enumerate(rows):
+        history.append(kind, outcome, snooze, timestamp=float(ts))
+    by_length, by_type = break_history.snooze_rates(history)
+    assert by_length == {900: 2, 1800: 1}
+    assert by_type == {break_history.BREAK_SHORT: (2, 3), break_history.BREAK_LONG: (1, 1)}
+
+
+def test_histogram_bins(tmp_path):
+    history = BreakHistory(str(tmp_path))
+    for ts, duration in enumerate((100.0, 110.0, 290.0, 300.0)):
+        history.append(break_history.BREAK_LONG, break_history.OUTCOME_TAKEN, duration=duration,
+                       timestamp=float(ts))
+    assert break_history.histogram(history, "duration", 60) == {60: 2, 240: 1, 300: 1}
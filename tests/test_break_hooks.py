@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from healthyself import break_hooks
+from healthyself.break_hooks import HookManager
+
+
+def _wait_for(condition, seconds=2.0):
+    deadline = time.monotonic() + seconds
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_hung_handler_replaced_without_another_emit():
+    manager = HookManager(workers=1)
+    release = threading.Event()
+    manager.register("break_start", lambda event, **_: release.wait(), timeout=0.05)
+    manager.emit("break_start")
+    _wait_for(lambda: manager.hung == 1)
+    with manager.lock:
+        assert manager.stuck == 1 and len(manager.workers) == 1
+        assert not manager.workers[0].abandoned
+    release.set()
+    _wait_for(lambda: manager.stuck == 0)
+
+
+def test_cap_is_on_threads_alive_not_lifetime(monkeypatch):
+    monkeypatch.setattr(break_hooks, "MAX_REPLACEMENTS", 1)
+    manager = HookManager(workers=1)
+    gates = []
+
+    def hang(event, **_):
+        gate = threading.Event()
+        gates.append(gate)
+        gate.wait()
+
+    manager.register("warning", hang, timeout=0.05)
+    for round in range(3):
+        manager.emit("warning")
+        _wait_for(lambda: manager.hung == round + 1)
+        gates[-1].set()
+        _wait_for(lambda: manager.stuck == 0)
+    assert manager.hung == 3
+
+
+def test_replacement_waits_while_cap_is_reached(monkeypatch):
+    monkeypatch.setattr(break_hooks, "MAX_REPLACEMENTS", 1)
+    manager = HookManager(workers=1)
+    gates = [threading.Event(), threading.Event()]
+    calls = iter(gates)
+    manager.register("snooze", lambda event, **_: next(calls).wait(), timeout=0.05)
+    manager.emit("snooze")
+    _wait_for(lambda: manager.hung == 1)
+    manager.emit("snooze")
+    time.sleep(0.2)
+    # Second hang found, but one stuck thread is already alive
+    assert manager.hung == 1
+    gates[0].set()
+    _wait_for(lambda: manager.hung == 2)
+    gates[1].set()
+    _wait_for(lambda: manager.stuck == 0)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    manager = HookManager(workers=1, queue_size=1)
+    release = threading.Event()
+    manager.register("warning", lambda event, **_: release.wait(), timeout=60)
+    manager.emit("warning")
+    _wait_for(lambda: manager.workers[0].current is not None)
+    started = time.monotonic()
+    for _ in range(5):
+        manager.emit("warning")
+    assert time.monotonic() - started < 0.5
+    assert manager.dropped == 4
+    release.set()
+
+
+def test_latency_and_errors_reported():
+    manager = HookManager(workers=2)
+    done = threading.Event()
+
+    def broken(event, **_):
+        raise RuntimeError("lights offline")
+
+    def ok(event, break_type, duration, **_):
+        done.set()
+
+    manager.register("break_start", broken, name="lights")
+    manager.register("break_start", ok, name="presence")
+    manager.emit("break_start", break_type="short", duration=120)
+    _wait_for(lambda: sum(h.stats.calls for h in manager.hooks["break_start"]) == 2)
+    assert done.is_set()
+    stats = {h.name: h.stats for h in manager.hooks["break_start"]}
+    assert stats["lights"].errors == 1 and stats["presence"].errors == 0
+    report = manager.report()
+    assert "break_start:lights" in report and "dropped 0" in report
+
+
+def test_unknown_event_rejected():
+    with pytest.raises(ValueError):
+        HookManager().register("lunch", lambda event, **_: None)
+
+
+def test_plugins_loaded_from_directory(tmp_path, monkeypatch):
+    manager = HookManager()
+    monkeypatch.setattr(break_hooks, "manager", manager)
+    (tmp_path / "lights.py").write_text(
+        "from healthyself import break_hooks\n"
+        "break_hooks.manager.register('break_end', lambda event, **_: None, name='lights')\n")
+    (tmp_path / "broken.py").write_text("raise ImportError('missing dependency')\n")
+    (tmp_path / "_helpers.py").write_text("raise AssertionError('not a plugin')\n")
+    assert manager.load_plugins(str(tmp_path)) == ["lights.py"]
+    assert [h.name for h in manager.hooks["break_end"]] == ["lights"]
+    assert manager.load_plugins(str(tmp_path / "missing")) == []
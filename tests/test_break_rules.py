@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from healthyself.break_rules import RuleError, RuleTable, SnoozeCounter, parse
+
+
+def _at(text):
+    """Epoch seconds for a local "YYYY-MM-DD HH:MM" (2026-10-19 is a Monday)"""
+    return time.mktime(time.strptime(text, "%Y-%m-%d %H:%M"))
+
+
+def test_no_rules_allows_everything():
+    table = RuleTable([], skip_threshold=0)
+    for kind in ("short", "long", "micro"):
+        assert table.decide(kind, _at("2026-10-19 12:30")).allowed
+        assert table.windows(kind) == []
+
+
+def test_window_blocks_and_names_the_rule():
+    table = RuleTable(["no breaks 12:00-13:00"], skip_threshold=0)
+    decision = table.decide("short", _at("2026-10-19 12:30"))
+    assert not decision.allowed
+    assert decision.rule == 1
+    assert '"no breaks 12:00-13:00"' in decision.reason
+    assert decision.reopens_at == _at("2026-10-19 13:00")
+    assert table.decide("short", _at("2026-10-19 13:00")).allowed
+    assert table.decide("short", _at("2026-10-19 11:59")).allowed
+
+
+def test_first_matching_rule_explains_the_decision():
+    table = RuleTable(["no short breaks 12:00-12:30", "no breaks 12:00-13:00"], skip_threshold=0)
+    assert table.decide("short", _at("2026-10-19 12:10")).rule == 1
+    assert table.decide("short", _at("2026-10-19 12:40")).rule == 2
+    assert table.decide("long", _at("2026-10-19 12:10")).rule == 2
+
+
+def test_range_wraps_midnight_and_the_week():
+    table = RuleTable(["no long breaks 22:00-06:00 on sun"], skip_threshold=0)
+    assert not table.decide("long", _at("2026-10-25 23:00")).allowed
+    # Sunday night runs on into Monday morning, across the end of the week
+    decision = table.decide("long", _at("2026-10-26 05:59"))
+    assert not decision.allowed
+    assert decision.reopens_at == _at("2026-10-26 06:00")
+    assert table.decide("long", _at("2026-10-20 05:00")).allowed
+    assert table.decide("short", _at("2026-10-25 23:00")).allowed
+
+
+@pytest.mark.parametrize("rule", ["weekends off", "sat,sun off", "no breaks on sat-sun"])
+def test_day_specs(rule):
+    table = RuleTable([rule], skip_threshold=0)
+    assert not table.decide("micro", _at("2026-10-24 10:00")).allowed
+    assert not table.decide("micro", _at("2026-10-25 23:59")).allowed
+    assert table.decide("micro", _at("2026-10-23 23:59")).allowed
+
+
+def test_only_rule_blocks_the_other_kinds():
+    table = RuleTable(["only long breaks after 18:00"], skip_threshold=0)
+    assert table.decide("long", _at("2026-10-19 19:00")).allowed
+    assert not table.decide("short", _at("2026-10-19 19:00")).allowed
+    assert not table.decide("micro", _at("2026-10-19 19:00")).allowed
+    assert table.decide("short", _at("2026-10-19 17:59")).allowed
+
+
+def test_blocked_all_week_never_reopens():
+    table = RuleTable(["no micro breaks on daily"], skip_threshold=0)
+    decision = table.decide("micro", _at("2026-10-19 12:00"))
+    assert not decision.allowed
+    assert decision.reopens_at is None
+
+
+def test_skip_threshold_only_applies_to_short_breaks():
+    table = RuleTable(["skip short breaks within 10 min of a long break"])
+    assert table.skip_threshold == 600
+    when = _at("2026-10-19 10:00")
+    decision = table.decide("short", when, time_until_long=300)
+    assert not decision.allowed
+    assert decision.rule == 0
+    assert table.decide("short", when, time_until_long=900).allowed
+    assert table.decide("long", when, time_until_long=300).allowed
+
+
+def test_snooze_limit():
+    assert RuleTable([]).snooze_allowed(100)
+    table = RuleTable(["max 2 snoozes per day"])
+    assert table.snooze_allowed(1)
+    assert not table.snooze_allowed(2)
+
+
+@pytest.mark.parametrize("rule", [
+    "no breaks whenever",
+    "no breaks",
+    "no breaks 25:00-26:00",
+    "no breaks 12:60-13:00",
+    "no breaks on funday",
+    "only long breaks after 24:30",
+])
+def test_bad_rules_raise(rule):
+    with pytest.raises(RuleError):
+        RuleTable([rule])
+
+
+def test_parse_normalises_case_and_spacing():
+    assert parse("  Max  3 Snoozes per DAY ") == ("snoozes", 3)
+
+
+def test_too_many_rules():
+    with pytest.raises(RuleError):
+        RuleTable(["weekends off"] * 256)
+
+
+def test_snooze_counter_resets_on_a_new_day():
+    counter = SnoozeCounter()
+    monday = _at("2026-10-19 09:00")
+    counter.record(monday)
+    counter.record(monday + 60)
+    assert counter.today(monday + 120) == 2
+    assert counter.today(_at("2026-10-20 09:00")) == 0
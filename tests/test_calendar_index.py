@@ -0,0 +1,148 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from healthyself import calendar_index
+from healthyself.calendar_index import CalendarIndex
+
+
+@pytest.fixture
+def local_tz(monkeypatch):
+    """Run with this machine's local time zone set to name"""
+    def use(name):
+        monkeypatch.setenv("TZ", name)
+        time.tzset()
+    yield use
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _calendar(tmp_path, *events):
+    body = "".join(f"BEGIN:VEVENT\n{event.strip()}\nEND:VEVENT\n" for event in events)
+    path = tmp_path / "work.ics"
+    path.write_text(f"BEGIN:VCALENDAR\n{body}END:VCALENDAR\n")
+    return CalendarIndex([str(path)])
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def test_single_event_busy_until_its_end(tmp_path):
+    index = _calendar(tmp_path, "UID:a\nDTSTART:20250310T090000Z\nDTEND:20250310T100000Z")
+    assert index.busy_until(_utc(2025, 3, 10, 9, 30)) == _utc(2025, 3, 10, 10)
+    assert index.busy_until(_utc(2025, 3, 10, 10)) is None
+    assert index.busy_until(_utc(2025, 3, 10, 8, 59)) is None
+
+
+def test_overlapping_events_merge(tmp_path):
+    index = _calendar(tmp_path,
+                      "UID:a\nDTSTART:20250310T090000Z\nDURATION:PT1H",
+                      "UID:b\nDTSTART:20250310T094500Z\nDTEND:20250310T110000Z")
+    assert index.busy_until(_utc(2025, 3, 10, 9, 15)) == _utc(2025, 3, 10, 11)
+
+
+def test_cancelled_transparent_and_all_day_ignored(tmp_path):
+    index = _calendar(tmp_path,
+                      "UID:a\nDTSTART:20250310T090000Z\nDURATION:PT1H\nSTATUS:CANCELLED",
+                      "UID:b\nDTSTART:20250310T090000Z\nDURATION:PT1H\nTRANSP:TRANSPARENT",
+                      "UID:c\nDTSTART;VALUE=DATE:20250310\nDTEND;VALUE=DATE:20250311")
+    assert not index.is_busy(_utc(2025, 3, 10, 9, 30))
+
+
+def test_weekly_rule_with_exdate_override_and_count(tmp_path):
+    index = _calendar(tmp_path,
+                      "UID:w\nDTSTART:20250303T090000Z\nDURATION:PT30M\n"
+                      "RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=5\nEXDATE:20250305T090000Z",
+                      # Moved occurrence: the master's 10 March slot is replaced
+                      "UID:w\nRECURRENCE-ID:20250310T090000Z\nDTSTART:20250310T140000Z\nDURATION:PT30M")
+    assert index.is_busy(_utc(2025, 3, 3, 9, 10))
+    assert not index.is_busy(_utc(2025, 3, 5, 9, 10))       # EXDATE
+    assert not index.is_busy(_utc(2025, 3, 10, 9, 10))      # overridden
+    assert index.is_busy(_utc(2025, 3, 10, 14, 10))         # the override itself
+    assert index.is_busy(_utc(2025, 3, 17, 9, 10))          # 5th (EXDATEs count too)
+    assert not index.is_busy(_utc(2025, 3, 19, 9, 10))      # past COUNT
+
+
+def test_until_as_date_includes_that_day(tmp_path):
+    index = _calendar(tmp_path, "UID:d\nDTSTART:20250303T090000Z\nDURATION:PT1H\n"
+                                "RRULE:FREQ=DAILY;UNTIL=20250305")
+    assert index.is_busy(_utc(2025, 3, 5, 9, 30))
+    assert not index.is_busy(_utc(2025, 3, 6, 9, 30))
+
+
+def test_floating_recurrence_keeps_local_wall_time_across_dst(tmp_path, local_tz):
+    local_tz("Europe/Berlin")
+    # Weekly Monday 09:00 local, starting in winter (UTC+1); DST starts 30 March
+    index = _calendar(tmp_path, "UID:f\nDTSTART:20250303T090000\nDURATION:PT1H\nRRULE:FREQ=WEEKLY")
+    summer_nine = datetime(2025, 4, 7, 9, 0).timestamp()
+    assert index.is_busy(summer_nine + 30 * 60)
+    assert index.busy_until(summer_nine + 30 * 60) == summer_nine + 3600
+    assert not index.is_busy(summer_nine + 3600 + 60)
+
+
+def test_tzid_recurrence_follows_its_zone_not_the_machine(tmp_path, local_tz):
+    local_tz("UTC")
+    index = _calendar(tmp_path, "UID:z\nDTSTART;TZID=Europe/Berlin:20250303T090000\nDURATION:PT1H\n"
+                                "RRULE:FREQ=WEEKLY")
+    assert index.is_busy(_utc(2025, 3, 3, 8, 30))           # 09:00 CET
+    assert index.is_busy(_utc(2025, 4, 7, 7, 30))           # 09:00 CEST
+    assert not index.is_busy(_utc(2025, 4, 7, 8, 30))
+
+
+@pytest.mark.parametrize("tzid", ["W. Europe Standard Time", "/mozilla.org/20070129_1/Europe/Berlin",
+                                  '"Europe/Berlin"'])
+def test_windows_and_prefixed_tzids_resolve(tmp_path, local_tz, tzid):
+    local_tz("UTC")
+    index = _calendar(tmp_path, f"UID:t\nDTSTART;TZID={tzid}:20250707T090000\nDURATION:PT1H")
+    assert index.is_busy(_utc(2025, 7, 7, 7, 30))
+
+
+def test_unknown_tzid_warns_once_and_reads_local_time(tmp_path, local_tz, capsys, monkeypatch):
+    local_tz("UTC")
+    monkeypatch.setattr(calendar_index, "_unresolved", set())
+    index = _calendar(tmp_path,
+                      "UID:u1\nDTSTART;TZID=Nowhere Standard Time:20250707T090000\nDURATION:PT1H",
+                      "UID:u2\nDTSTART;TZID=Nowhere Standard Time:20250708T090000\nDURATION:PT1H")
+    assert index.is_busy(_utc(2025, 7, 7, 9, 30))
+    assert capsys.readouterr().out.count("Nowhere Standard Time") == 1
+
+
+def test_rebuilds_only_when_file_changes_or_window_moves(tmp_path):
+    index = _calendar(tmp_path, "UID:a\nDTSTART:20250310T090000Z\nDURATION:PT1H")
+    now = _utc(2025, 3, 10, 8)
+    index.busy_until(now)
+    index.busy_until(now + 3600)
+    assert index.rebuilds == 1
+    index.busy_until(now + 10 * 86400)
+    assert index.rebuilds == 2
+
+
+def test_back_to_back_meetings_defer_to_the_last_end(tmp_path):
+    index = _calendar(tmp_path,
+                      "UID:a\nDTSTART:20250310T090000Z\nDTEND:20250310T100000Z",
+                      "UID:b\nDTSTART:20250310T100000Z\nDTEND:20250310T103000Z")
+    assert index.busy_until(_utc(2025, 3, 10, 9, 50)) == _utc(2025, 3, 10, 10, 30)
+
+
+def test_edited_file_is_picked_up(tmp_path):
+    index = _calendar(tmp_path, "UID:a\nDTSTART:20250310T090000Z\nDURATION:PT1H")
+    now = _utc(2025, 3, 10, 9, 30)
+    assert index.is_busy(now)
+    _calendar(tmp_path, "UID:a\nDTSTART:20250310T090000Z\nDURATION:PT1H\nSTATUS:CANCELLED")
+    assert not index.is_busy(now)
+    assert index.rebuilds == 2
+
+
+def test_missing_file_means_free(tmp_path, capsys):
+    index = CalendarIndex([str(tmp_path / "gone.ics")])
+    assert not index.is_busy(_utc(2025, 3, 10, 9))
+    assert "gone.ics" in capsys.readouterr().out
+    assert not CalendarIndex([]).is_busy()
+
+
+def test_folded_lines_unfolded(tmp_path):
+    index = _calendar(tmp_path, "UID:a\nSUMMARY:Quarterly planning with a very long\n  title\n"
+                                "DTSTART:20250310T0900\n 00Z\nDURATION:PT1H")
+    assert index.is_busy(_utc(2025, 3, 10, 9, 30))
@@ -0,0 +1,46 @@
+import time
+import threading
+
+from healthyself.cancellation import CancelToken
+
+
+def test_cancel_wakes_every_waiter_at_once():
+    token = CancelToken()
+    woke = []
+
+    def waiter():
+        woke.append(token.wait(30))
+
+    threads = [threading.Thread(target=waiter) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    token.cancel()
+    for thread in threads:
+        thread.join(5)
+    # Woken by the cancel, not by the 30 s timeout
+    assert woke == [True] * 4
+    assert time.perf_counter() - started < 5
+    assert token.cancelled and token.cancelled_at >= started
+
+
+def test_wait_times_out_while_not_cancelled():
+    token = CancelToken()
+    assert token.wait(0.01) is False
+    assert not token.cancelled and token.cancelled_at is None
+
+
+def test_callbacks_run_once_and_late_ones_run_now(capsys):
+    token = CancelToken()
+    calls = []
+    token.on_cancel(lambda: calls.append("early"))
+    token.on_cancel(lambda: 1 / 0)
+    token.cancel()
+    first = token.cancelled_at
+    token.cancel()
+    assert token.cancelled_at == first
+    token.on_cancel(lambda: calls.append("late"))
+    # A failing callback is reported and doesn't stop the others
+    assert calls == ["early", "late"]
+    assert "Cancel callback error" in capsys.readouterr().out
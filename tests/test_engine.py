@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+from healthyself import engine
+from healthyself.calendar_index import CalendarIndex
+from healthyself.fullscreen_detect import NullDetector
+
+MEETING = "BEGIN:VCALENDAR\nBEGIN:VEVENT\nUID:a\nDTSTART:20250310T090000Z\nDURATION:PT1H\nEND:VEVENT\nEND:VCALENDAR\n"
+IN_MEETING = 1741599000.0       # 2025-03-10 09:30 UTC
+AFTER_MEETING = 1741604400.0    # 2025-03-10 11:00 UTC
+
+
+class Fullscreen(NullDetector):
+    def is_fullscreen(self):
+        return True
+
+
+def test_micro_break_blocked_by_meeting_or_fullscreen(tmp_path):
+    path = tmp_path / "work.ics"
+    path.write_text(MEETING)
+    calendar = CalendarIndex([str(path)])
+    assert engine.micro_blocked(calendar, NullDetector(), IN_MEETING)
+    assert not engine.micro_blocked(calendar, NullDetector(), AFTER_MEETING)
+    assert engine.micro_blocked(calendar, Fullscreen(), AFTER_MEETING)
+    # No detector (detection disabled)
+    assert not engine.micro_blocked(CalendarIndex([]), None, AFTER_MEETING)
+
+
+@pytest.mark.skipif(sys.platform != "win32" and not os.environ.get("DISPLAY"), reason="needs a display")
+def test_micro_overlay_counts_down_and_reports_cpu():
+    from healthyself.popup import MicroBreakOverlay
+    overlay = MicroBreakOverlay(duration_seconds=1, message="Look away")
+    cpu_ms = overlay.show()
+    assert cpu_ms is not None and cpu_ms >= 0
+    assert overlay.root is None
@@ -0,0 +1,83 @@
+import pytest
+
+from healthyself import fade
+from healthyself.fade import Fade
+
+
+class Window:
+    """Records alpha changes; after() callbacks are run by the test's clock"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.alphas = []
+
+    def attributes(self, name, value):
+        self.alphas.append(value)
+
+    def after(self, delay_ms, func):
+        self.clock.pending = (self.clock.now + delay_ms / 1000, func)
+        return "after#1"
+
+    def after_cancel(self, ident):
+        self.clock.pending = None
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+        self.pending = None
+
+    def __call__(self):
+        return self.now
+
+    def run(self, late=0.0):
+        """Fire the scheduled frame, late seconds after it was due"""
+        due, func = self.pending
+        self.pending = None
+        self.now = max(self.now, due) + late
+        func()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fade.time, "perf_counter", clock)
+    return clock
+
+
+def test_busy_loop_drops_frames_and_ends_on_target(clock):
+    windows = [Window(clock), Window(clock)]
+    # 100 ms at 50 fps: a frame every 20 ms
+    fader = Fade(windows, 0.0, 1.0, 100, 50)
+    fader.start()
+    clock.run(late=0.045)       # the loop was busy: frame 1 ran in slot 3
+    while not fader.done:
+        clock.run()
+    assert fader.dropped == 2
+    assert fader.frames == 4    # slots 0, 3, 4 and 5
+    assert fader.worst_late_ms == pytest.approx(45)
+    # Alpha follows the clock, not the frame count, and lands exactly on the target
+    assert windows[0].alphas == windows[1].alphas
+    assert windows[0].alphas[0] == 0.0 and windows[0].alphas[-1] == 1.0
+    assert windows[0].alphas == sorted(windows[0].alphas)
+    assert clock.pending is None
+
+
+def test_on_time_frames_drop_nothing(clock):
+    window = Window(clock)
+    fader = Fade([window], 1.0, 0.0, 100, 50)
+    fader.start()
+    while not fader.done:
+        clock.run()
+    assert (fader.frames, fader.dropped) == (6, 0)
+    assert window.alphas[-1] == 0.0
+
+
+def test_finish_jumps_to_the_end_and_cancels_the_next_frame(clock):
+    window = Window(clock)
+    fader = Fade([window], 0.0, 1.0, 100, 50)
+    fader.start()
+    fader.finish("break ended")
+    assert fader.done and fader.fell_back == "break ended"
+    assert window.alphas == [0.0, 1.0]
+    assert clock.pending is None
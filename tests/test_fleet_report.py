@@ -0,0 +1,65 @@
+from healthyself import fleet_report
+from healthyself.break_history import BREAK_SHORT, BREAK_LONG, OUTCOME_TAKEN, OUTCOME_SNOOZED, record_break
+from healthyself.fleet_report import DAY, merge_days, read_days
+
+TAKEN = ("a", BREAK_SHORT, OUTCOME_TAKEN, 0)
+SNOOZED = ("a", BREAK_LONG, OUTCOME_SNOOZED, 900)
+
+
+def test_merge_combines_blocks_of_the_same_day():
+    first = [(1, {TAKEN: [2, 240.0]}), (3, {TAKEN: [1, 120.0]})]
+    second = [(1, {TAKEN: [1, 120.0], SNOOZED: [1, 300.0]}), (2, {SNOOZED: [1, 300.0]})]
+    assert list(merge_days([iter(first), iter(second)])) == [
+        (1, {TAKEN: [3, 360.0], SNOOZED: [1, 300.0]}),
+        (2, {SNOOZED: [1, 300.0]}),
+        (3, {TAKEN: [1, 120.0]}),
+    ]
+
+
+def test_merge_leaves_the_input_blocks_alone():
+    block = {TAKEN: [1, 120.0]}
+    list(merge_days([iter([(1, block)]), iter([(1, {TAKEN: [1, 120.0]})])]))
+    assert block == {TAKEN: [1, 120.0]}
+
+
+def test_merge_of_nothing():
+    assert list(merge_days([])) == []
+    assert list(merge_days([iter([]), iter([])])) == []
+
+
+def test_merge_is_lazy():
+    # A day is yielded as soon as every stream has moved past it
+    def stream(days):
+        for day in days:
+            yield day, {TAKEN: [1, 0.0]}
+    merged = merge_days([stream(range(10 ** 9)), stream(range(10 ** 9))])
+    assert next(merged) == (0, {TAKEN: [2, 0.0]})
+    assert next(merged) == (1, {TAKEN: [2, 0.0]})
+
+
+def _history(directory, timestamps):
+    for timestamp in timestamps:
+        record_break(BREAK_SHORT, OUTCOME_TAKEN, duration=60.0, directory=str(directory), timestamp=timestamp)
+
+
+def test_read_days_splits_on_utc_days_whatever_the_chunk(tmp_path):
+    _history(tmp_path, [10 * DAY + 5, 10 * DAY + 50, 11 * DAY, 13 * DAY - 1])
+    key = ("t", BREAK_SHORT, OUTCOME_TAKEN, 0)
+    expected = [(10, {key: [2, 120.0]}), (11, {key: [1, 60.0]}), (12, {key: [1, 60.0]})]
+    for chunk in (1, 3, 64):
+        assert list(read_days(str(tmp_path), "t", chunk)) == expected
+    assert list(read_days(str(tmp_path), "t", 2, since=11 * DAY, until=12 * DAY)) == [(11, {key: [1, 60.0]})]
+
+
+def test_report_totals_do_not_depend_on_sharding(tmp_path):
+    events = fleet_report.generate(str(tmp_path), machines=6, days=14, teams=2)
+    machines = fleet_report.discover(str(tmp_path))
+    assert len(machines) == 6
+    one = fleet_report.aggregate(machines, workers=1, period="day")
+    # A tiny memory budget forces the smallest chunks
+    two = fleet_report.aggregate(machines, workers=2, period="day", memory_mb=0)
+    assert one.events == two.events == events
+    assert one.teams == two.teams
+    assert one.periods == two.periods
+    assert one.snoozes == two.snoozes
+    assert set(one.teams) == {"team-00", "team-01"}
@@ -0,0 +1,100 @@
+from collections import namedtuple
+
+from healthyself import fullscreen_detect
+from healthyself.fullscreen_detect import NullDetector, X11Detector, _covers_monitor
+
+Monitor = namedtuple("Monitor", "x y width height")
+LEFT = Monitor(0, 0, 1920, 1080)
+RIGHT = Monitor(1920, 0, 2560, 1440)
+
+ACTIVE, STATE, FULLSCREEN = 1, 2, 3
+
+
+def test_covers_a_whole_monitor():
+    assert _covers_monitor(0, 0, 1920, 1080, [LEFT, RIGHT])
+    assert _covers_monitor(1920, 0, 2560, 1440, [LEFT, RIGHT])
+    # Borderless windows may overhang the monitor edge
+    assert _covers_monitor(-2, -2, 1924, 1084, [LEFT])
+    assert not _covers_monitor(0, 0, 1920, 1040, [LEFT, RIGHT])
+    assert not _covers_monitor(1000, 0, 1920, 1080, [LEFT, RIGHT])
+    assert not _covers_monitor(0, 0, 1920, 1080, [])
+
+
+class FakeXcb:
+    """Window properties and rectangles as the X server would report them"""
+
+    root = 100
+
+    def __init__(self):
+        self.properties = {}
+        self.rectangles = {}
+        self.watched = []
+
+    def property(self, window, atom):
+        return self.properties.get((window, atom), [])
+
+    def rectangle(self, window):
+        return self.rectangles.get(window)
+
+    def watch(self, window, mask):
+        self.watched.append(window)
+
+
+def _detector(xcb, monitors=(LEFT, RIGHT)):
+    detector = X11Detector.__new__(X11Detector)
+    NullDetector.__init__(detector)
+    detector.monitors = list(monitors)
+    detector.xcb = xcb
+    detector.atom_active, detector.atom_state, detector.atom_fullscreen = ACTIVE, STATE, FULLSCREEN
+    detector._fullscreen = False
+    detector._active = None
+    detector.updated_at = 0.0
+    detector.updates = 0
+    return detector
+
+
+def test_cached_answer_follows_the_active_window():
+    xcb = FakeXcb()
+    detector = _detector(xcb)
+    detector._evaluate()
+    assert not detector.is_fullscreen()
+
+    # A window asking the window manager for fullscreen
+    xcb.properties[(xcb.root, ACTIVE)] = [7]
+    xcb.properties[(7, STATE)] = [FULLSCREEN]
+    detector._evaluate()
+    assert detector.is_fullscreen()
+    assert xcb.watched == [7]
+
+    # A borderless window sized to the second monitor, with no state hint
+    xcb.properties[(xcb.root, ACTIVE)] = [8]
+    xcb.rectangles[8] = (1920, 0, 2560, 1440)
+    detector._evaluate()
+    assert detector.is_fullscreen()
+    assert xcb.watched == [7, 8]
+
+    # The window vanished between the event and the query
+    del xcb.rectangles[8]
+    detector._evaluate()
+    assert not detector.is_fullscreen()
+    assert xcb.watched == [7, 8]
+    assert detector.updates == 4
+
+
+def test_reads_are_cache_only():
+    xcb = FakeXcb()
+    detector = _detector(xcb)
+    detector._evaluate()
+    xcb.properties[(xcb.root, ACTIVE)] = [7]
+    xcb.properties[(7, STATE)] = [FULLSCREEN]
+    # No X event yet, so the cached answer stands
+    assert not detector.is_fullscreen()
+    assert detector.last_check_ms >= 0.0
+
+
+def test_no_display_means_never_fullscreen(monkeypatch):
+    monkeypatch.delenv("DISPLAY", raising=False)
+    monkeypatch.setattr(fullscreen_detect.sys, "platform", "linux")
+    detector = fullscreen_detect.create_detector([LEFT])
+    assert type(detector) is NullDetector
+    assert not detector.is_fullscreen()
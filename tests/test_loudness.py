@@ -0,0 +1,76 @@
+import wave
+
+import pytest
+
+from healthyself import loudness
+
+np = pytest.importorskip("numpy")
+
+RATE = 8000
+
+
+def _tone(seconds, amplitude, channels=2):
+    t = np.arange(int(seconds * RATE)) / RATE
+    wave_ = (amplitude * 32767 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    return np.repeat(wave_[:, None], channels, axis=1)
+
+
+def _write_wav(path, samples):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(samples.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(samples.tobytes())
+
+
+def test_full_scale_sine_is_about_minus_3_dbfs():
+    assert loudness.analyse(_tone(2, 1.0), RATE) == pytest.approx(-3.0, abs=0.1)
+
+
+def test_silence_is_gated():
+    assert loudness.analyse(np.zeros((RATE * 2, 2), dtype=np.int16), RATE) == loudness.ABSOLUTE_GATE
+
+
+def test_chunked_matches_whole(monkeypatch):
+    samples = np.concatenate([_tone(3, 0.5), _tone(4, 0.05)])
+    whole = loudness.analyse(samples, RATE)
+    # Chunks that don't line up with the 400 ms blocks
+    chunks = (samples[i:i + 1234] for i in range(0, len(samples), 1234))
+    assert loudness.analyse_chunks(chunks, RATE) == pytest.approx(whole, abs=1e-4)
+
+
+def test_wav_streamed_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(loudness, "CHUNK_SECONDS", 1)
+    samples = _tone(5, 0.25)
+    path = tmp_path / "tone.wav"
+    _write_wav(path, samples)
+    chunks, rate = loudness.wav_chunks(str(path))
+    chunks = list(chunks)
+    assert rate == RATE
+    assert [len(c) for c in chunks] == [RATE] * 5
+    assert loudness.analyse_chunks(iter(chunks), rate) == pytest.approx(loudness.analyse(samples, RATE))
+
+
+def test_non_wav_is_left_to_the_backend(tmp_path):
+    path = tmp_path / "track.mp3"
+    path.write_bytes(b"ID3" + bytes(100))
+    assert loudness.wav_chunks(str(path)) is None
+
+
+def test_gain_only_attenuates():
+    assert loudness.gain_for(-30.0, -24.0) == 1.0
+    assert loudness.gain_for(-18.0, -24.0) == pytest.approx(0.5, abs=0.01)
+    assert loudness.gain_for(0.0, -60.0) == loudness.MIN_VOLUME
+
+
+def test_cache_tracks_file_changes(tmp_path):
+    track = tmp_path / "a.wav"
+    track.write_bytes(b"one")
+    cache = loudness.LoudnessCache(str(tmp_path / "cache.json"))
+    assert not cache.fresh(str(track))
+    cache.store(str(track), -20.0)
+    cache.save()
+    reloaded = loudness.LoudnessCache(str(tmp_path / "cache.json"))
+    assert reloaded.fresh(str(track)) and reloaded.loudness(str(track)) == -20.0
+    track.write_bytes(b"changed")
+    assert not reloaded.fresh(str(track))
@@ -0,0 +1,102 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from healthyself import policy_sweep
+from healthyself.policy_sweep import RunIndex, parse_range, sweep
+
+
+def _on_screen(active, natural_break=policy_sweep.NATURAL_BREAK_MINUTES):
+    """Active minutes plus idle gaps shorter than a natural break, one minute at a time"""
+    on = [bool(a) for a in active]
+    i = 0
+    while i < len(on):
+        if active[i]:
+            i += 1
+            continue
+        j = i
+        while j < len(on) and not active[j]:
+            j += 1
+        if j - i < natural_break:
+            on[i:j] = [True] * (j - i)
+        i = j
+    return on
+
+
+def _longest(on, lo, hi):
+    best = run = 0
+    for minute in range(max(lo, 0), min(hi, len(on))):
+        run = run + 1 if on[minute] else 0
+        best = max(best, run)
+    return best
+
+
+def _replay(active, short, long, skip, duration_short, duration_long):
+    """One combination through the main_loop() decisions, without numpy"""
+    on = _on_screen(active)
+    n, warning = len(active), policy_sweep.WARNING_MINUTES
+    taken = skipped = interrupted = max_screen = 0
+    last_short = last_long = 0
+    while True:
+        due_long = last_long + long - warning
+        due_short = last_short + short - warning
+        skip_short = due_short < due_long and due_long + warning - due_short <= skip
+        is_long = due_long <= due_short or skip_short
+        blackout = (due_long if is_long else due_short) + warning
+        if blackout >= n:
+            return taken, skipped, interrupted, max(max_screen, _longest(on, last_short, n))
+        taken += 1
+        skipped += skip_short
+        interrupted += bool(active[blackout])
+        max_screen = max(max_screen, _longest(on, last_short, blackout))
+        last_short = blackout + (duration_long if is_long else duration_short)
+        if is_long:
+            last_long = last_short
+
+
+def test_parse_range():
+    assert list(parse_range("60")) == [60]
+    assert list(parse_range("30:45:5")) == [30, 35, 40, 45]
+    assert list(parse_range("1:3")) == [1, 2, 3]
+
+
+def test_short_idle_gaps_stay_on_screen():
+    active = np.array([1, 1, 0, 0, 1, 0, 0, 0, 0, 0, 1, 1], dtype=bool)
+    runs = RunIndex(active)
+    assert list(runs.on_screen) == [True] * 5 + [False] * 5 + [True] * 2
+    assert runs.longest(np.array([0]), np.array([12]))[0] == 5
+
+
+def test_longest_matches_a_linear_scan():
+    active = policy_sweep.synthetic_trace(3, seed=4)[400:1400]
+    on = _on_screen(active)
+    runs = RunIndex(active)
+    rng = np.random.default_rng(1)
+    lo = rng.integers(-5, len(active), 500)
+    hi = lo + rng.integers(0, 300, 500)
+    got = runs.longest(lo, hi)
+    assert list(got) == [_longest(on, a, b) for a, b in zip(lo, hi)]
+
+
+def test_sweep_matches_replaying_each_combination():
+    active = policy_sweep.synthetic_trace(4, seed=2)
+    shorts, longs, skips = parse_range("20:60:20"), parse_range("90:150:30"), parse_range("0:30:15")
+    result = sweep(active, shorts, longs, skips, duration_short=2, duration_long=5)
+    assert len(result["short"]) == 27
+    for i in range(27):
+        expected = _replay(active, result["short"][i], result["long"][i], result["skip"][i], 2, 5)
+        got = tuple(int(result[name][i]) for name in ("taken", "skipped", "interrupted", "max_screen"))
+        assert got == expected, (result["short"][i], result["long"][i], result["skip"][i])
+
+
+def test_skip_threshold_zero_never_skips():
+    active = policy_sweep.synthetic_trace(2, seed=3)
+    result = sweep(active, np.array([50]), np.array([120]), np.array([0, 30]))
+    assert result["skipped"][0] == 0
+    assert result["skipped"][1] > 0
+
+
+def test_csv_trace_fills_gaps_with_idle(tmp_path):
+    trace = tmp_path / "trace.csv"
+    trace.write_text("1000,1\n1030,0\n1060,0\n1240,1\n")
+    assert list(policy_sweep.load_trace([str(trace)])) == [True, False, False, False, True]
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from healthyself import config, policy_sync
+from healthyself.policy_sync import PolicyError, validate
+
+# Local settings a policy is laid over (config.py defaults)
+BASE = {key: getattr(config, key) for key in policy_sync.POLICY_KEYS}
+
+
+def test_accepts_and_drops_version():
+    assert validate({"version": "v1", "BREAK_INTERVAL_SHORT": 1800}, BASE) == {"BREAK_INTERVAL_SHORT": 1800}
+
+
+def test_unknown_setting_is_ignored(monkeypatch, capsys):
+    monkeypatch.setattr(policy_sync, "_ignored", set())
+    assert validate({"SOMETHING_NEW": 1}, BASE) == {}
+    # Reported on the first fetch only
+    assert validate({"SOMETHING_NEW": 1}, BASE) == {}
+    assert capsys.readouterr().out.count("SOMETHING_NEW") == 1
+
+
+def test_int_promoted_to_float():
+    assert validate({"LOUDNESS_TARGET": -20}, BASE) == {"LOUDNESS_TARGET": -20.0}
+
+
+@pytest.mark.parametrize("document", [
+    [],
+    {"BREAK_INTERVAL_SHORT": "60"},
+    {"BREAK_INTERVAL_SHORT": True},
+    {"BREAK_INTERVAL_SHORT": 0},
+    {"SKIP_THRESHOLD": -1},
+    {"MUSIC_FILES": []},
+    {"WELLNESS_MESSAGES": ["ok", 3]},
+    {"MESSAGE_MODE": "SHUFFLE"},
+    {"BREAK_RULES": ["no breaks whenever"]},
+])
+def test_rejects_bad_values(document):
+    with pytest.raises(PolicyError):
+        validate(document, BASE)
+
+
+def test_skip_threshold_zero_means_never_skip():
+    assert validate({"SKIP_THRESHOLD": 0}, BASE) == {"SKIP_THRESHOLD": 0}
+
+
+@pytest.mark.parametrize("document", [
+    {"AMBIENT_SOUND": "rain"},
+    {"MUSIC_FILES": ["calm.mp3", "ambient:rain"]},
+    {"LOUDNESS_TARGET": 3.0},
+    {"BREAK_INTERVAL_SHORT": 60},
+    {"BREAK_DURATION_SHORT": config.BREAK_INTERVAL_SHORT},
+    {"BREAK_INTERVAL_SHORT": config.BREAK_INTERVAL_LONG},
+    {"SKIP_THRESHOLD": config.BREAK_INTERVAL_LONG},
+    {"MICRO_BREAK_DURATION": 20 * 60, "MICRO_BREAK_INTERVAL": 10 * 60},
+])
+def test_rejects_settings_the_ui_cannot_use(document):
+    with pytest.raises(PolicyError):
+        validate(document, BASE)
+
+
+def test_checks_against_the_base_not_just_the_document():
+    # Fine on its own, but longer than the local short interval
+    document = {"BREAK_DURATION_SHORT": 20 * 60}
+    assert validate(document, BASE)
+    with pytest.raises(PolicyError):
+        validate(document, dict(BASE, BREAK_INTERVAL_SHORT=15 * 60))
+    assert validate(dict(document, BREAK_INTERVAL_SHORT=30 * 60), dict(BASE, BREAK_INTERVAL_SHORT=15 * 60))
+
+
+def test_ambient_music_entry_accepted():
+    assert validate({"MUSIC_FILES": ["ambient:pink"]}, BASE) == {"MUSIC_FILES": ["ambient:pink"]}
+
+
+def _syncer(tmp_path, monkeypatch, document):
+    cache = tmp_path / "policy.json"
+    cache.write_text(json.dumps({"url": "http://policy/", "document": document}))
+    for key, value in BASE.items():
+        monkeypatch.setattr(config, key, value)
+    sync = policy_sync.PolicySync()
+    sync.configure("http://policy/", 900, 0.2, str(cache))
+    return sync, cache
+
+
+def test_cached_policy_applied_on_offline_start(tmp_path, monkeypatch):
+    sync, _ = _syncer(tmp_path, monkeypatch, {"version": "v2", "BREAK_INTERVAL_SHORT": 1800})
+    assert sync.load_cached()
+    assert sync.apply_pending() == {"BREAK_INTERVAL_SHORT": 1800}
+    assert config.BREAK_INTERVAL_SHORT == 1800
+    assert sync.version == "v2"
+
+
+def test_invalid_cached_policy_not_applied(tmp_path, monkeypatch):
+    sync, _ = _syncer(tmp_path, monkeypatch, {"AMBIENT_SOUND": "rain"})
+    assert not sync.load_cached()
+    assert sync.apply_pending() == {}
+
+
+@pytest.mark.parametrize("content", ["[]", '"x"', "3", "not json"])
+def test_cache_that_is_not_an_entry_is_ignored(tmp_path, monkeypatch, content):
+    sync, cache = _syncer(tmp_path, monkeypatch, {})
+    cache.write_text(content)
+    assert not sync.load_cached()
+
+
+def test_discard_restores_local_config_and_removes_cache(tmp_path, monkeypatch):
+    sync, cache = _syncer(tmp_path, monkeypatch, {"BREAK_INTERVAL_SHORT": 1800})
+    sync.load_cached()
+    sync.apply_pending()
+    sync.discard("rejected")
+    assert config.BREAK_INTERVAL_SHORT == BASE["BREAK_INTERVAL_SHORT"]
+    assert not cache.exists()
+    assert not sync.load_cached()
@@ -0,0 +1,87 @@
+import pytest
+
+from healthyself import power
+from healthyself.power import AC, PowerManager, battery_profile
+
+
+def _supply(root, name, **files):
+    directory = root / name
+    directory.mkdir()
+    for key, value in files.items():
+        (directory / key).write_text(value + "\n")
+
+
+@pytest.fixture
+def supplies(tmp_path, monkeypatch):
+    monkeypatch.setattr(power, "POWER_SUPPLY_DIR", str(tmp_path))
+    monkeypatch.setattr(power.sys, "platform", "linux")
+    return tmp_path
+
+
+def test_discharging_battery(supplies):
+    _supply(supplies, "AC", type="Mains", online="0")
+    _supply(supplies, "BAT0", type="Battery", status="Discharging")
+    assert power.on_battery()
+
+
+def test_mains_online_wins(supplies):
+    _supply(supplies, "AC", type="Mains", online="1")
+    _supply(supplies, "BAT0", type="Battery", status="Discharging")
+    assert not power.on_battery()
+
+
+@pytest.mark.parametrize("status", ["Charging", "Full", "Not charging"])
+def test_battery_not_discharging(supplies, status):
+    _supply(supplies, "BAT0", type="Battery", status=status)
+    assert not power.on_battery()
+
+
+def test_no_supplies_is_ac(supplies):
+    # Desktops often have no entries at all (or no sysfs)
+    assert not power.on_battery()
+    supplies.rmdir()
+    assert not power.on_battery()
+
+
+def test_countdown_steps():
+    assert AC.countdown_step(300) == 1
+    battery = battery_profile()
+    assert battery.countdown_step(300) == 60
+    assert battery.countdown_step(125) == 5       # lands on 2:00
+    assert battery.countdown_step(45) == 10
+    assert battery.countdown_step(4) == 4
+
+
+def test_battery_audio_modes():
+    simple = battery_profile("simple")
+    assert simple.music_poll == 1.0 and simple.audio_buffer_scale == power.SIMPLE_AUDIO_BUFFER_SCALE
+    normal = battery_profile("normal")
+    assert (normal.music_poll, normal.audio_buffer_scale) == (AC.music_poll, AC.audio_buffer_scale)
+    # Only the timers are on the battery profile
+    assert normal.coalesce and normal.popup_step == 5
+
+
+def test_switches_profile_only_when_enabled(supplies):
+    _supply(supplies, "BAT0", type="Battery", status="Discharging")
+    manager = PowerManager()
+    assert manager.configure(False) is AC
+    profile = manager.configure(True, battery_audio="off")
+    assert profile.name == "battery" and profile.audio == "off"
+    # Rate limited: a change within DETECT_INTERVAL is not seen yet
+    (supplies / "BAT0" / "status").write_text("Charging\n")
+    assert manager.update() is profile
+
+
+def test_wakeups_counted_per_profile_and_merged(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(power.time, "monotonic", lambda: clock[0])
+    manager = PowerManager()
+    for _ in range(30):
+        manager.count_wakeup("main_loop")
+    manager.merge({"ac": {"popup": 10}, "battery": {"music": 2}})
+    clock[0] += 1800
+    rates = manager.wakeups_per_hour()
+    assert rates["ac"] == (80.0, {"main_loop": 60.0, "popup": 20.0})
+    assert "battery" not in rates
+    assert manager.collect() == {"ac": {"main_loop": 30, "popup": 10}, "battery": {"music": 2}}
+    assert manager.collect() == {}
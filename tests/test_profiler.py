@@ -0,0 +1,94 @@
+import os
+import sys
+import signal
+import subprocess
+
+import pytest
+
+from healthyself import profiler
+
+
+@pytest.fixture
+def controller(tmp_path):
+    return profiler.ProfileController(str(tmp_path / "profiles"), str(tmp_path / "request"), str(tmp_path / "pid"))
+
+
+@pytest.mark.parametrize("content", ["seconds abc", "seconds -5", "seconds nan"])
+def test_malformed_request_is_dropped(controller, tmp_path, content):
+    (tmp_path / "request").write_text(content)
+    controller._check_request()
+    assert controller.sampler is None
+    assert not (tmp_path / "request").exists()
+
+
+def test_no_request_file_uses_signal_default(controller, monkeypatch):
+    requested = []
+    monkeypatch.setattr(controller, "request_seconds", requested.append)
+    controller._check_request()
+    controller._check_request(default=["seconds"])
+    assert requested == [profiler.PROFILE_SECONDS]
+
+
+def test_worker_samples_merged_while_profiling(controller, monkeypatch):
+    result = {"samples": [["MainThread", ["run (ui_tasks.py:1)"], 3]]}
+    controller.merge(result, "popup")
+    assert controller.worker_options() is None
+
+    monkeypatch.setattr(profiler.SamplingProfiler, "start", lambda self, duration=None: None)
+    controller._start()
+    assert controller.worker_options() == {"base": controller.base, "cprofile": False}
+    controller.merge(result, "popup")
+    controller.merge(result, "popup")
+    assert controller.sampler.samples == {("UI worker (popup): MainThread", ("run (ui_tasks.py:1)",)): 6}
+
+
+posix = pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="needs POSIX signals")
+
+
+@pytest.fixture
+def cli_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_REQUEST_FILE", str(tmp_path / "request"))
+    monkeypatch.setattr(profiler, "PROFILE_PID_FILE", str(tmp_path / "pid"))
+    return tmp_path
+
+
+@posix
+def test_stale_pid_file_is_not_signalled(cli_paths):
+    # A process that reuses the pid: SIGUSR2 would terminate it
+    other = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        (cli_paths / "pid").write_text(f"{other.pid} 1\n")
+        assert profiler.main(["--cycle"]) == 0
+        assert other.poll() is None
+        assert (cli_paths / "request").read_text() == "cycle\n"
+    finally:
+        other.kill()
+        other.wait()
+    (cli_paths / "pid").write_text(f"{other.pid} {profiler.process_start(os.getpid())}\n")
+    assert profiler.main(["--cycle"]) == 0
+
+
+@posix
+def test_signal_reaches_the_instance_that_wrote_the_pid_file(cli_paths, monkeypatch):
+    controller = profiler.ProfileController(str(cli_paths / "profiles"), str(cli_paths / "request"),
+                                            str(cli_paths / "pid"))
+    previous = signal.getsignal(signal.SIGUSR1), signal.getsignal(signal.SIGUSR2)
+    monkeypatch.setattr(profiler.atexit, "register", lambda func, *args: None)
+    try:
+        controller.install()
+        assert profiler.read_pid_file(str(cli_paths / "pid")) == (os.getpid(), profiler.process_start(os.getpid()))
+        assert profiler.main(["--cycle"]) == 0
+        assert controller.cycle_pending
+        assert not (cli_paths / "request").exists()
+    finally:
+        signal.signal(signal.SIGUSR1, previous[0])
+        signal.signal(signal.SIGUSR2, previous[1])
+
+
+def test_pid_file_removed_only_by_its_owner(controller, tmp_path):
+    (tmp_path / "pid").write_text(f"{os.getpid() + 1} 1\n")
+    controller._remove_pid_file(os.getpid() + 1)
+    assert (tmp_path / "pid").exists()
+    (tmp_path / "pid").write_text(f"{os.getpid()} 1\n")
+    controller._remove_pid_file(os.getpid())
+    assert not (tmp_path / "pid").exists()
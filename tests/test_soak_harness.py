@@ -0,0 +1,52 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from healthyself import soak_harness
+from healthyself.soak_harness import growth_report
+
+
+def _samples(cycles, **growth):
+    """Flat metrics, plus metric -> growth per cycle"""
+    return [dict({"cycle": i, "fds": 10, "threads": 3}, **{m: int(g * i) for m, g in growth.items()})
+            for i in range(cycles)]
+
+
+def test_flat_run_passes():
+    assert growth_report(_samples(1000, rss_kb=0), warmup=100) == []
+
+
+def test_growth_beyond_the_limit_fails():
+    # 8 KB per cycle is 8000 KB per 1000 cycles, over the rss_kb allowance
+    failures = growth_report(_samples(1000, rss_kb=8, traced_kb=1), warmup=100)
+    assert failures == ["rss_kb"]
+
+
+def test_growth_is_scaled_per_1000_cycles():
+    # About ten commands over a 200-cycle run is well past 5 per 1000 cycles
+    assert growth_report(_samples(200, tcl_commands=0.06), warmup=20) == ["tcl_commands"]
+    assert growth_report(_samples(200, tcl_commands=0.002), warmup=20) == []
+
+
+def test_only_sampled_metrics_are_checked():
+    assert growth_report(_samples(100), warmup=10) == []
+
+
+@pytest.mark.parametrize("cycles, warmup", [(0, 0), (1, 0), (5, 4), (5, 5)])
+def test_too_few_cycles_after_warmup(cycles, warmup, capsys):
+    assert growth_report(_samples(cycles), warmup) == []
+    assert "Too few cycles" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_children_and_fds_from_proc():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        assert soak_harness.child_processes({os.getpid()}) >= 1
+        assert soak_harness.process_fds(child.pid) > 0
+    finally:
+        child.kill()
+        child.wait()
+    assert soak_harness.process_fds(child.pid) == 0
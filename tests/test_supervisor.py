@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip("pygame")
+pytest.importorskip("tkinter")
+
+from healthyself import config, ui_tasks
+from healthyself.soak_harness import write_tone
+from healthyself.supervisor import ZygoteUI
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork") or sys.platform == "darwin", reason="needs fork()")
+
+
+class Popup:
+    """Warning that is painted (the device warms) and times out"""
+
+    answer = (0, False)
+
+    def __init__(self, countdown_seconds, is_long_break, allow_snooze):
+        self.first_paint_at = None
+        self.tick_lag_ms = 0.0
+        self.on_first_paint = None
+
+    def show(self):
+        self.on_first_paint()
+        return self.answer
+
+
+class Blackout:
+    """Break with no window: starts the music and stops it at once"""
+
+    def __init__(self, duration, is_long_break, display_backend, audio_backend):
+        self.audio = audio_backend
+        self.teardown_ms = self.time_to_black_ms = self.first_sample_ms = self.audio_open_ms = None
+        self.tick_lag_ms = 0.0
+        self.fade_in = self.fade_out = None
+
+    def enforce(self):
+        cancel = threading.Event()
+        cancel.set()
+        self.audio.play(cancel, 1)
+        self.first_sample_ms = self.audio.first_sample_ms
+        self.audio_open_ms = self.audio.open_ms
+
+
+class Overlay:
+    def __init__(self, duration, message):
+        pass
+
+    def show(self):
+        return 5.0
+
+
+@pytest.fixture
+def snooze():
+    return 0
+
+
+@pytest.fixture
+def ui(tmp_path, monkeypatch, snooze):
+    tone = str(tmp_path / "tone.wav")
+    write_tone(tone, seconds=0.2)
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    monkeypatch.setattr(config, "MUSIC_FILES", [tone])
+    monkeypatch.setattr(config, "LOUDNESS_NORMALIZE", False)
+    monkeypatch.setattr(config, "PRESENTATION_BOOST", False)
+    # Patched before the zygote is forked, which inherits the patches
+    monkeypatch.setattr(Popup, "answer", (snooze, bool(snooze)))
+    monkeypatch.setattr(ui_tasks, "DisengagePopup", Popup)
+    monkeypatch.setattr(ui_tasks, "BreakEnforcer", Blackout)
+    monkeypatch.setattr(ui_tasks, "MicroBreakOverlay", Overlay)
+    runner = ZygoteUI("singlescreen", "pygame")
+    yield runner
+    runner.shutdown()
+
+
+def test_device_opened_at_the_warning_stays_open_into_the_break(ui):
+    # Without a warning the blackout opens the device itself
+    assert ui.blackout(1, False)["audio_open_ms"] > 0
+    assert ui.popup(60, False) == (0, False)
+    assert ui.blackout(1, False)["audio_open_ms"] == 0.0
+    # The break ended: the host (and the worker that held the device) are gone
+    assert ui.host_pid is None
+
+
+@pytest.mark.parametrize("snooze", [15 * 60])
+def test_snoozed_warning_leaves_no_worker_waiting(ui):
+    assert ui.popup(60, False) == (15 * 60, True)
+    # Served by a new worker, which opens the device again
+    assert ui.blackout(1, False)["audio_open_ms"] > 0
+
+
+def test_micro_break_cost_covers_host_start_and_worker(ui):
+    cpu_ms, ui_cpu_ms = ui.micro(1, "Look away")
+    assert cpu_ms == 5.0
+    # The micro-break started the host, so its start is part of the cost
+    assert ui.import_cpu_ms > 0 and ui_cpu_ms > ui.import_cpu_ms
+    assert ui.host_pid is None
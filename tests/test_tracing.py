@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from healthyself import tracing
+
+
+@pytest.fixture
+def traced(tmp_path, monkeypatch):
+    monkeypatch.delenv("DISENGAGE_TRACE", raising=False)
+    for name in ("_events", "_thread_names", "_process_names", "_foreign_threads"):
+        monkeypatch.setattr(tracing, name, type(getattr(tracing, name))())
+    monkeypatch.setattr(tracing, "_cycle_label", None)
+    monkeypatch.setattr(tracing, "_trace_dir", tracing._trace_dir)
+    monkeypatch.setattr(tracing, "_enabled", False)
+    tracing.configure(True, str(tmp_path))
+    return tmp_path
+
+
+def _read(path):
+    with open(path) as f:
+        return json.load(f)["traceEvents"]
+
+
+def test_disabled_records_nothing(monkeypatch):
+    monkeypatch.delenv("DISENGAGE_TRACE", raising=False)
+    monkeypatch.setattr(tracing, "_events", [])
+    monkeypatch.setattr(tracing, "_enabled", False)
+    tracing.configure(False)
+    assert tracing.span("a") is tracing.span("b", x=1)
+    with tracing.span("a"):
+        tracing.instant("b")
+    tracing.complete("c", 0, 1)
+    tracing.begin_cycle("short")
+    assert tracing._events == []
+    assert tracing.now_us() == 0
+    assert tracing.collect() is None
+    assert tracing.end_cycle() is None
+
+
+def test_cycle_written_as_chrome_trace_events(traced):
+    tracing.begin_cycle("short")
+    with tracing.span("popup.build", cat="ui", monitors=2):
+        tracing.instant("popup.first_paint")
+    path = tracing.end_cycle()
+    assert path.startswith(str(traced)) and path.endswith("-short.json")
+
+    events = _read(path)
+    names = [e["name"] for e in events if e["ph"] != "M"]
+    assert names == ["cycle.begin", "popup.first_paint", "popup.build", "cycle.end"]
+    build = next(e for e in events if e["name"] == "popup.build")
+    assert build["ph"] == "X" and build["cat"] == "ui" and build["args"] == {"monitors": 2}
+    assert build["dur"] >= 0
+    metadata = [e for e in events if e["ph"] == "M"]
+    assert {"process_name", "thread_name"} <= {e["name"] for e in metadata}
+    # The next cycle starts empty
+    assert tracing.end_cycle() is None
+
+
+def test_worker_events_merged_under_their_process(traced):
+    tracing.begin_cycle("long")
+    payload = {"pid": 4242, "events": [{"name": "blackout.create_window", "ph": "X", "ts": 1, "dur": 2,
+                                         "pid": 4242, "tid": 7, "cat": "break", "args": {}}],
+               "threads": {"7": "MainThread"}}
+    tracing.merge(payload, "disengage-ui")
+    events = _read(tracing.end_cycle())
+    assert any(e["name"] == "blackout.create_window" and e["pid"] == 4242 for e in events)
+    assert {"name": "process_name", "ph": "M", "pid": 4242, "args": {"name": "disengage-ui"}} in events
+    assert any(e["name"] == "thread_name" and e["pid"] == 4242 and e["tid"] == 7 for e in events)
+
+
+def test_collect_hands_over_and_clears(traced):
+    tracing.instant("audio.first_play")
+    payload = tracing.collect()
+    assert [e["name"] for e in payload["events"]] == ["audio.first_play"]
+    assert payload["threads"]
+    assert tracing.collect()["events"] == []
+
+
+def test_unwritable_trace_dir_is_reported_not_raised(traced, monkeypatch, capsys):
+    # A file where the directory should be
+    blocker = traced / "file"
+    blocker.write_text("")
+    monkeypatch.setattr(tracing, "_trace_dir", str(blocker / "traces"))
+    tracing.begin_cycle("short")
+    assert tracing.end_cycle() is None
+    assert "Trace write error" in capsys.readouterr().out
+    # The cycle is over either way
+    assert tracing.end_cycle() is None
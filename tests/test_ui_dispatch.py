@@ -0,0 +1,106 @@
+import os
+import sys
+import queue
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from healthyself.ui_dispatch import UIDispatcher
+
+
+class Root:
+    """Tk root stand-in: events generated from any thread are handled by run(), on its own thread"""
+
+    def __init__(self):
+        self.tk = self
+        self.bindings = {}
+        self.events = queue.Queue()
+
+    def call(self, *args):
+        # info exists tcl_platform(threaded)
+        return 1
+
+    def bind(self, sequence, func, add=None):
+        self.bindings.setdefault(sequence, []).append(func)
+
+    def event_generate(self, sequence, when=None):
+        self.events.put(sequence)
+
+    def fire(self, sequence):
+        for func in self.bindings.get(sequence, []):
+            func(SimpleNamespace(widget=self))
+
+    def run(self, until, timeout=5):
+        while not until():
+            self.fire(self.events.get(timeout=timeout))
+
+
+def test_cross_thread_posts_drained_by_the_dispatch_event():
+    dispatcher = UIDispatcher()
+    root = Root()
+    dispatcher.attach_tk(root)
+    ran = []
+
+    def produce():
+        for i in range(200):
+            dispatcher.post(lambda i=i: ran.append((i, threading.get_ident())))
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    root.run(until=lambda: len(ran) == 200)
+    producer.join()
+    assert [i for i, _ in ran] == list(range(200))
+    # Every command ran on the UI thread, with at most one wake-up in flight at a time
+    assert {ident for _, ident in ran} == {threading.get_ident()}
+    assert 1 <= dispatcher.wakeups <= dispatcher.posted == 200
+    assert dispatcher.executed == 200 and dispatcher.depth() == 0
+
+
+def test_posts_without_a_ui_wait_for_the_next_attach():
+    dispatcher = UIDispatcher()
+    ran = []
+    dispatcher.post(ran.append, "queued")
+    root = Root()
+    dispatcher.attach_tk(root)
+    root.run(until=lambda: ran)
+    assert ran == ["queued"]
+    # Destroyed: later posts stay queued instead of waking a dead loop
+    root.fire("<Destroy>")
+    dispatcher.post(ran.append, "later")
+    assert root.events.empty() and dispatcher.depth() == 1
+
+
+def test_failing_command_is_counted_and_the_rest_still_run(capsys):
+    dispatcher = UIDispatcher()
+    root = Root()
+    dispatcher.attach_tk(root)
+    ran = []
+    dispatcher.post(lambda: 1 / 0)
+    dispatcher.post(ran.append, "after")
+    root.run(until=lambda: ran)
+    assert dispatcher.errors == 1
+    assert "UI dispatch error" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(sys.platform != "win32" and not os.environ.get("DISPLAY"), reason="needs a display")
+def test_real_tk_loop_drains_posts_from_another_thread():
+    from tkinter import Tk
+    dispatcher = UIDispatcher()
+    root = Tk()
+    root.withdraw()
+    dispatcher.attach_tk(root)
+    ran = []
+    threading.Thread(target=lambda: [dispatcher.post(ran.append, i) for i in range(20)]).start()
+    root.after(5000, root.quit)
+
+    def check():
+        if len(ran) == 20:
+            root.quit()
+        else:
+            root.after(10, check)
+
+    root.after(10, check)
+    root.mainloop()
+    root.destroy()
+    assert ran == list(range(20))